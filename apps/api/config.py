@@ -46,6 +46,13 @@ class Settings(BaseSettings):
     semantic_scholar_api_key: str = ""
     unpaywall_email: str = ""
     crossref_email: str = ""
+    # API zenginleştirmede aynı anda sorgulanan DOI sayısı (CrossRef/OpenAlex
+    # nazik kullanım sınırları içinde; _get_with_retry host başına istekleri
+    # aralıklandırır, 429'larda tüm işçiler Retry-After kadar bekler).
+    enrichment_concurrency: int = 8
+    # Proje başına DOI önbelleğinin (enrichment_cache.sqlite) geçerlilik süresi;
+    # daha eski yanıtlar yeniden sorgulanır. 0 = süresiz.
+    enrichment_cache_ttl_days: float = 90
 
     # LLM yapılandırması — yeni birleşik alanlar
     llm_provider: str = "deepseek"                  # "deepseek" | "openai" | "custom"
@@ -10,6 +10,7 @@ from __future__ import annotations
 
 import asyncio
 import functools
+import json
 import time
 import traceback
 import uuid
@@ -48,6 +49,22 @@ class JobStatus(str, Enum):
     cancelled = "cancelled"
 
 
+_FINISHED = frozenset({JobStatus.completed, JobStatus.failed, JobStatus.cancelled})
+_ACTIVE = (JobStatus.queued, JobStatus.running)
+
+# Döngü içi ilerleme/log raporları en fazla bu aralıkla (saniye) — bkz. JobContext.due
+REPORT_INTERVAL = 0.25
+
+# Audit başlıklarındaki durum etiketleri — her çağrıda yeniden kurulmasın diye sabit
+_STATUS_LABELS = {
+    JobStatus.completed: "tamamlandı",
+    JobStatus.failed: "başarısız",
+    JobStatus.cancelled: "iptal edildi",
+    JobStatus.running: "çalışıyor",
+    JobStatus.queued: "kuyrukta",
+}
+
+
 @dataclass
 class Job:
     id: str
@@ -70,6 +87,11 @@ class Job:
     finished_at: Optional[float] = None
     created_at: float = field(default_factory=time.time)
 
+    def to_frame(self) -> tuple[str, bool]:
+        """SSE frame'i: (JSON metni, iş bitti mi). Tek sefer serialize edilir,
+        tüm dinleyiciler aynı metni paylaşır."""
+        return json.dumps(self.to_dict()), self.status in _FINISHED
+
     def to_dict(self) -> dict[str, Any]:
         return {
             "id": self.id,
@@ -95,14 +117,30 @@ class JobContext:
     def __init__(self, job: Job, runner: "JobRunner"):
         self._job = job
         self._runner = runner
+        self._last_report = 0.0
 
     def log(self, line: str) -> None:
         self._job.log.append(line)
         self._runner._notify(self._job.id)
 
     def progress(self, value: float) -> None:
-        self._job.progress = max(0.0, min(1.0, value))
-        self._runner._notify(self._job.id)
+        value = max(0.0, min(1.0, value))
+        # Frame'de progress 3 haneye yuvarlanır; görünür değer değişmediyse
+        # tüm dinleyicilere aynı snapshot'ı yeniden basmanın anlamı yok.
+        changed = round(value, 3) != round(self._job.progress, 3)
+        self._job.progress = value
+        if changed:
+            self._runner._notify(self._job.id)
+
+    def due(self, interval: float = REPORT_INTERVAL) -> bool:
+        """Döngüler için zaman kapısı: son True'dan beri `interval` saniye geçtiyse True.
+        "Her N satırda bir" yerine zamana bağlı rapor — önbellekten hızla akan
+        satırlarda log satırı / SSE frame sayısı kayıt sayısıyla büyümez."""
+        now = time.monotonic()
+        if now - self._last_report < interval:
+            return False
+        self._last_report = now
+        return True
 
     @property
     def cancelled(self) -> bool:
@@ -133,7 +171,7 @@ class JobRunner:
 
     def cancel(self, job_id: str) -> bool:
         job = self._jobs.get(job_id)
-        if not job or job.status not in (JobStatus.queued, JobStatus.running):
+        if not job or job.status not in _ACTIVE:
             return False
         job.status = JobStatus.cancelled
         task = self._tasks.get(job_id)
@@ -146,7 +184,7 @@ class JobRunner:
         """Bu projede aktif (kuyrukta/çalışan) bir exclusive iş var mı?"""
         return any(
             j.project_id == project_id and j.exclusive
-            and j.status in (JobStatus.queued, JobStatus.running)
+            and j.status in _ACTIVE
             for j in self._jobs.values()
         )
 
@@ -257,13 +295,7 @@ class JobRunner:
 
     @staticmethod
     def _status_label(s: JobStatus) -> str:
-        return {
-            JobStatus.completed: "tamamlandı",
-            JobStatus.failed: "başarısız",
-            JobStatus.cancelled: "iptal edildi",
-            JobStatus.running: "çalışıyor",
-            JobStatus.queued: "kuyrukta",
-        }.get(s, str(s))
+        return _STATUS_LABELS.get(s, str(s))
 
     # --- SSE listeners ---
     def subscribe(self, job_id: str) -> asyncio.Queue:
@@ -272,27 +304,33 @@ class JobRunner:
         # İlk frame: mevcut state
         job = self._jobs.get(job_id)
         if job:
-            q.put_nowait(job.to_dict())
+            q.put_nowait(job.to_frame())
         return q
 
     def unsubscribe(self, job_id: str, q: asyncio.Queue) -> None:
         listeners = self._listeners.get(job_id)
         if listeners:
             listeners.discard(q)
+            if not listeners:
+                self._listeners.pop(job_id, None)
 
     def _notify(self, job_id: str, done: bool = False) -> None:
         job = self._jobs.get(job_id)
-        if not job:
+        listeners = self._listeners.get(job_id)
+        if not job or not listeners:
+            # Dinleyen SSE yok → snapshot kurma. Sonradan abone olan
+            # subscribe() içinde güncel state'i zaten alır.
             return
-        payload = job.to_dict()
-        for q in list(self._listeners.get(job_id, ())):
+        listeners = list(listeners)
+        payload = job.to_frame()
+        for q in listeners:
             try:
                 q.put_nowait(payload)
             except asyncio.QueueFull:
                 pass
         if done:
             # done sentinel
-            for q in list(self._listeners.get(job_id, ())):
+            for q in listeners:
                 try:
                     q.put_nowait(None)
                 except asyncio.QueueFull:
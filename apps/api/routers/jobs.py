@@ -1,5 +1,4 @@
 import asyncio
-import json
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException
@@ -36,31 +35,26 @@ async def stream_job(job_id: str):
     if not job:
         raise HTTPException(404, "job_not_found")
 
+    # subscribe() mevcut snapshot'u kuyruğa ilk frame olarak koyar — ayrıca
+    # to_dict()+json.dumps ile ikinci (aynı) bir frame üretmeye gerek yok.
+    # Kuyruk öğeleri (json, bitti_mi): runner her snapshot'u bir kez serialize eder.
     queue = job_runner.subscribe(job_id)
 
-    # Eğer job zaten bitmiş ise — son durumu hemen gönder ve kapat.
-    # Race condition: kullanıcı UI'da görür görmez subscribe oluyor, bu sırada job
-    # tamamlanmış olabilir. Bu durumda subscribe-ettikten sonra hiçbir event gelmez
-    # ve stream "yarım" görünür (ERR_INCOMPLETE_CHUNKED_ENCODING). Mevcut snapshot'u
-    # ilk event olarak emit edip ardından done emit edelim.
-    initial_snapshot = job.to_dict() if job else None
-    finished_states = {"completed", "failed", "cancelled"}
-    job_finished_already = (initial_snapshot or {}).get("status") in finished_states
-
     async def event_gen():
         try:
-            # İlk snapshot — UI'a anında güncel durumu göster
-            if initial_snapshot is not None:
-                yield {"event": "update", "data": json.dumps(initial_snapshot)}
-                if job_finished_already:
-                    yield {"event": "done", "data": "1"}
-                    return
             while True:
                 msg = await queue.get()
                 if msg is None:
                     yield {"event": "done", "data": "1"}
                     return
-                yield {"event": "update", "data": json.dumps(msg)}
+                data, finished = msg
+                yield {"event": "update", "data": data}
+                # Job zaten bitmiş olabilir (race: UI subscribe olurken tamamlandı) —
+                # bu durumda başka event gelmez; stream "yarım" kalmasın
+                # (ERR_INCOMPLETE_CHUNKED_ENCODING) diye son durumdan sonra done emit et.
+                if finished:
+                    yield {"event": "done", "data": "1"}
+                    return
         except asyncio.CancelledError:
             return
         finally:
@@ -7,7 +7,8 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
 from jobs.runner import job_runner
-from services import analyses, merger, storage
+from services import analyses, audit, filter_engine, merger, smart_merger, storage
+from services.bibex_adapter import read_xlsx, xlsx_shape
 
 router = APIRouter(prefix="/projects/{project_id}/merge", tags=["merge"])
 
@@ -109,6 +110,7 @@ def merge_summary(project_id: str) -> dict[str, Any]:
     if merged_dir is None or not merged_dir.exists():
         return {"has_merge": False}
 
+    paths = analyses.AnalysisFiles.of(merged_dir)
     out: dict[str, Any] = {"has_merge": True}
     # Analiz meta'sını ek (Statistic'ten bağımsız — analiz varsa hep döner)
     meta = analyses.get_analysis_meta(project_id, merged_dir.name)
@@ -127,7 +129,7 @@ def merge_summary(project_id: str) -> dict[str, Any]:
     out["stale"] = _merge_is_stale(project_id, meta)
 
     # Statistic.xlsx tercih edilir; geriye uyumluluk için Statistic_Smart de denenir
-    stats_xlsx = merged_dir / "Statistic.xlsx"
+    stats_xlsx = paths.statistic
     if not stats_xlsx.exists():
         stats_xlsx_smart = merged_dir / "Statistic_Smart.xlsx"
         if stats_xlsx_smart.exists():
@@ -136,7 +138,7 @@ def merge_summary(project_id: str) -> dict[str, Any]:
     # 1) Genel istatistikler — önce Statistic.xlsx'ten oku, yoksa merged.xlsx + lost'tan hesapla
     if stats_xlsx.exists():
         try:
-            gen = pd.read_excel(stats_xlsx, sheet_name="General Stats")
+            gen = read_xlsx(stats_xlsx, sheet_name="General Stats")
             if len(gen) > 0:
                 row = gen.iloc[0]
                 out["general"] = {
@@ -159,12 +161,9 @@ def merge_summary(project_id: str) -> dict[str, Any]:
     # Fallback: Statistic.xlsx yok / okunamadı → merged.xlsx'ten hesapla
     if "general" not in out:
         try:
-            from services import merger
             dataset = merger.merged_dataset_path(project_id)
             if dataset and dataset.exists():
-                df = pd.read_excel(dataset)
-                total_records = int(len(df))
-                merged_columns = int(len(df.columns))
+                total_records, merged_columns = xlsx_shape(dataset)
                 out["general"] = {
                     "total_records": total_records,
                     "wos_records": 0,
@@ -181,17 +180,23 @@ def merge_summary(project_id: str) -> dict[str, Any]:
     # 2) Alan-bazlı istatistikler
     if stats_xlsx.exists():
         try:
-            fs = pd.read_excel(stats_xlsx, sheet_name="Field Stats")
+            fs = read_xlsx(stats_xlsx, sheet_name="Field Stats")
             field_col = fs.columns[0]
             fields = []
             total = out.get("general", {}).get("total_records", 0)
-            for _, r in fs.iterrows():
-                code = str(r[field_col]).strip()
+            # Eksik kolonlar varsayılanla — satır başına Series kuran iterrows
+            # yerine yalın tuple'lar üzerinden gezilir.
+            for col, default in (("Missing Count", 0), ("Missing %", 0), ("Status", "")):
+                if col not in fs.columns:
+                    fs[col] = default
+            rows = fs[[field_col, "Missing Count", "Missing %", "Status"]].itertuples(index=False, name=None)
+            for code, missing, pct, status in rows:
+                code = str(code).strip()
                 if not code or code.lower() == "nan":
                     continue
-                missing = int(r.get("Missing Count", 0))
-                pct = float(r.get("Missing %", 0))
-                status = str(r.get("Status", ""))
+                missing = int(missing)
+                pct = float(pct)
+                status = str(status)
                 fields.append({
                     "field": code,
                     "label": FIELD_LABELS.get(code, code),
@@ -222,13 +227,13 @@ def merge_summary(project_id: str) -> dict[str, Any]:
         elif name_lower.startswith("lost_wos"):
             kind = "lost_wos"
             try:
-                lost_wos = int(len(pd.read_excel(f)))
+                lost_wos = xlsx_shape(f)[0]
             except Exception:
                 pass
         elif name_lower.startswith("lost_scopus"):
             kind = "lost_scopus"
             try:
-                lost_scopus = int(len(pd.read_excel(f)))
+                lost_scopus = xlsx_shape(f)[0]
             except Exception:
                 pass
         elif name_lower.startswith("statistic"):
@@ -258,10 +263,10 @@ def merge_summary(project_id: str) -> dict[str, Any]:
     # 5) Smart-özel istatistikler
     if method == "smart":
         # match_audit.xlsx → stage dağılımı
-        audit_xlsx = merged_dir / "match_audit.xlsx"
+        audit_xlsx = paths.match_audit
         if audit_xlsx.exists():
             try:
-                audit_df = pd.read_excel(audit_xlsx)
+                audit_df = read_xlsx(audit_xlsx)
                 if "stage_label" in audit_df.columns:
                     stage_counts = audit_df["stage_label"].value_counts().to_dict()
                     out["match_stages"] = {str(k): int(v) for k, v in stage_counts.items()}
@@ -269,10 +274,10 @@ def merge_summary(project_id: str) -> dict[str, Any]:
                 out["match_stages"] = {}
 
         # conflict_log.xlsx → çakışma sayısı
-        conflict_xlsx = merged_dir / "conflict_log.xlsx"
+        conflict_xlsx = paths.conflict_log
         if conflict_xlsx.exists():
             try:
-                cdf = pd.read_excel(conflict_xlsx)
+                cdf = read_xlsx(conflict_xlsx)
                 out["conflict_count"] = int(len(cdf))
                 if "chosen_source" in cdf.columns:
                     src_dist = cdf["chosen_source"].value_counts().to_dict()
@@ -306,7 +311,6 @@ def list_borderline(project_id: str):
     """Smart Merge'in borderline kuyruğunu listele (manuel onay için)."""
     if storage.get_project(project_id) is None:
         raise HTTPException(404, "project_not_found")
-    from services import smart_merger
     return smart_merger.list_borderline(project_id)
 
 
@@ -324,7 +328,6 @@ def decide_borderline(project_id: str, payload: BorderlineDecidePayload):
     """Kullanıcının borderline kararlarını uygula. Snapshot alır, audit yazar."""
     if storage.get_project(project_id) is None:
         raise HTTPException(404, "project_not_found")
-    from services import smart_merger
     decisions = [d.model_dump() for d in payload.decisions]
     if not decisions:
         raise HTTPException(400, "decisions_empty")
@@ -364,13 +367,11 @@ def activate_analysis(project_id: str, analysis_id: str):
     analyses.set_active_analysis(project_id, analysis_id)
     # Filter cache invalidate (aktif dataset değişti)
     try:
-        from services import filter_engine
         filter_engine._DF_CACHE.clear()
     except Exception:
         pass
     # Audit
     try:
-        from services import audit
         audit.write(
             project_id,
             kind="analysis_activate",
@@ -404,13 +405,11 @@ def delete_analysis_endpoint(project_id: str, analysis_id: str):
         raise HTTPException(500, "analysis_delete_failed")
     # Cache temizle
     try:
-        from services import filter_engine
         filter_engine._DF_CACHE.clear()
     except Exception:
         pass
     # Audit
     try:
-        from services import audit
         audit.write(
             project_id,
             kind="analysis_delete",
@@ -430,8 +429,7 @@ def delete_analysis_endpoint(project_id: str, analysis_id: str):
     # geçmişi ayrı olmalı"). Proje-seviye kurulum (upload vb.) ve DİĞER analizlerin
     # kayıtları korunur.
     try:
-        from services import audit as _audit
-        _audit.delete_for_analysis(project_id, analysis_id)
+        audit.delete_for_analysis(project_id, analysis_id)
     except Exception:
         pass
     return {"ok": True, "active_id": active_id}
@@ -106,8 +106,9 @@ def prepare(project_id: str):
     if not raw.exists():
         raise HTTPException(400, "no_raw_files")
 
-    csv_files = [f.name for f in raw.iterdir() if f.suffix.lower() == ".csv"]
-    txt_files = [f.name for f in raw.iterdir() if f.suffix.lower() in (".txt", ".isi")]
+    found = converter.scan_raw_exports(raw)
+    csv_files = [f.name for f in found["csv"]]
+    txt_files = [f.name for f in found["txt"]]
 
     report = PrepareReport(raw_csv_count=len(csv_files), raw_txt_count=len(txt_files))
 
@@ -19,6 +19,7 @@ import pandas as pd
 
 from config import settings
 from services import analyses, audit, filter_engine, storage
+from services.bibex_adapter import excel_writer
 
 
 router = APIRouter(prefix="/projects/{project_id}/quality", tags=["quality"])
@@ -63,25 +64,21 @@ FIELD_WEIGHTS = {
 }
 
 
-def _is_filled(series: pd.Series) -> pd.Series:
-    s = series.astype(str).str.strip()
-    return (s != "") & (s.str.upper() != "NAN") & s.notna()
-
-
 def _compute_stats(df: pd.DataFrame) -> dict:
     """Alan-bazlı doluluk + ağırlıklı health skoru + DB dağılımı (stats ve overview ortak)."""
     total = int(len(df))
     fields = []
+    present = [code for code, _, _ in QUALITY_FIELDS if code in df.columns]
+    missing = filter_engine.blank_counts(df[present]).to_dict()
     for code, label, hint in QUALITY_FIELDS:
-        if code not in df.columns:
+        if code not in missing:
             fields.append({
                 "field": code, "label": label, "hint": hint,
                 "total": total, "filled": 0, "missing": total,
                 "fill_rate": 0.0, "available": False,
             })
             continue
-        filled_mask = _is_filled(df[code])
-        filled = int(filled_mask.sum())
+        filled = total - missing[code]
         fields.append({
             "field": code, "label": label, "hint": hint,
             "total": total, "filled": filled, "missing": total - filled,
@@ -209,7 +206,7 @@ def download_overview(project_id: str, background_tasks: BackgroundTasks, fmt: s
         ]
         for db, n in (stats.get("db_distribution") or {}).items():
             summary_rows.append({"Metric": f"Database · {db}", "Value": n})
-        with pd.ExcelWriter(out_path, engine="openpyxl") as xw:
+        with excel_writer(out_path) as xw:
             pd.DataFrame(summary_rows).to_excel(xw, sheet_name="Summary", index=False)
             fields_table.to_excel(xw, sheet_name="Fields", index=False)
 
@@ -16,6 +16,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
 from services import analyses, audit, filter_engine, merger, storage
+from services.bibex_adapter import read_xlsx, to_xlsx
 
 
 router = APIRouter(prefix="/projects/{project_id}/records", tags=["records"])
@@ -27,7 +28,7 @@ def _snapshot_dataset(project_id: str, df: pd.DataFrame, reason: str) -> str:
     snaps.mkdir(exist_ok=True)
     stamp = time.strftime("%Y%m%d_%H%M%S")
     p = snaps / f"pre_{reason}_{stamp}.xlsx"
-    df.to_excel(p, index=False)
+    to_xlsx(df, p)
     rel = str(p.relative_to(storage.settings.storage_path))
     return rel
 
@@ -37,7 +38,7 @@ def _save_dataset(project_id: str, df: pd.DataFrame) -> str:
     p = merger.merged_dataset_path(project_id)
     if p is None:
         raise HTTPException(409, "no_active_merged_dataset")
-    df.to_excel(p, index=False)
+    to_xlsx(df, p)
     # cache invalidate
     filter_engine._DF_CACHE.clear()
     return str(p.relative_to(storage.settings.storage_path))
@@ -74,8 +75,9 @@ def delete_records(project_id: str, payload: DeletePayload):
         keep &= ~df_doi.isin(doi_set)
 
     if payload.indices:
-        idx_to_drop = set(payload.indices)
-        keep &= ~pd.Series([i in idx_to_drop for i in range(len(df))], index=df.index)
+        # Konum maskesi tek vektörel isin ile — satır başına Python üyelik testi yok
+        by_pos = pd.RangeIndex(len(df)).isin(list(set(payload.indices)))
+        keep &= ~pd.Series(by_pos, index=df.index)
 
     deleted_count = int((~keep).sum())
     if deleted_count == 0:
@@ -127,7 +129,7 @@ def restore_snapshot(project_id: str, payload: RestoreSnapshotPayload):
     snap_path = storage.settings.storage_path / payload.snapshot
     if not snap_path.exists():
         raise HTTPException(404, f"snapshot_not_found: {payload.snapshot}")
-    df = pd.read_excel(snap_path)
+    df = read_xlsx(snap_path)
     saved_path = _save_dataset(project_id, df)
     audit.write(
         project_id,
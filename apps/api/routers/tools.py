@@ -16,11 +16,13 @@ from pathlib import Path
 from typing import Literal
 
 import pandas as pd
+from bibex_core.parquet_cache import excel_view
+from bibex_core.xlsx2vos import convert_df_to_wos
 from fastapi import APIRouter, BackgroundTasks, File, Form, HTTPException, UploadFile
 from fastapi.responses import FileResponse
 
 from config import settings
-from services.bibex_adapter import _suppress_stdio
+from services.bibex_adapter import _suppress_stdio, read_xlsx, to_xlsx
 
 router = APIRouter(prefix="/tools", tags=["tools"])
 
@@ -47,7 +49,7 @@ def _read_source(src_path: Path, source_format: str) -> pd.DataFrame:
     """Yüklenmiş dosyayı DataFrame'e oku."""
     try:
         if source_format == "xlsx":
-            return pd.read_excel(src_path)
+            return read_xlsx(src_path)
 
         if source_format == "csv":
             # Plain CSV — encoding auto fallback (UTF-8 → cp1254)
@@ -67,27 +69,25 @@ def _read_source(src_path: Path, source_format: str) -> pd.DataFrame:
             raise HTTPException(400, "tsv_encoding_failed")
 
         if source_format == "scopus_csv":
-            # bibex_core ile Scopus CSV → XLSX → read
-            from bibex_core.scp2xlsx import save_to_excel
-            tmp_xlsx = src_path.parent / "_scopus_tmp.xlsx"
-            with _suppress_stdio():
-                ok = save_to_excel([str(src_path)], str(tmp_xlsx))
-            if not ok or not tmp_xlsx.exists():
+            # bibex_core ile Scopus CSV → df — ara XLSX yazılmaz; excel_view,
+            # XLSX'e yazılıp geri okunmuş haliyle aynı tipleri verir
+            from bibex_core.scp2xlsx import csvScopus2df
+            try:
+                with _suppress_stdio():
+                    return excel_view(csvScopus2df([str(src_path)]))
+            except Exception:
                 raise HTTPException(400, "scopus_convert_failed")
-            df = pd.read_excel(tmp_xlsx)
-            tmp_xlsx.unlink(missing_ok=True)
-            return df
 
         if source_format == "wos":
-            from bibex_core.wos2xlsx import save_to_excel
-            tmp_xlsx = src_path.parent / "_wos_tmp.xlsx"
-            with _suppress_stdio():
-                ok = save_to_excel(str(src_path), str(tmp_xlsx))
-            if not ok or not tmp_xlsx.exists():
+            from bibex_core.wos2xlsx import isi2df
+            try:
+                lines = src_path.read_text(encoding="utf-8").splitlines(keepends=True)
+                if not lines:
+                    raise ValueError("empty file")
+                with _suppress_stdio():
+                    return excel_view(isi2df(lines))
+            except Exception:
                 raise HTTPException(400, "wos_convert_failed")
-            df = pd.read_excel(tmp_xlsx)
-            tmp_xlsx.unlink(missing_ok=True)
-            return df
 
         raise HTTPException(400, f"unknown_source_format: {source_format}")
     except HTTPException:
@@ -102,18 +102,14 @@ def _write_target(df: pd.DataFrame, target_format: str, out_path: Path) -> None:
         raise HTTPException(400, "file_empty")
 
     if target_format == "xlsx":
-        df.to_excel(out_path, index=False)
+        to_xlsx(df, out_path)
     elif target_format == "csv":
         df.to_csv(out_path, index=False, encoding="utf-8")
     elif target_format == "tsv":
         df.to_csv(out_path, sep="\t", index=False, encoding="utf-8")
     elif target_format == "wos":
-        from bibex_core.xlsx2vos import convert_excel_to_wos
-        tmp_xlsx = out_path.parent / f"_pre_wos_{out_path.stem}.xlsx"
-        df.to_excel(tmp_xlsx, index=False)
         with _suppress_stdio():
-            convert_excel_to_wos(str(tmp_xlsx), str(out_path))
-        tmp_xlsx.unlink(missing_ok=True)
+            convert_df_to_wos(df, str(out_path))
     elif target_format == "vos":
         cols = [c for c in ("AU", "TI", "SO", "PY", "VL", "IS", "PG", "DI",
                             "DE", "ID", "AB", "TC", "DT", "DB", "WC", "SC")
@@ -12,6 +12,7 @@ from __future__ import annotations
 import json
 import shutil
 import time
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
@@ -37,6 +38,41 @@ def analysis_dir(project_id: str, analysis_id: str) -> Path:
     return analyses_dir(project_id) / analysis_id
 
 
+@dataclass(frozen=True, slots=True)
+class AnalysisFiles:
+    """Bir analiz klasöründeki çıktı dosyalarının yolları — klasör başına bir kez kurulur."""
+
+    root: Path
+    merged: Path
+    statistic: Path
+    match_audit: Path
+    conflict_log: Path
+    borderline_queue: Path
+    borderline_state: Path
+    lost_wos: Path
+    lost_scopus: Path
+
+    @classmethod
+    def of(cls, adir: Path) -> AnalysisFiles:
+        return cls(
+            root=adir,
+            merged=adir / "merged.xlsx",
+            statistic=adir / "Statistic.xlsx",
+            match_audit=adir / "match_audit.xlsx",
+            conflict_log=adir / "conflict_log.xlsx",
+            borderline_queue=adir / "borderline_queue.xlsx",
+            borderline_state=adir / "borderline_state.json",
+            lost_wos=adir / "Lost_Wos_Records.xlsx",
+            lost_scopus=adir / "Lost_Scopus_Records.xlsx",
+        )
+
+    @property
+    def outputs(self) -> tuple[Path, ...]:
+        """Merge'in yazdığı XLSX çıktıları (özet listesindeki sırayla)."""
+        return (self.merged, self.match_audit, self.conflict_log, self.borderline_queue,
+                self.lost_wos, self.lost_scopus, self.statistic)
+
+
 # ─────────────────────────────────────────────────────────────
 #  CRUD
 # ─────────────────────────────────────────────────────────────
@@ -327,6 +363,11 @@ def work_dir(project_id: str) -> Path:
 _DATASET_NAMES = (
     "merged.xlsx",
 )
+# Dataset olmayan yan çıktılar — fallback aramasında atlanır
+_SIDE_XLSX = frozenset({
+    "statistic.xlsx", "statistic_smart.xlsx", "match_audit.xlsx",
+    "conflict_log.xlsx", "borderline_queue.xlsx",
+})
 
 
 def active_dataset_path(project_id: str) -> Optional[Path]:
@@ -339,11 +380,9 @@ def active_dataset_path(project_id: str) -> Optional[Path]:
         if p.exists():
             return p
     # Fallback: ilk *.xlsx (yan dosyaları atla)
-    SKIP = {"statistic.xlsx", "statistic_smart.xlsx", "match_audit.xlsx",
-            "conflict_log.xlsx", "borderline_queue.xlsx"}
     for f in sorted(adir.iterdir()):
         if (f.suffix.lower() == ".xlsx"
-                and f.name.lower() not in SKIP
+                and f.name.lower() not in _SIDE_XLSX
                 and not f.name.lower().startswith("lost_")):
             return f
     return None
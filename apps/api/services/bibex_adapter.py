@@ -1,30 +1,159 @@
 """Adapter for invoking the core processing modules from the web layer.
 
-Provides helpers to suppress library stdout/stderr, convert pandas
-DataFrames into JSON-serializable records, and raise errors as
-FastAPI HTTPExceptions.
+Provides helpers to suppress library stdout/stderr, read and write XLSX files
+with the fastest available engines, count XLSX rows without building a
+DataFrame, write large XLSX files off the main process, convert pandas
+DataFrames into JSON-serializable records, and raise errors as FastAPI
+HTTPExceptions.
 """
 
 from __future__ import annotations
 
+import asyncio
 import contextlib
 import io
 import math
+import multiprocessing
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Any
 
+from bibex_core import xlsx_writer
+# Okuma motoru çekirdekle ortak (iki okuma yolu aynı motoru seçer): python-calamine
+# kuruluysa (ve pandas >= 2.2) 'calamine', değilse None → pandas varsayılanı (openpyxl)
+from bibex_core.parquet_cache import EXCEL_ENGINE
+from bibex_core.xlsx_writer import stream_xlsx as _write_xlsx_xlsxwriter
+from bibex_core.xlsx_writer import write_only_xlsx as _write_xlsx_openpyxl
 from fastapi import HTTPException
 
 
+# Yazma motoru: çekirdekle aynı yoklama — xlsxwriter kuruluysa onu (openpyxl'in
+# hücre nesnesi modelini kurmadan, doğrudan XML akışı yazar — belirgin şekilde
+# hızlı), değilse openpyxl.
+EXCEL_WRITE_ENGINE = "xlsxwriter" if xlsx_writer.xlsxwriter is not None else "openpyxl"
+
+
+_STDIO_LOCK = threading.Lock()
+_stdio_depth = 0
+_stdio_saved: tuple[Any, Any] | None = None
+
+
+class _NullWriter(io.TextIOBase):
+    """Yazılanı atan akış. Çekirdek modüller (ör. extract_metadata) DOI başına
+    onlarca satır print eder; bu çıktı hiç okunmuyor — StringIO'da biriktirmek
+    uzun işlerde belleği büyütür, her yazımı da kopyalar."""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        return len(s)
+
+
 @contextlib.contextmanager
 def _suppress_stdio():
-    buf_out, buf_err = io.StringIO(), io.StringIO()
-    import sys
-    old_out, old_err = sys.stdout, sys.stderr
-    sys.stdout, sys.stderr = buf_out, buf_err
+    # sys.stdout/err süreç-geneli: eşzamanlı thread'ler (ör. paralel Scopus/WoS
+    # hazırlığı) iç içe girerse son çıkan gerçek akışları geri koymalı — aksi
+    # halde stdout susturulmuş kalır. Sayaçlı: ilk giren kaydeder, son çıkan
+    # geri yükler. Aradaki çıktı atılır.
+    global _stdio_depth, _stdio_saved
+    with _STDIO_LOCK:
+        if _stdio_depth == 0:
+            _stdio_saved = (sys.stdout, sys.stderr)
+            sys.stdout, sys.stderr = _NullWriter(), _NullWriter()
+        _stdio_depth += 1
+        buf_out, buf_err = sys.stdout, sys.stderr
     try:
         yield buf_out, buf_err
     finally:
-        sys.stdout, sys.stderr = old_out, old_err
+        with _STDIO_LOCK:
+            _stdio_depth -= 1
+            if _stdio_depth == 0:
+                sys.stdout, sys.stderr = _stdio_saved
+                _stdio_saved = None
+
+
+def read_xlsx(path, **kwargs):
+    """`pd.read_excel` — mevcut en hızlı motorla (bkz. EXCEL_ENGINE)."""
+    import pandas as pd
+    kwargs.setdefault("engine", EXCEL_ENGINE)
+    return pd.read_excel(path, **kwargs)
+
+
+def _row_width(row) -> int:
+    """Satırdaki son dolu hücrenin 1-tabanlı konumu (boş satır → 0)."""
+    for i in range(len(row), 0, -1):
+        if row[i - 1] is not None:
+            return i
+    return 0
+
+
+def xlsx_shape(path) -> tuple[int, int]:
+    """İlk sayfanın (satır, kolon) sayısı — `read_xlsx(path).shape` ile aynı,
+    ama DataFrame kurmadan: openpyxl read_only satırları yalnızca sayar.
+    Başlık satırı sayılmaz; sondaki boş satır/kolonlar pandas gibi atılır."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        n_cols = _row_width(next(rows, ()))
+        n_rows = 0
+        for i, row in enumerate(rows, 1):
+            width = _row_width(row)
+            if width:
+                n_rows = i
+                n_cols = max(n_cols, width)
+        return n_rows, n_cols
+    finally:
+        wb.close()
+
+
+# Büyük XLSX yazımı (openpyxl) saf-Python ve GIL'e bağlı: thread'de koşunca aynı
+# anda yürüyen diğer yazımları/isteği de yavaşlatır. Ayrı process'te yazılır.
+# spawn: çok-thread'li sunucu sürecinden fork güvenli değil.
+_WRITE_POOL: ProcessPoolExecutor | None = None
+
+
+def excel_writer(path):
+    """`pd.ExcelWriter` — mevcut en hızlı yazma motoruyla (bkz. EXCEL_WRITE_ENGINE).
+    xlsxwriter URL'leri hyperlink'e çevirmesin: openpyxl gibi düz metin yazılır
+    (ayrıca sayfa başına 65k link sınırı uyarılarını önler)."""
+    import pandas as pd
+    if EXCEL_WRITE_ENGINE == "xlsxwriter":
+        return pd.ExcelWriter(
+            path, engine="xlsxwriter",
+            engine_kwargs={"options": {"strings_to_urls": False}},
+        )
+    return pd.ExcelWriter(path, engine=EXCEL_WRITE_ENGINE)
+
+
+def to_xlsx(df, path) -> None:
+    """`df.to_excel(path, index=False)` — satır satır akıtan yazıcıyla (senkron):
+    xlsxwriter varsa constant_memory, yoksa openpyxl write-only. xlsxwriter bir
+    hücreyi eksik yazarsa (32.767 karakteri aşan metin, ör. uzun WoS CR: satırın
+    kalanı boş kalır) dosya openpyxl ile baştan yazılır — kısa yazım kabul edilmez."""
+    if EXCEL_WRITE_ENGINE == "xlsxwriter" and _write_xlsx_xlsxwriter(df, path):
+        return
+    _write_xlsx_openpyxl(df, path)
+
+
+async def write_xlsx(df, path) -> None:
+    """`df.to_excel(path, index=False)` — ayrı bir process'te; havuz
+    kullanılamazsa thread'de. Diğer çıktılarla eşzamanlı beklenebilir."""
+    global _WRITE_POOL
+    try:
+        if _WRITE_POOL is None:
+            _WRITE_POOL = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+            )
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(_WRITE_POOL, to_xlsx, df, str(path))
+    except (BrokenProcessPool, OSError):
+        _WRITE_POOL = None
+        await asyncio.to_thread(to_xlsx, df, str(path))
 
 
 def df_to_records(df, max_rows: int | None = None) -> list[dict[str, Any]]:
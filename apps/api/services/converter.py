@@ -8,13 +8,26 @@ is suppressed, and failures are raised as HTTPException.
 
 from __future__ import annotations
 
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Iterable
 
+import pandas as pd
+from bibex_core import scp2xlsx, wos2xlsx, xlsx2vos
 from fastapi import HTTPException
 
 from services import storage
-from services.bibex_adapter import _suppress_stdio
+from services.bibex_adapter import _suppress_stdio, read_xlsx
+
+try:  # opsiyonel hızlandırıcı — yoksa pandas'ın nullable dtype'ları
+    import pyarrow  # noqa: F401
+    _DTYPE_BACKEND = "pyarrow"
+except ImportError:
+    _DTYPE_BACKEND = "numpy_nullable"
 
 
 def _project_paths(project_id: str) -> tuple[Path, Path, Path]:
@@ -28,55 +41,178 @@ def _project_paths(project_id: str) -> tuple[Path, Path, Path]:
 def _raw_file(raw_dir: Path, name: str) -> Path:
     name = Path(name).name
     p = raw_dir / name
-    if not p.exists() or not p.is_file():
+    if not p.is_file():  # tek stat: yoksa da False döner
         raise HTTPException(404, f"Ham dosya bulunamadı: {name}")
     return p
 
 
-def csv_to_xlsx(project_id: str, source_names: Iterable[str], output_name: str = "scopus_merged.xlsx") -> Path:
-    """Scopus CSV(ler) → tek XLSX."""
-    from bibex_core.scp2xlsx import save_to_excel
+_COPY_CHUNK = 1 << 20  # 1 MiB — akış kopyalama blok boyutu
+
+
+def _csv_header(path: Path) -> bytes:
+    """CSV'nin başlık satırı — BOM ve satır sonu olmadan (karşılaştırma anahtarı)."""
+    with path.open("rb") as f:
+        return f.readline().removeprefix(b"\xef\xbb\xbf").rstrip(b"\r\n")
+
+
+def _concat_csv_exports(sources: list[Path], dest: Path) -> bool:
+    """Aynı başlıklı Scopus CSV'lerini bayt düzeyinde tek dosyada birleştirir.
 
+    Önce tüm başlıklar (yalnız ilk satırlar okunarak) karşılaştırılır; biri
+    farklıysa hiçbir şey yazmadan False döner ve çağıran kolon hizalamasını
+    yapan liste yoluna düşer. Aynıysa ilk dosya olduğu gibi yazılır,
+    sonrakilerin başlık satırı atlanıp geri kalanı 1 MiB bloklarla akıtılır —
+    pandas parse/concat turu yok.
+    """
+    if len({_csv_header(src) for src in sources}) != 1:
+        return False
+    # Çıktıda geri okuma/seek yok (her seek tamponu boşaltır): son bayt kopyalanan
+    # bloktan izlenir, yazımlar 1 MiB'lık tek tampon üzerinden toplu gider.
+    with dest.open("wb", buffering=_COPY_CHUNK) as out:
+        for i, src in enumerate(sources):
+            with src.open("rb") as f:
+                header = f.readline()
+                tail = b"\n"
+                if i == 0:
+                    out.write(header)
+                    tail = header[-1:]
+                while chunk := f.read(_COPY_CHUNK):
+                    out.write(chunk)
+                    tail = chunk[-1:]
+            # Son satırı newline'sız biten dosya bir sonrakinin ilk kaydına yapışmasın
+            if tail and tail != b"\n":
+                out.write(b"\n")
+    return True
+
+
+def scan_raw_exports(raw_dir: Path) -> dict[str, list[Path]]:
+    """raw/ klasörünü TEK geçişte tara, ham dışa aktarımları türe göre ayır.
+
+    `os.scandir` dizin girdisinin tipini zaten döndürdüğünden dosya başına
+    ayrı stat gerekmez. Dönüş: {"csv": [...], "txt": [...]} (ad sırasıyla).
+    """
+    found: dict[str, list[Path]] = {"csv": [], "txt": []}
+    try:
+        with os.scandir(raw_dir) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+                ext = os.path.splitext(entry.name)[1].lower()
+                if ext == ".csv":
+                    found["csv"].append(Path(entry.path))
+                elif ext in (".txt", ".isi"):
+                    found["txt"].append(Path(entry.path))
+    except FileNotFoundError:
+        pass
+    for paths in found.values():
+        paths.sort()
+    return found
+
+
+def _core_save(kind: str, source, output: str) -> tuple[bool, pd.DataFrame | None]:
+    """bibex_core dönüştürücüsünü çağırır — process havuzunda da çalışabilsin
+    diye modül seviyesinde (picklable) tutulur. (başarı, df) döndürür; df,
+    yazılan XLSX'in read_excel ile yükleneceği halidir."""
+    save_to_excel = scp2xlsx.save_to_excel if kind == "scopus" else wos2xlsx.save_to_excel
+    with _suppress_stdio():
+        # Parquet sidecar: sonraki merge'ler girdileri XLSX yerine buradan yükler
+        return save_to_excel(source, output, sidecar=True, return_df=True)
+
+
+def _run_core(
+    kind: str, source, output: Path, executor: Executor | None,
+    frames: dict[Path, pd.DataFrame] | None,
+) -> bool:
+    """Dönüşümü verilen havuzda (yoksa yerinde) çalıştır. Havuz kullanılamazsa
+    (ör. process başlatılamadı) yerinde çalıştırmaya düşer. `frames` verilirse
+    üretilen df çıktı yoluyla oraya konur — çağıran XLSX'i yeniden okumaz."""
+    result = None
+    if executor is not None:
+        try:
+            result = executor.submit(_core_save, kind, source, str(output)).result()
+        except (BrokenProcessPool, OSError):
+            pass
+    ok, df = result or _core_save(kind, source, str(output))
+    if ok and frames is not None and df is not None:
+        frames[output] = df
+    return ok
+
+
+def csv_to_xlsx(
+    project_id: str,
+    source_names: Iterable[str],
+    output_name: str = "scopus_merged.xlsx",
+    *,
+    executor: Executor | None = None,
+    touch: bool = True,
+    frames: dict[Path, pd.DataFrame] | None = None,
+) -> Path:
+    """Scopus CSV(ler) → tek XLSX."""
     _, raw, processed = _project_paths(project_id)
     sources = [str(_raw_file(raw, n)) for n in source_names]
     if not sources:
         raise HTTPException(400, "En az bir CSV dosyası gerekli")
     output = processed / Path(output_name).name
-    with _suppress_stdio():
-        ok = save_to_excel(sources, str(output))
+
+    # Birden fazla CSV: pyarrow varsa csvScopus2df her dosyayı doğrudan Arrow'a
+    # parse edip birleştirir (ara CSV yok). Yoksa, başlıklar aynıysa önce akışla
+    # tek dosyada birleştir ki pandas tek parse yapsın.
+    merged_csv = processed / "_scopus_merged.tmp.csv"
+    if (len(sources) > 1 and not scp2xlsx.ARROW_CSV
+            and _concat_csv_exports([Path(s) for s in sources], merged_csv)):
+        sources = [str(merged_csv)]
+    try:
+        ok = _run_core("scopus", sources, output, executor, frames)
+    finally:
+        merged_csv.unlink(missing_ok=True)
     if not ok or not output.exists():
         raise HTTPException(500, "CSV → XLSX dönüşümü başarısız")
-    storage.touch_project(project_id)
+    if touch:
+        storage.touch_project(project_id)
     return output
 
 
-def wos_to_xlsx(project_id: str, source_names: Iterable[str], output_name: str = "wos_merged.xlsx") -> Path:
+def wos_to_xlsx(
+    project_id: str,
+    source_names: Iterable[str],
+    output_name: str = "wos_merged.xlsx",
+    *,
+    executor: Executor | None = None,
+    touch: bool = True,
+    frames: dict[Path, pd.DataFrame] | None = None,
+) -> Path:
     """WoS TXT(ler) → tek XLSX. Birden fazla TXT verilirse önce birleştirir."""
-    from bibex_core.wos2xlsx import save_to_excel
-
     _, raw, processed = _project_paths(project_id)
     sources = [_raw_file(raw, n) for n in source_names]
     if not sources:
         raise HTTPException(400, "En az bir TXT dosyası gerekli")
 
-    # Birleştir
-    merged_txt = processed / "_wos_merged.tmp.txt"
-    with merged_txt.open("w", encoding="utf-8") as out:
-        for src in sources:
-            out.write(src.read_text(encoding="utf-8", errors="replace"))
-            out.write("\n")
+    # Birleştir — tek TXT ise geçici kopya gereksiz, doğrudan dönüştürülür
+    merged_txt: Path | None = None
+    if len(sources) > 1:
+        merged_txt = processed / "_wos_merged.tmp.txt"
+        with merged_txt.open("wb", buffering=_COPY_CHUNK) as out:
+            for src in sources:
+                # Bayt düzeyinde, 1 MiB bloklarla akıt — decode/encode turu yok;
+                # bozuk baytlar okuma sırasında (wos2xlsx) U+FFFD ile değiştirilir
+                with src.open("rb") as f:
+                    shutil.copyfileobj(f, out, _COPY_CHUNK)
+                out.write(b"\n")
 
     output = processed / Path(output_name).name
-    with _suppress_stdio():
-        ok = save_to_excel(str(merged_txt), str(output))
-    merged_txt.unlink(missing_ok=True)
+    try:
+        ok = _run_core("wos", str(merged_txt or sources[0]), output, executor, frames)
+    finally:
+        if merged_txt is not None:
+            merged_txt.unlink(missing_ok=True)
     if not ok or not output.exists():
         raise HTTPException(500, "WoS → XLSX dönüşümü başarısız")
-    storage.touch_project(project_id)
+    if touch:
+        storage.touch_project(project_id)
     return output
 
 
-def auto_prepare(project_id: str, ctx=None) -> dict:
+def auto_prepare(project_id: str, ctx=None, frames: dict[Path, pd.DataFrame] | None = None) -> dict:
     """Ham CSV/TXT'leri konsolide `processed/*.xlsx`'e çevirir — ÖRTÜK hazırlık.
 
     Smart Merge job'unun ilk fazı olarak çağrılır; ayrı "Prepare" adımı yok.
@@ -86,31 +222,28 @@ def auto_prepare(project_id: str, ctx=None) -> dict:
 
     ctx: opsiyonel JobContext benzeri (.log()/.progress()); tip bağımlılığı
     eklememek için gevşek bırakıldı.
+    frames: verilirse yeni dönüştürülen her XLSX'in df'i (XLSX yolu → df)
+    buraya konur; merge bunları diskten yeniden okumadan kullanır.
     """
     _, raw, processed = _project_paths(project_id)
     report: dict = {
         "scopus_xlsx": None, "wos_xlsx": None,
         "csv": 0, "txt": 0, "skipped": [], "did_convert": False,
     }
-    if not raw.exists():
-        return report
-
-    csv_files = [f for f in raw.iterdir() if f.is_file() and f.suffix.lower() == ".csv"]
-    txt_files = [f for f in raw.iterdir() if f.is_file() and f.suffix.lower() in (".txt", ".isi")]
+    found = scan_raw_exports(raw)
+    csv_files, txt_files = found["csv"], found["txt"]
     report["csv"] = len(csv_files)
     report["txt"] = len(txt_files)
 
     def _fresh(out_name: str, raw_paths: list[Path]) -> bool:
-        out = processed / out_name
-        if not out.exists():
-            return False
         try:
+            out_mtime = (processed / out_name).stat().st_mtime
             newest_raw = max((p.stat().st_mtime for p in raw_paths), default=0.0)
-            return out.stat().st_mtime >= newest_raw
-        except OSError:
+        except OSError:  # çıktı yok (FileNotFoundError) ya da okunamıyor
             return False
+        return out_mtime >= newest_raw
 
-    def _convert(kind: str, out_name: str, legacy: str, raw_paths: list[Path], fn) -> None:
+    def _convert(kind: str, out_name: str, legacy: str, raw_paths: list[Path], fn, executor) -> None:
         if _fresh(out_name, raw_paths):
             report[f"{kind}_xlsx"] = out_name
             if ctx:
@@ -125,28 +258,41 @@ def auto_prepare(project_id: str, ctx=None) -> dict:
         try:
             if ctx:
                 ctx.log(f"Preparing {kind} — {len(raw_paths)} file(s) → {out_name}")
-            out = fn(project_id, [p.name for p in raw_paths], out_name)
+            out = fn(project_id, [p.name for p in raw_paths], out_name,
+                     executor=executor, touch=False, frames=frames)
             report[f"{kind}_xlsx"] = out.name
             report["did_convert"] = True
         except Exception as e:  # noqa: BLE001 — tek-kaynak merge yürüsün diye yutulur
             report["skipped"].append(f"{kind}: {e}")
 
+    jobs = []
     if csv_files:
-        _convert("scopus", "scopus.xlsx", "scopus_merged.xlsx", csv_files, csv_to_xlsx)
-    if ctx:
-        ctx.progress(0.12)
+        jobs.append(("scopus", "scopus.xlsx", "scopus_merged.xlsx", csv_files, csv_to_xlsx))
     if txt_files:
-        _convert("wos", "wos.xlsx", "wos_merged.xlsx", txt_files, wos_to_xlsx)
+        jobs.append(("wos", "wos.xlsx", "wos_merged.xlsx", txt_files, wos_to_xlsx))
+
+    if len(jobs) == 2 and not all(_fresh(j[1], j[3]) for j in jobs):
+        # Scopus ve WoS girdileri/çıktıları ayrık → iki dönüşüm ayrı process'lerde
+        # eşzamanlı koşar (openpyxl yazımı GIL'e bağlı, thread yetmez). Thread'ler
+        # yalnız birleştirme adımını yürütüp process sonucunu bekler.
+        # spawn: çok-thread'li sunucu sürecinden fork güvenli değil (bkz. bibex_adapter).
+        procs = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+        with procs, ThreadPoolExecutor(max_workers=2) as threads:
+            for fut in [threads.submit(_convert, *job, procs) for job in jobs]:
+                fut.result()
+    else:
+        for job in jobs:
+            _convert(*job, None)
     if ctx:
         ctx.progress(0.18)
+    if report["did_convert"]:
+        storage.touch_project(project_id)
 
     return report
 
 
 def xlsx_to_wos_txt(project_id: str, source_name: str, output_name: str | None = None) -> Path:
     """XLSX → WoS-format TXT (bibliometrix için)."""
-    from bibex_core.xlsx2vos import convert_excel_to_wos
-
     _, _, processed = _project_paths(project_id)
     src = processed / Path(source_name).name
     if not src.exists():
@@ -160,7 +306,7 @@ def xlsx_to_wos_txt(project_id: str, source_name: str, output_name: str | None =
 
     output = processed / (output_name or (src.stem + "_wos.txt"))
     with _suppress_stdio():
-        convert_excel_to_wos(str(src), str(output))
+        xlsx2vos.convert_excel_to_wos(str(src), str(output))
     if not output.exists():
         raise HTTPException(500, "XLSX → WoS TXT dönüşümü başarısız")
     storage.touch_project(project_id)
@@ -169,8 +315,6 @@ def xlsx_to_wos_txt(project_id: str, source_name: str, output_name: str | None =
 
 def xlsx_to_tsv(project_id: str, source_name: str, output_name: str | None = None, sep: str = "\t") -> Path:
     """XLSX → düz TSV/CSV (pandas)."""
-    import pandas as pd
-
     _, _, processed = _project_paths(project_id)
     src = processed / Path(source_name).name
     if not src.exists():
@@ -183,7 +327,8 @@ def xlsx_to_tsv(project_id: str, source_name: str, output_name: str | None = Non
 
     ext = "tsv" if sep == "\t" else "csv"
     output = processed / (output_name or (src.stem + f".{ext}"))
-    df = pd.read_excel(src)
+    # Arrow/nullable dtype: boş hücreli tamsayı kolonları "2020.0" olarak yazılmaz
+    df = read_xlsx(src, dtype_backend=_DTYPE_BACKEND)
     df.to_csv(output, sep=sep, index=False, encoding="utf-8")
     storage.touch_project(project_id)
     return output
@@ -9,6 +9,7 @@ from __future__ import annotations
 
 import asyncio
 import json
+import shutil
 import time
 from pathlib import Path
 from typing import Any
@@ -18,7 +19,8 @@ from fastapi import HTTPException
 
 from config import settings
 from jobs.runner import JobContext, run_cpu
-from services import analyses, merger, storage
+from services import analyses, filter_engine, merger, storage
+from services.bibex_adapter import read_xlsx, to_xlsx
 from .blocking import (
     build_author_blocks, build_affiliation_blocks, build_author_splits,
     build_country_blocks, build_org_rollup,
@@ -51,7 +53,7 @@ def _load_merged(project_id: str) -> pd.DataFrame:
     p = merger.merged_dataset_path(project_id)
     if p is None:
         raise HTTPException(409, "no_merged_data")
-    return pd.read_excel(p)
+    return read_xlsx(p)
 
 
 def _distinct_variants(cluster: dict) -> set[str]:
@@ -119,6 +121,11 @@ def _member_variants(m: dict, key: str) -> list:
     return [v for v in vs if v]
 
 
+def _nkey(s: str) -> str:
+    """Boşluk-normalize anahtar: WoS AU yazımı tutarsız olabilir ('GAO S' vs 'GAO  S')."""
+    return " ".join(str(s or "").split()).lower()
+
+
 def _apply_c1_map(df: pd.DataFrame, cols: list[str], fn) -> int:
     """C1/C1raw kolonlarına fn uygula ve GERÇEKTEN değişen satır sayısını döndür.
 
@@ -150,7 +157,7 @@ def _snapshot(project_dir: Path, df: pd.DataFrame, kind: str) -> Path:
     snaps.mkdir(exist_ok=True)
     stamp = time.strftime("%Y%m%d_%H%M%S")
     p = snaps / f"pre_{kind}_{stamp}.xlsx"
-    df.to_excel(p, index=False)
+    to_xlsx(df, p)
     return p
 
 
@@ -475,12 +482,8 @@ async def run_author_disambiguation(
                 src = merger.merged_dataset_path(project_id)
                 if src is not None:
                     snap_rel = _snapshot(project_dir, df_before, "orcid_enrich")
-                    await asyncio.to_thread(df.to_excel, src, index=False)
-                    try:
-                        from services.filter_engine import _DF_CACHE
-                        _DF_CACHE.clear()
-                    except Exception:
-                        pass
+                    await asyncio.to_thread(to_xlsx, df, src)
+                    filter_engine._DF_CACHE.clear()
                     storage.touch_project(project_id)
                     ctx.log(f"ORCID write-back: {wb['rows_filled']} rows enriched (OI/ROR/CC)")
 
@@ -718,6 +721,51 @@ def list_proposals(project_id: str, kind: str) -> dict[str, Any]:
     return json.loads(p.read_text(encoding="utf-8"))
 
 
+def _commit_apply(
+    project_id: str, project_dir: Path, src: Path,
+    original: pd.DataFrame, df: pd.DataFrame, *,
+    kind: str, proposals_kind: str, list_key: str, id_key: str,
+    approved: list[dict], affected: int, details: bool,
+) -> dict[str, Any]:
+    """apply_clusters / apply_splits ortak kapanışı: ÖNCE snapshot (değişmemiş
+    veri), sonra yazım + filter cache temizliği, audit kaydı ve uygulanan
+    önerilerin proposals'tan düşülmesi (listede tekrar görünmesinler)."""
+    snap = _snapshot(project_dir, original, kind)
+    to_xlsx(df, src)
+    filter_engine._DF_CACHE.clear()
+
+    snap_rel = str(snap.relative_to(storage.settings.storage_path))
+    audit_path = project_dir / f"disambiguation_audit_{kind}.json"
+    log: list[dict] = []
+    if audit_path.exists():
+        log = json.loads(audit_path.read_text(encoding="utf-8"))
+    entry = {
+        "applied_at": time.time(),
+        "snapshot": snap_rel,
+        "approved_count": len(approved),
+        "replacements": affected,
+    }
+    if details:
+        entry["details"] = approved
+    log.append(entry)
+    audit_path.write_text(json.dumps(log, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    applied_ids = {e.get(id_key) for e in approved if e.get(id_key)}
+    if applied_ids:
+        props = list_proposals(project_id, proposals_kind)
+        props[list_key] = [x for x in props.get(list_key, []) if x.get(id_key) not in applied_ids]
+        (project_dir / f"disambiguation_{proposals_kind}.json").write_text(
+            json.dumps(props, ensure_ascii=False, indent=2), encoding="utf-8",
+        )
+
+    return {
+        "kind": kind,
+        "approved_count": len(approved),
+        "replacements": affected,
+        "snapshot": snap_rel,
+    }
+
+
 def apply_clusters(project_id: str, kind: str, approved: list[dict]) -> dict[str, Any]:
     """Onaylanmış cluster'ları orijinal datasete uygula.
 
@@ -727,7 +775,9 @@ def apply_clusters(project_id: str, kind: str, approved: list[dict]) -> dict[str
     src = merger.merged_dataset_path(project_id)
     if src is None:
         raise HTTPException(409, "no_merged_data")
-    df = pd.read_excel(src)
+    # Tek okuma: değişmemiş kopya snapshot için saklanır (XLSX ikinci kez parse edilmez)
+    original = read_xlsx(src)
+    df = original.copy()
 
     # NOT: snapshot işin SONUNDA, yalnız gerçekten değişiklik yapılacaksa (affected>0)
     # alınır — 'sıfır değişiklik' apply'ları boş snapshot çöplüğü üretmesin.
@@ -753,11 +803,6 @@ def apply_clusters(project_id: str, kind: str, approved: list[dict]) -> dict[str
             canonical = entry.get("canonical") or (all_variants[0] if all_variants else None)
             if not canonical:
                 continue
-            import re as _re
-
-            def _nkey(s: str) -> str:
-                return _re.sub(r"\s+", " ", str(s or "")).strip().lower()
-
             # Boşluk-toleranslı: WoS AU yazımı tutarsız olabilir ('GAO S' vs 'GAO  S').
             variant_keys = {_nkey(v) for v in all_variants if _nkey(v) != _nkey(canonical)}
             if not variant_keys:
@@ -843,42 +888,11 @@ def apply_clusters(project_id: str, kind: str, approved: list[dict]) -> dict[str
     if affected == 0:
         return {"kind": kind, "approved_count": len(approved), "replacements": 0, "snapshot": None}
 
-    # Değişiklik var → ÖNCE snapshot (df'in güncel hâli yazımdan önce yedeklenir), sonra yaz.
-    snap = _snapshot(project_dir, pd.read_excel(src), kind)
-    df.to_excel(src, index=False)
-    # Filter cache temizle
-    from services.filter_engine import _DF_CACHE
-    _DF_CACHE.clear()
-
-    # Audit log
-    audit_path = project_dir / f"disambiguation_audit_{kind}.json"
-    audit: list[dict] = []
-    if audit_path.exists():
-        audit = json.loads(audit_path.read_text(encoding="utf-8"))
-    audit.append({
-        "applied_at": time.time(),
-        "snapshot": str(snap.relative_to(storage.settings.storage_path)),
-        "approved_count": len(approved),
-        "replacements": affected,
-        "details": approved,
-    })
-    audit_path.write_text(json.dumps(audit, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    # Onaylanan cluster'ları proposals'tan düş — uygulananlar listede tekrar görünmesin.
-    applied_ids = {e.get("cluster_id") for e in approved if e.get("cluster_id")}
-    if applied_ids:
-        props = list_proposals(project_id, kind)
-        props["clusters"] = [c for c in props.get("clusters", []) if c.get("cluster_id") not in applied_ids]
-        (project_dir / f"disambiguation_{kind}.json").write_text(
-            json.dumps(props, ensure_ascii=False, indent=2), encoding="utf-8",
-        )
-
-    return {
-        "kind": kind,
-        "approved_count": len(approved),
-        "replacements": affected,
-        "snapshot": str(snap.relative_to(storage.settings.storage_path)),
-    }
+    return _commit_apply(
+        project_id, project_dir, src, original, df,
+        kind=kind, proposals_kind=kind, list_key="clusters", id_key="cluster_id",
+        approved=approved, affected=affected, details=True,
+    )
 
 
 def apply_splits(project_id: str, approved: list[dict]) -> dict[str, Any]:
@@ -891,7 +905,9 @@ def apply_splits(project_id: str, approved: list[dict]) -> dict[str, Any]:
     src = merger.merged_dataset_path(project_id)
     if src is None:
         raise HTTPException(409, "no_merged_data")
-    df = pd.read_excel(src)
+    # Tek okuma: değişmemiş kopya snapshot için saklanır (XLSX ikinci kez parse edilmez)
+    original = read_xlsx(src)
+    df = original.copy()
     if "AU" not in df.columns:
         raise HTTPException(400, "no_au_column")
 
@@ -899,12 +915,6 @@ def apply_splits(project_id: str, approved: list[dict]) -> dict[str, Any]:
     proposals = list_proposals(project_id, "authors")
     lookup = {s.get("split_id"): s for s in proposals.get("splits", [])}
 
-    import re as _re
-
-    def _nkey(s: str) -> str:
-        # Boşluk-normalize anahtar: WoS AU yazımı tutarsız olabilir ('GAO S' vs 'GAO  S').
-        return _re.sub(r"\s+", " ", str(s or "")).strip().lower()
-
     affected = 0
     for entry in approved:
         sp = lookup.get(entry.get("split_id")) or entry  # tam obje de kabul
@@ -938,41 +948,11 @@ def apply_splits(project_id: str, approved: list[dict]) -> dict[str, Any]:
     if affected == 0:
         return {"kind": "authors_split", "approved_count": len(approved), "replacements": 0, "snapshot": None}
 
-    snap = _snapshot(project_dir, pd.read_excel(src), "authors_split")
-    df.to_excel(src, index=False)
-    try:
-        from services.filter_engine import _DF_CACHE
-        _DF_CACHE.clear()
-    except Exception:
-        pass
-
-    audit_path = project_dir / "disambiguation_audit_authors_split.json"
-    log: list[dict] = []
-    if audit_path.exists():
-        log = json.loads(audit_path.read_text(encoding="utf-8"))
-    log.append({
-        "applied_at": time.time(),
-        "snapshot": str(snap.relative_to(storage.settings.storage_path)),
-        "approved_count": len(approved),
-        "replacements": affected,
-    })
-    audit_path.write_text(json.dumps(log, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    # Onaylanan split'leri proposals'tan düş — uygulananlar listede tekrar görünmesin.
-    applied_ids = {e.get("split_id") for e in approved if e.get("split_id")}
-    if applied_ids:
-        props = list_proposals(project_id, "authors")
-        props["splits"] = [s for s in props.get("splits", []) if s.get("split_id") not in applied_ids]
-        (project_dir / "disambiguation_authors.json").write_text(
-            json.dumps(props, ensure_ascii=False, indent=2), encoding="utf-8",
-        )
-
-    return {
-        "kind": "authors_split",
-        "approved_count": len(approved),
-        "replacements": affected,
-        "snapshot": str(snap.relative_to(storage.settings.storage_path)),
-    }
+    return _commit_apply(
+        project_id, project_dir, src, original, df,
+        kind="authors_split", proposals_kind="authors", list_key="splits", id_key="split_id",
+        approved=approved, affected=affected, details=False,
+    )
 
 
 def restore_snapshot(project_id: str, snapshot_relative: str) -> dict[str, Any]:
@@ -983,8 +963,6 @@ def restore_snapshot(project_id: str, snapshot_relative: str) -> dict[str, Any]:
     target = merger.merged_dataset_path(project_id)
     if target is None:
         raise HTTPException(409, "no_merged_data")
-    import shutil
     shutil.copy2(snap_path, target)
-    from services.filter_engine import _DF_CACHE
-    _DF_CACHE.clear()
+    filter_engine._DF_CACHE.clear()
     return {"restored_from": snapshot_relative, "into": str(target.relative_to(storage.settings.storage_path))}
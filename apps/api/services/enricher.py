@@ -16,12 +16,17 @@ from pathlib import Path
 from typing import Any
 
 import pandas as pd
+from bibex_core.modules import api_utils
+from bibex_core.modules.c1_utils import append_country_to_c1, parse_c1_address, split_c1_addresses
 from fastapi import HTTPException
 
 from config import settings
 from jobs.runner import JobContext
 from services import analyses, filter_engine, merger, storage
-from services.bibex_adapter import _suppress_stdio
+from services.bibex_adapter import _suppress_stdio, read_xlsx, to_xlsx
+from services.disambiguation.orcid import fetch_affiliations_for_doi
+from services.disambiguation.similarity import normalize_name
+from services.enrichment_cache import EnrichmentCache
 
 
 def _active_path(project_id: str) -> Path:
@@ -39,10 +44,32 @@ def _snapshot(project_id: str, df: pd.DataFrame, tag: str) -> str:
     snaps.mkdir(exist_ok=True)
     stamp = time.strftime("%Y%m%d_%H%M%S")
     p = snaps / f"pre_{tag}_{stamp}.xlsx"
-    df.to_excel(p, index=False)
+    to_xlsx(df, p)
     return str(p.relative_to(storage.settings.storage_path))
 
 
+def _snapshot_task(project_id: str, df: pd.DataFrame, tag: str) -> asyncio.Future:
+    """Snapshot'ı thread'de yazar — XLSX yazımı ağ-bağımlı API geçişiyle örtüşür.
+
+    Geçişler df'yi yerinde değiştirdiği için snapshot bir kopyadan yazılır; çağıran,
+    aktif dataset'in üzerine yazmadan önce görevi await etmelidir.
+    """
+    return asyncio.ensure_future(asyncio.to_thread(_snapshot, project_id, df.copy(), tag))
+
+
+def _write_active(df: pd.DataFrame, src: Path) -> None:
+    """Zenginleştirilmiş df'i aktif dataset'e yazar ve filter cache'ine koyar —
+    sonraki filter/önizleme az önce yazılan XLSX'i geri parse etmez. UID'siz df
+    (dataset henüz hiç yüklenmemiş) load_merged'e bırakılır: UID'yi o atar."""
+    to_xlsx(df, src)
+    try:
+        if "UID" not in df.columns:
+            raise KeyError("UID")
+        filter_engine.prime_cache(src, df)
+    except Exception:
+        filter_engine._DF_CACHE.clear()
+
+
 def _is_blank(v) -> bool:
     if v is None:
         return True
@@ -51,19 +78,24 @@ def _is_blank(v) -> bool:
             return True
     except (TypeError, ValueError):
         pass
-    return str(v).strip() in ("", "nan", "NaN")
+    s = str(v).strip()
+    return s == "" or s.lower() == "nan"
+
+
+def _blank_mask(series: pd.Series) -> pd.Series:
+    """`_is_blank`'in kolon-bazlı (vektörel) karşılığı — hücre başına Python çağrısı yok."""
+    return filter_engine.blank_mask(series)
 
 
 # Doluluk oranı raporu için izlenen alanlar (dashboard ile aynı küme)
 _RATE_FIELDS = ("DI", "AB", "TI", "AU", "PY", "DE", "ID", "WC", "SC", "C1", "OI", "EM", "CR", "TC", "LA")
 
 
-def _fill_rate(series) -> float:
-    total = len(series)
+def _fill_rate(blank: pd.Series, total: int) -> float:
+    """Doluluk oranı — `blank`: boş hücre maskesi (kolonun tamamı ya da bir alt kümesi)."""
     if not total:
         return 0.0
-    filled = int(sum(0 if _is_blank(x) else 1 for x in series))
-    return filled / total
+    return (total - int(blank.sum())) / total
 
 
 def _mirror_wc_sc(df: pd.DataFrame) -> int:
@@ -74,8 +106,8 @@ def _mirror_wc_sc(df: pd.DataFrame) -> int:
     """
     if "WC" not in df.columns or "SC" not in df.columns:
         return 0
-    wc_blank = df["WC"].map(_is_blank)
-    sc_blank = df["SC"].map(_is_blank)
+    wc_blank = _blank_mask(df["WC"])
+    sc_blank = _blank_mask(df["SC"])
     m1 = (~wc_blank) & sc_blank   # WC var, SC yok  -> SC = WC
     m2 = (~sc_blank) & wc_blank   # SC var, WC yok  -> WC = SC
     df.loc[m1, "SC"] = df.loc[m1, "WC"]
@@ -83,17 +115,30 @@ def _mirror_wc_sc(df: pd.DataFrame) -> int:
     return int(m1.sum() + m2.sum())
 
 
-async def _api_pass(ctx: JobContext, df: pd.DataFrame, *, lo: float = 0.05, hi: float = 0.95) -> dict[str, Any]:
-    """df'i YERİNDE güncelle: her DOI için tek extract_metadata çağrısı, tüm boş alanları doldur."""
-    from bibex_core.modules.api_utils import extract_metadata
+async def _api_pass(ctx: JobContext, df: pd.DataFrame, *, lo: float = 0.05, hi: float = 0.95,
+                    cache: EnrichmentCache | None = None) -> dict[str, Any]:
+    """df'i YERİNDE güncelle: her DOI için tek extract_metadata çağrısı, tüm boş alanları doldur.
 
+    `cache` verilirse daha önce sorgulanmış DOI'ler diskten karşılanır (API çağrısı yok).
+    """
     if "DI" not in df.columns:
         ctx.log("No DI (DOI) column — API pass skipped")
         return {"total": 0, "enriched": 0}
 
-    with_doi = df[df["DI"].astype(str).str.strip().ne("") & df["DI"].astype(str).str.upper().ne("NAN")]
-    total = len(with_doi)
-    ctx.log(f"API: scanning {total} records with a DOI")
+    # Boş-hücre haritası bir kez (kolon başına tek vektörel maske): hem iş kümesi
+    # seçimi hem satır başına "istenen alanlar" bundan okunur — hücre başına
+    # _is_blank (pd.isna + str) çağrısı yok.
+    cols = list(df.columns)
+    blank = filter_engine.blank_frame(df).to_numpy()
+    has_doi = ~blank[:, cols.index("DI")]
+    # Yalnız en az bir boş hücresi olan satırlar: API yalnız boş alanı doldurur,
+    # hiç boşluğu olmayan satır için çağrı yapmak sonuç değiştirmez.
+    selected = has_doi & blank.any(axis=1)
+    work = df.loc[selected]
+    work_blank = blank[selected]
+    total = len(work)
+    ctx.log(f"API: scanning {total} records with a DOI and missing fields "
+            f"(skipped {int(has_doi.sum()) - total} complete)")
 
     creds = {
         "scopus_api_key": settings.scopus_api_key or None,
@@ -104,32 +149,62 @@ async def _api_pass(ctx: JobContext, df: pd.DataFrame, *, lo: float = 0.05, hi:
 
     def _one(doi: str, current: dict):
         with _suppress_stdio():
-            return extract_metadata(doi, current, **creds)
+            return api_utils.extract_metadata(doi, current, **creds)
 
     enriched = 0
-    for i, (idx, row) in enumerate(with_doi.iterrows()):
-        if ctx.cancelled:
-            ctx.log("Cancelled by user")
-            break
-        doi = str(row["DI"]).strip()
-        current = {c: row[c] for c in df.columns}
-        try:
-            new_data = await asyncio.to_thread(_one, doi, current)
-            updated = 0
-            for k, v in new_data.items():
-                if k in df.columns and _is_blank(df.at[idx, k]) and not _is_blank(v):
-                    df.at[idx, k] = v
-                    updated += 1
-            if updated:
-                enriched += 1
-        except Exception as e:
-            ctx.log(f"DOI {doi}: {e}")
-
-        if (i + 1) % 10 == 0 or i == total - 1:
-            ctx.progress(lo + (hi - lo) * ((i + 1) / max(1, total)))
-            ctx.log(f"API: {i + 1}/{total} (enriched: {enriched})")
-
-    return {"total": int(total), "enriched": int(enriched)}
+    cached = 0
+    done = 0
+    # Bulunan değerler kolon → {satır: değer} olarak toplanır; df'e pass sonunda
+    # kolon başına tek atamayla yazılır (hücre başına df.at etiket çözümlemesi yok).
+    updates: dict[str, dict[Any, Any]] = {}
+    # itertuples(name=None): satır başına Series kurulmaz → (index, *değerler).
+    # Tek iterator'ı N worker paylaşır: ağ beklemesi örtüşür, bellekte en fazla N
+    # satır olur.
+    rows = zip(work.itertuples(index=True, name=None), work_blank)
+
+    async def _worker() -> None:
+        nonlocal enriched, cached, done
+        for (idx, *values), row_blank in rows:
+            if ctx.cancelled:
+                return
+            current = dict(zip(cols, values))
+            doi = str(current["DI"]).strip()
+            wanted = {c for c, b in zip(cols, row_blank) if b}
+            try:
+                found = cache.get(doi, wanted) if cache is not None else None
+                if found is None:
+                    new_data = await asyncio.to_thread(_one, doi, current)
+                    found = {k: v for k, v in new_data.items() if k in wanted and not _is_blank(v)}
+                    # Boş sonuç saklanmaz: geçici ağ hatası kalıcı "veri yok"a dönmesin
+                    if cache is not None and found:
+                        cache.set(doi, wanted, found)
+                else:
+                    cached += 1
+                for k, v in found.items():
+                    updates.setdefault(k, {})[idx] = v
+                if found:
+                    enriched += 1
+            except Exception as e:
+                ctx.log(f"DOI {doi}: {e}")
+
+            done += 1
+            if done == total or ctx.due():
+                ctx.progress(lo + (hi - lo) * (done / max(1, total)))
+                ctx.log(f"API: {done}/{total} (enriched: {enriched})")
+
+    workers = max(1, min(settings.enrichment_concurrency, total))
+    try:
+        await asyncio.gather(*(_worker() for _ in range(workers)))
+    finally:
+        # İptal/hata olsa da o ana kadar bulunanlar kaybolmasın
+        for col, vals in updates.items():
+            df.loc[list(vals), col] = pd.Series(vals)
+    if ctx.cancelled:
+        ctx.log("Cancelled by user")
+    if cached:
+        ctx.log(f"API: {cached} DOI(s) served from the enrichment cache")
+
+    return {"total": int(total), "enriched": int(enriched), "cached": int(cached)}
 
 
 async def _doi_pass(ctx: JobContext, df: pd.DataFrame, *, lo: float = 0.05, hi: float = 0.4) -> dict[str, Any]:
@@ -137,12 +212,10 @@ async def _doi_pass(ctx: JobContext, df: pd.DataFrame, *, lo: float = 0.05, hi:
 
     Dengeli eşik + otomatik yazma; emin olunmayan kayıt boş kalır. df YERİNDE güncellenir.
     """
-    from bibex_core.modules.api_utils import resolve_doi
-
     if "DI" not in df.columns or "TI" not in df.columns:
         return {"scanned": 0, "filled": 0}
 
-    blank_di = df[df["DI"].map(_is_blank) & ~df["TI"].map(_is_blank)]
+    blank_di = df[_blank_mask(df["DI"]) & ~_blank_mask(df["TI"])]
     total = len(blank_di)
     ctx.log(f"DOI lookup: {total} records without a DOI")
     if not total:
@@ -151,27 +224,30 @@ async def _doi_pass(ctx: JobContext, df: pd.DataFrame, *, lo: float = 0.05, hi:
 
     email = settings.crossref_email or None
     has_au, has_af, has_py = "AU" in df.columns, "AF" in df.columns, "PY" in df.columns
-    filled = 0
-    for i, (idx, row) in enumerate(blank_di.iterrows()):
-        if ctx.cancelled:
-            ctx.log("Cancelled by user")
-            break
-        title = row["TI"]
-        authors = row["AU"] if has_au and not _is_blank(row["AU"]) else (row["AF"] if has_af else None)
-        year = row["PY"] if has_py else None
-        try:
-            doi = await asyncio.to_thread(resolve_doi, title, authors, year, crossref_email=email)
-        except Exception as e:
-            ctx.log(f"DOI lookup error: {e}")
-            doi = None
-        if doi:
-            df.at[idx, "DI"] = doi
-            filled += 1
-        if (i + 1) % 10 == 0 or i == total - 1:
-            ctx.progress(lo + (hi - lo) * ((i + 1) / max(1, total)))
-            ctx.log(f"DOI lookup: {i + 1}/{total} (found: {filled})")
-
-    return {"scanned": int(total), "filled": int(filled)}
+    found: dict[Any, str] = {}  # satır → DOI; pass sonunda tek atamayla yazılır
+    try:
+        for i, (idx, row) in enumerate(blank_di.iterrows()):
+            if ctx.cancelled:
+                ctx.log("Cancelled by user")
+                break
+            title = row["TI"]
+            authors = row["AU"] if has_au and not _is_blank(row["AU"]) else (row["AF"] if has_af else None)
+            year = row["PY"] if has_py else None
+            try:
+                doi = await asyncio.to_thread(api_utils.resolve_doi, title, authors, year, crossref_email=email)
+            except Exception as e:
+                ctx.log(f"DOI lookup error: {e}")
+                doi = None
+            if doi:
+                found[idx] = doi
+            if i == total - 1 or ctx.due():
+                ctx.progress(lo + (hi - lo) * ((i + 1) / max(1, total)))
+                ctx.log(f"DOI lookup: {i + 1}/{total} (found: {len(found)})")
+    finally:
+        if found:
+            df.loc[list(found), "DI"] = pd.Series(found)
+
+    return {"scanned": int(total), "filled": len(found)}
 
 
 async def run_fill_all(ctx: JobContext, project_id: str) -> dict[str, Any]:
@@ -181,15 +257,15 @@ async def run_fill_all(ctx: JobContext, project_id: str) -> dict[str, Any]:
     İptal edilse bile o ana dek elde edilen API kazanımları korunur.
     """
     src = _active_path(project_id)
-    df = await asyncio.to_thread(pd.read_excel, src)
+    df = await asyncio.to_thread(read_xlsx, src)
     ctx.log(f"Loaded: {len(df)} records")
-    snap = _snapshot(project_id, df, "fill_all")
-    ctx.log("Snapshot taken")
+    snap_task = _snapshot_task(project_id, df, "fill_all")
     ctx.progress(0.05)
 
     # Doluluk: işlem ÖNCESİ oranlar (rapor için)
     track = [c for c in _RATE_FIELDS if c in df.columns]
-    before = {c: _fill_rate(df[c]) for c in track}
+    blank_before = {c: _blank_mask(df[c]) for c in track}
+    before = {c: _fill_rate(m, len(df)) for c, m in blank_before.items()}
 
     # 1) WC<->SC karşılıklı kopya — deterministik, DOI gerekmez, API'den ÖNCE (öncelikli).
     mirrored = _mirror_wc_sc(df)
@@ -200,12 +276,13 @@ async def run_fill_all(ctx: JobContext, project_id: str) -> dict[str, Any]:
     #    veya ctx.cancelled) durumunda bile o ana dek elde edilen kazanımlar KORUNUR —
     #    geçişleri sarıp finally'de aktif veri kümesine yazıyoruz.
     doi_stats = {"scanned": 0, "filled": 0}
-    api_stats = {"total": 0, "enriched": 0}
+    api_stats = {"total": 0, "enriched": 0, "cached": 0}
     addr_stats = {"rows": 0, "addr": 0, "dois": 0}
     cancelled = False
+    cache = EnrichmentCache(storage.project_dir(project_id), settings.enrichment_cache_ttl_days)
     try:
         doi_stats = await _doi_pass(ctx, df, lo=0.05, hi=0.4)
-        api_stats = await _api_pass(ctx, df, lo=0.4, hi=0.9)
+        api_stats = await _api_pass(ctx, df, lo=0.4, hi=0.9, cache=cache)
         # Adres tamamlama: kurumu olan ama ÜLKESİ eksik adreslere OpenAlex ülkesini
         # deterministik ekle (API, LLM yok, ücretsiz — kullanıcı şeffaf, Fill'in parçası).
         email = settings.crossref_email or settings.unpaywall_email or None
@@ -213,15 +290,20 @@ async def run_fill_all(ctx: JobContext, project_id: str) -> dict[str, Any]:
     except asyncio.CancelledError:
         cancelled = True
     finally:
+        cache.close()
+        # Snapshot diske inmeden aktif dataset'in üzerine yazılmaz
+        snap = await snap_task
+        ctx.log("Snapshot taken")
         _mirror_wc_sc(df)  # API tek alanı doldurduysa WC/SC eşitle
-        await asyncio.to_thread(df.to_excel, src, index=False)
-        filter_engine._DF_CACHE.clear()
+        await asyncio.to_thread(_write_active, df, src)
         storage.touch_project(project_id)
     if cancelled:
         raise asyncio.CancelledError()
 
     # Doluluk: işlem SONRASI oranlar + alan-bazlı öncesi/sonrası
-    after = {c: _fill_rate(df[c]) for c in track}
+    # Geçişler yalnız boş hücreyi doldurur, dolu hücreyi boşaltmaz → yalnız önceden
+    # boş olan hücreler yeniden denetlenir (tam kolon taraması yok).
+    after = {c: _fill_rate(_blank_mask(df.loc[m, c]), len(df)) for c, m in blank_before.items()}
     per_field_fill = {c: {"before": round(before[c], 4), "after": round(after[c], 4)} for c in track}
     overall_before = round(sum(before.values()) / len(before), 4) if before else 0.0
     overall_after = round(sum(after.values()) / len(after), 4) if after else 0.0
@@ -258,10 +340,6 @@ async def _complete_addresses_pass(ctx: JobContext, df: pd.DataFrame, email: str
     olan ülke EZİLMEZ, kurum/şehir korunur. Ayrım: parse_c1_address.country None ise
     adres ülkesizdir → ekle; doluysa (örn. 'India') atla. Ülke kaynağı: kurum adı
     OpenAlex kurumuyla eşleşirse o ülke, yoksa tek-ülke makalesinde o ülke."""
-    from bibex_core.modules.c1_utils import split_c1_addresses, parse_c1_address, append_country_to_c1
-    from services.disambiguation.orcid import fetch_affiliations_for_doi
-    from services.disambiguation.similarity import normalize_name
-
     cols = [c for c in ("C1", "C1raw") if c in df.columns]
     if not cols or "DI" not in df.columns:
         return {"rows": 0, "addr": 0, "dois": 0}
@@ -269,13 +347,14 @@ async def _complete_addresses_pass(ctx: JobContext, df: pd.DataFrame, email: str
     rows_changed = 0
     addr_filled = 0
     seen_doi: set[str] = set()
-    n = len(df)
-    for i, idx in enumerate(df.index):
+    # DOI'si ve adresi olan satırlar tek vektörel maskeyle seçilir — diğer satırlar
+    # için hücre başına Python denetimi yapılmaz.
+    rows = df.index[~_blank_mask(df["DI"]) & ~_blank_mask(df[main_col])]
+    n = len(rows)
+    for i, idx in enumerate(rows):
         if ctx.cancelled:
             break
         doi = df.at[idx, "DI"]
-        if doi is None or not str(doi).strip() or str(doi).strip().lower() == "nan":
-            continue
         # Ülkesi eksik adres(ler): parse_c1_address.country None olanlar (son bileşen ülke değil).
         tokens: list[str] = []
         for addr in split_c1_addresses(df.at[idx, main_col]):
@@ -316,7 +395,7 @@ async def _complete_addresses_pass(ctx: JobContext, df: pd.DataFrame, email: str
         if changed:
             rows_changed += 1
             addr_filled += len(append_map)
-        if (i % 25) == 0:
+        if ctx.due():
             ctx.progress(min(hi, lo + (hi - lo) * (i / max(1, n))))
     return {"rows": rows_changed, "addr": addr_filled, "dois": len(seen_doi)}
 
@@ -326,13 +405,17 @@ async def _complete_addresses_pass(ctx: JobContext, df: pd.DataFrame, email: str
 async def run_api_enrichment(ctx: JobContext, project_id: str, sources: list[str] | None = None) -> dict[str, Any]:
     """Yalnız API geçişi — aktif dataset'e yazar."""
     src = _active_path(project_id)
-    df = await asyncio.to_thread(pd.read_excel, src)
+    df = await asyncio.to_thread(read_xlsx, src)
     ctx.log(f"Loaded: {len(df)} records")
-    snap = _snapshot(project_id, df, "api")
+    snap_task = _snapshot_task(project_id, df, "api")
     ctx.progress(0.05)
-    stats = await _api_pass(ctx, df, lo=0.05, hi=0.95)
-    await asyncio.to_thread(df.to_excel, src, index=False)
-    filter_engine._DF_CACHE.clear()
+    cache = EnrichmentCache(storage.project_dir(project_id), settings.enrichment_cache_ttl_days)
+    try:
+        stats = await _api_pass(ctx, df, lo=0.05, hi=0.95, cache=cache)
+    finally:
+        cache.close()
+        snap = await snap_task
+    await asyncio.to_thread(_write_active, df, src)
     storage.touch_project(project_id)
     ctx.progress(1.0)
     return {"method": "api", "total": stats["total"], "enriched": stats["enriched"], "snapshot": snap}
@@ -0,0 +1,78 @@
+"""SQLite-backed cache for API enrichment results.
+
+Stores, per DOI, the field values the metadata APIs returned together with
+the fields that were missing when they were queried, so re-running
+enrichment on a project serves repeat DOIs from disk instead of querying
+every API again.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+# Kayıt biçimi değişirse artır — eski satırlar anahtar uyuşmadığı için yok sayılır
+SCHEMA_VERSION = "v1"
+
+
+class EnrichmentCache:
+    def __init__(self, project_dir: Path, max_age_days: float | None = None):
+        self.path = project_dir / "enrichment_cache.sqlite"
+        # Bu yaştan eski kayıtlar sunulmaz (API verisi zamanla güncellenir: atıf
+        # sayısı, OA durumu); None/0 = süresiz
+        self.max_age = max_age_days * 86400 if max_age_days else None
+        self.conn = sqlite3.connect(self.path)
+        # DOI başına set() commit eder: WAL + NORMAL ile her commit tam fsync
+        # beklemez (çökmede yalnız son birkaç kayıt kaybolabilir — önbellek için yeterli)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, "
+            "requested TEXT NOT NULL, "
+            "value TEXT NOT NULL, "
+            "created_at REAL NOT NULL"
+            ")"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def _key(doi: str) -> str:
+        return f"{SCHEMA_VERSION}:{doi.strip().lower()}"
+
+    def get(self, doi: str, wanted: Iterable[str]) -> Optional[dict[str, Any]]:
+        """Önbellekteki API değerleri — yalnız o sorgu `wanted` alanlarının hepsini
+        istemişse (aksi halde eksik alan için API hiç sorulmamış olabilir)."""
+        cur = self.conn.execute(
+            "SELECT requested, value, created_at FROM cache WHERE key = ?", (self._key(doi),),
+        )
+        row = cur.fetchone()
+        if row is None:
+            return None
+        if self.max_age is not None and time.time() - row[2] > self.max_age:
+            return None
+        wanted = set(wanted)
+        if not wanted <= set(json.loads(row[0])):
+            return None
+        return {k: v for k, v in json.loads(row[1]).items() if k in wanted}
+
+    def set(self, doi: str, requested: Iterable[str], value: dict[str, Any]) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cache(key, requested, value, created_at) VALUES (?, ?, ?, ?)",
+            (
+                self._key(doi),
+                json.dumps(sorted(requested)),
+                json.dumps(value, ensure_ascii=False, default=str),
+                time.time(),
+            ),
+        )
+        self.conn.commit()
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
@@ -12,10 +12,11 @@ from pathlib import Path
 from typing import Any, Optional
 
 import pandas as pd
+from bibex_core.xlsx2vos import convert_df_to_wos
 from fastapi import HTTPException
 
 from services import filter_engine, storage
-from services.bibex_adapter import _suppress_stdio
+from services.bibex_adapter import _suppress_stdio, to_xlsx
 
 
 VALID_FORMATS = {"wos", "vos", "bib", "ris", "csv", "xlsx", "tsv"}
@@ -72,19 +73,15 @@ def export(
     output = exports / Path(name).name
 
     if fmt == "xlsx":
-        df.to_excel(output, index=False)
+        to_xlsx(df, output)
     elif fmt == "csv":
         df.to_csv(output, index=False, encoding="utf-8")
     elif fmt == "tsv":
         df.to_csv(output, sep="\t", index=False, encoding="utf-8")
     elif fmt == "wos":
-        # Geçici XLSX üzerinden bibex_core.xlsx2vos
-        from bibex_core.xlsx2vos import convert_excel_to_wos
-        tmp_xlsx = exports / f"_tmp_{stamp}.xlsx"
-        df.to_excel(tmp_xlsx, index=False)
+        # bibex_core.xlsx2vos — df doğrudan (geçici XLSX yazıp okumadan)
         with _suppress_stdio():
-            convert_excel_to_wos(str(tmp_xlsx), str(output))
-        tmp_xlsx.unlink(missing_ok=True)
+            convert_df_to_wos(df, str(output))
     elif fmt == "vos":
         # VOSviewer için tab-separated (bibliometrix uyumlu temel kolonlar)
         cols = [c for c in ("AU", "TI", "SO", "PY", "VL", "IS", "PG", "DI", "DE", "ID", "AB", "TC", "DT", "DB", "WC", "SC")
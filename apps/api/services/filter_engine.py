@@ -7,14 +7,17 @@ produces facets and paginated, projected result pages for the UI.
 
 from __future__ import annotations
 
+import itertools
 import re
 from functools import lru_cache
 from pathlib import Path
 from typing import Any, Iterable, Optional
 
+import numpy as np
 import pandas as pd
 
 from services import merger
+from services.bibex_adapter import read_xlsx, to_xlsx
 
 
 # ---------- Dataset yükleme (cache) ----------
@@ -50,23 +53,39 @@ def _ensure_uid_column(df: pd.DataFrame) -> bool:
     return True
 
 
+def _fill_object_blanks(df: pd.DataFrame) -> pd.DataFrame:
+    # Tüm string sütunları normalize et — boş hücreler için empty string
+    for col in df.columns:
+        if df[col].dtype == "object":
+            df[col] = df[col].fillna("")
+    return df
+
+
+def prime_cache(path: Path, df: pd.DataFrame) -> None:
+    """Az önce `path`'e yazılmış df'i (UID'li) cache'e koy — ilk load_merged
+    XLSX'i geri okumaz. df, read_excel'in döndüreceği biçime çevrilerek saklanır."""
+    from bibex_core.parquet_cache import excel_view
+
+    view = _fill_object_blanks(excel_view(df))
+    _DF_CACHE.clear()
+    _DF_CACHE[(str(path), path.stat().st_mtime)] = view
+
+
 def load_merged(project_id: str) -> pd.DataFrame:
     p = merger.merged_dataset_path(project_id)
     if p is None:
         raise FileNotFoundError("Birleştirilmiş veri yok — önce Merge çalıştırın")
-    mtime = p.stat().st_mtime
-    key = (str(p), mtime)
+    key = (str(p), p.stat().st_mtime)
     if key not in _DF_CACHE:
         _DF_CACHE.clear()  # tek-kullanıcı, tek-dataset
-        df = pd.read_excel(p)
-        # Tüm string sütunları normalize et — boş hücreler için empty string
-        for col in df.columns:
-            if df[col].dtype == "object":
-                df[col] = df[col].fillna("")
+        df = _fill_object_blanks(read_xlsx(p))
         # Her satıra UID ata (yoksa) ve kalıcı olarak diske yaz
         if _ensure_uid_column(df):
             try:
-                df.to_excel(p, index=False)
+                to_xlsx(df, p)
+                # Kendi yazımımız mtime'ı değiştirdi — yeni anahtarla sakla ki bir
+                # sonraki çağrı az önce yazdığımız dosyayı yeniden okumasın
+                key = (str(p), p.stat().st_mtime)
             except Exception:
                 pass  # write hatası ana akışı durdurmasın — UID memory'de yine var
         _DF_CACHE[key] = df
@@ -79,6 +98,64 @@ def _has_col(df: pd.DataFrame, col: str) -> bool:
     return col in df.columns
 
 
+# Kırpılmış hücre bunlardan biriyse boştur: "" ve 'nan'ın tüm harf varyantları.
+# isin (hash araması) tek geçişte bakar — ayrı bir .str.lower() kopyası yok;
+# lower()'ı "nan" olan başka bir Unicode dizisi yoktur, sonuç aynıdır.
+_BLANK_TOKENS = frozenset([""] + ["".join(p) for p in itertools.product("nN", "aA", "nN")])
+
+
+def blank_mask(series: pd.Series) -> pd.Series:
+    """Boş hücre maskesi: NaN/None, boş ya da yalnız boşluk string, veya 'nan'
+    (harf duyarsız). Sayısal/tarih kolonlarında yalnız NaN boş olabilir —
+    tüm kolonu astype(str) ile metne çevirmeye gerek yok; object kolonda .str
+    yalnız string hücreleri işler (diğerleri NaN döner → boş sayılmaz)."""
+    na = series.isna()
+    if series.dtype.kind in "biufcmM":
+        return na
+    try:
+        s = series.str.strip()
+    except AttributeError:  # hiç string içermeyen object kolon
+        return na
+    return na | s.isin(_BLANK_TOKENS)
+
+
+def blank_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Tüm tablonun boş hücre maskesi (blank_mask tanımıyla), tek bir bool blokta.
+
+    Sayısal/tarih kolonları tek bir blok isna() geçişiyle işaretlenir; yalnız
+    metin kolonları tek tek blank_mask'ten geçer. Kolon Series'lerini
+    pd.concat ile yan yana dizmekten ucuzdur (ara Series/hizalama yok)."""
+    out = np.zeros(df.shape, dtype=bool, order="F")
+    numeric = [dt.kind in "biufcmM" for dt in df.dtypes]
+    pos = [i for i, n in enumerate(numeric) if n]
+    if pos:
+        out[:, pos] = df.iloc[:, pos].isna().to_numpy()
+    for i, n in enumerate(numeric):
+        if not n:
+            out[:, i] = blank_mask(df.iloc[:, i]).to_numpy(dtype=bool, na_value=False)
+    return pd.DataFrame(out, index=df.index, columns=df.columns)
+
+
+def blank_counts(df: pd.DataFrame) -> pd.Series:
+    """Kolon başına boş hücre sayısı (blank_mask tanımıyla)."""
+    return blank_frame(df).sum().astype("int64")
+
+
+def _per_unique(series: pd.Series, fn) -> pd.Series:
+    """`fn(series)` ile aynı sonuç, ama fn yalnız benzersiz değerlere uygulanır
+    (sözlük kodlaması): DT/LA/DB/PY/SO gibi düşük kardinaliteli kolonlarda
+    string dönüşümü satır sayısından bağımsız kalır."""
+    codes, uniques = pd.factorize(series)
+    if not len(uniques):
+        return fn(series)
+    out = pd.Series(fn(pd.Series(uniques)).to_numpy()[codes], index=series.index)
+    # factorize None ile NaN'ı tek koda katlar (str() farklı) — NA satırları ayrıca
+    na = codes < 0
+    if na.any():
+        out[na] = fn(series[na]).to_numpy()
+    return out
+
+
 def _coerce_int_series(s: pd.Series) -> pd.Series:
     return pd.to_numeric(s, errors="coerce")
 
@@ -100,8 +177,7 @@ def _apply_in(df: pd.DataFrame, col: str, values: list[str]) -> pd.Series:
     if not values or not _has_col(df, col):
         return pd.Series(True, index=df.index)
     norm = [str(v).strip().upper() for v in values if v]
-    series = df[col].astype(str).str.upper().str.strip()
-    return series.isin(norm)
+    return _per_unique(df[col], lambda u: u.astype(str).str.upper().str.strip().isin(norm))
 
 
 def _apply_contains_any(df: pd.DataFrame, col: str, values: list[str]) -> pd.Series:
@@ -171,13 +247,11 @@ def _apply_quality(df: pd.DataFrame, quality: dict[str, Any]) -> pd.Series:
     for field in quality.get("missing", []) or []:
         if not _has_col(df, field):
             continue
-        s = df[field].astype(str).str.strip()
-        mask &= (s == "") | (s.str.upper() == "NAN")
+        mask &= blank_mask(df[field])
     for field in quality.get("has", []) or []:
         if not _has_col(df, field):
             continue
-        s = df[field].astype(str).str.strip()
-        mask &= (s != "") & (s.str.upper() != "NAN")
+        mask &= ~blank_mask(df[field])
     return mask
 
 
@@ -217,8 +291,7 @@ DEFAULT_FACET_FIELDS = ["PY", "DT", "LA", "DB"]
 
 
 def _value_counts(series: pd.Series, top: int = 30) -> list[dict]:
-    s = series.astype(str).str.strip()
-    s = s[(s != "") & (s.str.upper() != "NAN")]
+    s = _per_unique(series, lambda u: u.astype(str).str.strip().where(~blank_mask(u)))
     counts = s.value_counts().head(top)
     return [{"value": str(k), "count": int(v)} for k, v in counts.items()]
 
@@ -8,14 +8,18 @@ finalizes its own analysis folder.
 
 from __future__ import annotations
 
+import asyncio
+import os
 from pathlib import Path
 from typing import Any
 
 import pandas as pd
+from bibex_core.parquet_cache import read_sidecar
 from fastapi import HTTPException
 
 from jobs.runner import JobContext
 from services import analyses, converter, storage
+from services.bibex_adapter import read_xlsx, write_xlsx
 
 
 def _project_paths(project_id: str) -> tuple[Path, Path, Path]:
@@ -27,65 +31,89 @@ def _project_paths(project_id: str) -> tuple[Path, Path, Path]:
     return root, root / "raw", root / "processed"
 
 
-def _find_xlsx(processed: Path, raw: Path, hint: str) -> Path | None:
-    """Önce processed, sonra raw'da ara."""
-    for d in (processed, raw):
-        if not d.exists():
-            continue
-        for f in d.iterdir():
-            if not f.is_file():
-                continue
-            if f.suffix.lower() == ".xlsx" and hint in f.name.lower():
-                return f
+_SOURCE_EXTS = (".csv", ".txt", ".isi", ".xlsx")
+
+
+def _dir_files(d: Path) -> list[Path]:
+    """Klasördeki dosyalar — tek os.scandir geçişi; klasör yoksa boş liste.
+    (exists + iterdir + her girdi için is_file stat'ı yerine.)"""
+    try:
+        with os.scandir(d) as it:
+            return [Path(e.path) for e in it if e.is_file()]
+    except FileNotFoundError:
+        return []
+
+
+def _find_xlsx(files: list[Path], hint: str) -> Path | None:
+    for f in files:
+        if f.suffix.lower() == ".xlsx" and hint in f.name.lower():
+            return f
     return None
 
 
+def _locate_sources(processed: Path, raw: Path) -> tuple[Path | None, Path | None, bool]:
+    """(scopus_xlsx, wos_xlsx, ham_veri_var) — her klasör bir kez taranır.
+    XLSX aranırken önce processed, sonra raw'a bakılır."""
+    raw_files = _dir_files(raw)
+    files = _dir_files(processed) + raw_files
+    scp_xlsx = _find_xlsx(files, "scopus") or _find_xlsx(files, "scp")
+    wos_xlsx = _find_xlsx(files, "wos")
+    has_raw = any(f.suffix.lower() in _SOURCE_EXTS for f in raw_files)
+    return scp_xlsx, wos_xlsx, has_raw
+
+
 def check_ready_to_merge(project_id: str) -> None:
     """Merge başlamadan ÖNCE çağrılır (job submit etmeden). Hazırlık artık merge
     job'unun ilk fazında ÖRTÜK yapıldığından ham veri yeterlidir; yalnızca hiç
     kaynak veri yoksa 409 'no_source_data' fırlatır (UI kullanıcıyı yüklemeye yönlendirir).
     """
     _, raw, processed = _project_paths(project_id)
-    has_xlsx = bool(
-        _find_xlsx(processed, raw, "scopus") or _find_xlsx(processed, raw, "scp")
-        or _find_xlsx(processed, raw, "wos")
-    )
-    has_raw = raw.exists() and any(
-        f.is_file() and f.suffix.lower() in (".csv", ".txt", ".isi", ".xlsx")
-        for f in raw.iterdir()
-    )
-    if has_xlsx or has_raw:
+    scp_xlsx, wos_xlsx, has_raw = _locate_sources(processed, raw)
+    if scp_xlsx or wos_xlsx or has_raw:
         return
     raise HTTPException(409, "no_source_data")
 
 
+def _read_prepared(path: Path) -> pd.DataFrame:
+    """Hazırlanmış XLSX'i yükle — dönüşümün bıraktığı güncel Parquet sidecar'ı
+    varsa XLSX parse'ı atlanır (pyarrow yoksa / XLSX değiştiyse read_excel)."""
+    df = read_sidecar(str(path))
+    return df if df is not None else read_xlsx(path)
+
+
 def _load_inputs(
-    project_id: str, ctx: JobContext | None = None
+    project_id: str, ctx: JobContext | None = None,
+    frames: dict[Path, pd.DataFrame] | None = None,
 ) -> tuple[pd.DataFrame | None, pd.DataFrame | None]:
     """Scopus + WoS XLSX'leri yükle. Eksik biri varsa CSV/TXT'den otomatik dönüştür.
 
     Tek kaynak varsa onu döndürür, diğeri None olur (birleştirme adımı bunu
     passthrough yapar). YALNIZCA ikisi de yoksa hata verir — kullanıcı sadece
     Scopus ya da sadece WoS verisini hazırlamak isteyebilir.
+
+    frames: auto_prepare'in az önce ürettiği df'ler (XLSX yolu → df); seçilen
+    XLSX bunlardan biriyse diskten okunmaz.
     """
     _, raw, processed = _project_paths(project_id)
 
-    scp_xlsx = _find_xlsx(processed, raw, "scopus") or _find_xlsx(processed, raw, "scp")
-    wos_xlsx = _find_xlsx(processed, raw, "wos")
+    scp_xlsx, wos_xlsx, has_raw = _locate_sources(processed, raw)
 
     # Hazırlanmış (processed) XLSX yoksa merge ham CSV/TXT'den OTOMATİK üretmez —
     # bu 1. adımı (Preparing) baypas ederdi. Bunun yerine, ham veri var ama hazırlık
     # yapılmamışsa kullanıcıyı 1. adıma yönlendiren net bir hata döndürürüz.
     if scp_xlsx is None and wos_xlsx is None:
-        has_raw = raw.exists() and any(
-            f.suffix.lower() in (".csv", ".txt", ".isi", ".xlsx")
-            for f in raw.iterdir() if f.is_file()
-        )
         # Ham veri VAR ama hazırlanmamış → "önce hazırla"; hiç veri yoksa → "önce yükle".
         raise HTTPException(409, "not_prepared" if has_raw else "no_source_data")
 
-    scp_df = pd.read_excel(scp_xlsx) if scp_xlsx is not None else None
-    wos_df = pd.read_excel(wos_xlsx) if wos_xlsx is not None else None
+    frames = frames or {}
+
+    def _get(path: Path | None) -> pd.DataFrame | None:
+        if path is None:
+            return None
+        return frames[path] if path in frames else _read_prepared(path)
+
+    scp_df = _get(scp_xlsx)
+    wos_df = _get(wos_xlsx)
     if ctx:
         ctx.log(
             f"Sources — Scopus: {len(scp_df) if scp_df is not None else 'none'}, "
@@ -101,7 +129,6 @@ async def _run_single_source(
     """Tek kaynak (yalnız Scopus veya yalnız WoS) — birleştirilecek ikinci veri yok.
     Tek kaynağı doğrudan analiz veri seti yapar (dedup yok), filtreye hazır.
     """
-    import asyncio
     df = scp_df if scp_df is not None else wos_df
     src = "Scopus" if scp_df is not None else "WoS"
     ctx.log(f"Single source ({src}) — no second dataset to merge, used directly (no dedup).")
@@ -109,20 +136,25 @@ async def _run_single_source(
 
     analysis_id, adir = analyses.create_analysis(project_id, "single")
     ctx.log(f"Analysis folder: {analysis_id}")
-    output_xlsx = adir / "merged.xlsx"
-    await asyncio.to_thread(lambda: df.to_excel(output_xlsx, index=False))
-    ctx.progress(0.7)
-
+    files = analyses.AnalysisFiles.of(adir)
+    output_xlsx = files.merged
     scp_count = int(len(scp_df)) if scp_df is not None else 0
     wos_count = int(len(wos_df)) if wos_df is not None else 0
-    statistic_xlsx = adir / "Statistic.xlsx"
-    try:
-        from services.smart_merger import _write_statistic_smart
-        await asyncio.to_thread(
-            _write_statistic_smart, int(len(df)), wos_count, scp_count, df, statistic_xlsx,
-        )
-    except Exception as e:
-        ctx.log(f"Statistic.xlsx could not be generated: {e}")
+    from services.smart_merger import _write_statistic_smart
+
+    # merged.xlsx ile Statistic.xlsx eşzamanlı yazılır; istatistik hatası işi düşürmez.
+    merged_res, stat_res = await asyncio.gather(
+        write_xlsx(df, output_xlsx),
+        asyncio.to_thread(
+            _write_statistic_smart, int(len(df)), wos_count, scp_count, df, files.statistic,
+        ),
+        return_exceptions=True,
+    )
+    if isinstance(merged_res, BaseException):
+        raise merged_res
+    if isinstance(stat_res, BaseException):
+        ctx.log(f"Statistic.xlsx could not be generated: {stat_res}")
+    ctx.progress(0.7)
 
     try:
         from services import filter_engine
@@ -153,7 +185,6 @@ async def run_merge(ctx: JobContext, project_id: str) -> dict[str, Any]:
     iki kaynak varsa bağımsız smart_merger pipeline'ı çalışır — kendi analiz
     klasörünü açar, finalize eder ve özetini döndürür.
     """
-    import asyncio
 
     ctx.log("Starting merge (Smart Merge)")
     ctx.progress(0.05)
@@ -161,10 +192,12 @@ async def run_merge(ctx: JobContext, project_id: str) -> dict[str, Any]:
     # Örtük hazırlık — ham CSV/TXT'leri konsolide XLSX'e çevir (ayrı Prepare adımı yok).
     # Skip-if-fresh: yalnız ham dosya processed'tan yeniyse yeniden çevirir.
     ctx.log("Preparing sources (CSV/TXT → XLSX)")
-    await asyncio.to_thread(converter.auto_prepare, project_id, ctx)
+    # Yeni dönüştürülen kaynakların df'leri bellekte döner — XLSX'i geri okumaya gerek yok.
+    frames: dict[Path, pd.DataFrame] = {}
+    await asyncio.to_thread(converter.auto_prepare, project_id, ctx, frames)
 
     # Kaynakları yükle — tek-kaynak tespiti dispatch'ten önce yapılmalı.
-    scp_df, wos_df = await asyncio.to_thread(_load_inputs, project_id, ctx)
+    scp_df, wos_df = await asyncio.to_thread(_load_inputs, project_id, ctx, frames)
 
     # Tek kaynak: birleştirilecek ikinci veri yok → passthrough (dedup yok),
     # doğrudan filtreye hazır analiz veri seti.
@@ -172,8 +205,9 @@ async def run_merge(ctx: JobContext, project_id: str) -> dict[str, Any]:
         return await _run_single_source(ctx, project_id, scp_df, wos_df)
 
     # İki kaynak da var → Smart Merge (bağımsız pipeline, kendi klasörünü açar).
+    # Yüklenen df'ler aktarılır: kaynaklar ikinci kez okunmaz.
     from services import smart_merger
-    return await smart_merger.run_smart_merge(ctx, project_id)
+    return await smart_merger.run_smart_merge(ctx, project_id, inputs=(scp_df, wos_df))
 
 
 def list_merged(project_id: str) -> list[dict]:
@@ -19,11 +19,13 @@ import unicodedata
 from pathlib import Path
 from typing import Any, Optional
 
+import numpy as np
 import pandas as pd
 
 from config import settings
 from jobs.runner import JobContext
 from services import analyses, audit, filter_engine, storage
+from services.bibex_adapter import excel_writer, read_xlsx, to_xlsx, write_xlsx
 from services.disambiguation.similarity import jaro_winkler, name_initials, normalize_name
 
 
@@ -75,7 +77,6 @@ STOPWORDS: set[str] = {
 
 _DOI_PREFIX_RE = re.compile(r"^https?://(dx\.)?doi\.org/", re.IGNORECASE)
 _PUNCT_RE = re.compile(r"[^a-z0-9 ]+")
-_WS_RE = re.compile(r"\s+")
 _LATEX_RE = re.compile(r"\\[a-z]+\{[^}]*\}|\\[\\\\&%$#_{}~^]")
 _ISSN_RE = re.compile(r"[^0-9Xx]")
 
@@ -121,8 +122,7 @@ def normalize_title(raw: Any) -> str:
     s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
     s = s.lower()
     s = _PUNCT_RE.sub(" ", s)
-    s = _WS_RE.sub(" ", s).strip()
-    # Stopword removal
+    # Stopword removal (split() boşluk dizilerini de daraltır)
     tokens = [t for t in s.split() if t not in STOPWORDS]
     return " ".join(tokens)
 
@@ -158,6 +158,17 @@ def normalize_author_surname(raw: Any) -> str:
     return surname.upper()
 
 
+def author_surname_keys(au: pd.Series) -> pd.Series:
+    """`au.apply(normalize_author_surname)` ile aynı sonuç, ama ilk yazar kolon
+    boyunca tek vektörel split ile ayrılır ve normalize yalnız benzersiz ilk
+    yazarlar için çalışır — aynı ilk yazar kayıtlar arasında sık tekrar eder."""
+    text = au.astype(str).where(au.notna(), "")
+    first = text.str.split(r"[;|]", n=1, regex=True).str[0]
+    codes, uniques = pd.factorize(first)
+    keys = np.array([normalize_author_surname(u) for u in uniques], dtype=object)
+    return pd.Series(keys[codes], index=au.index, dtype=object)
+
+
 def normalize_issn(raw: Any) -> Optional[str]:
     """ISSN'i 8 hane (rakam + X) forma indir; geçersiz → None."""
     s = _to_str(raw)
@@ -425,14 +436,15 @@ def merge_pair_with_preferences(
 ) -> tuple[dict, list[dict]]:
     """İki kaydı birleştir, çakışmaları logla.
 
+    all_columns: birleştirilecek kolonlar — internal `_norm_*` kolonları çağıran
+    tarafça bir kez elenmiş olmalı (bkz. merge_columns), çift başına değil.
+
     Dönüş: (merged_row, conflicts_list)
     """
     merged: dict[str, Any] = {}
     conflicts: list[dict] = []
 
     for col in all_columns:
-        if col.startswith("_norm_"):
-            continue  # internal kolonlar
         w_val = w.get(col)
         s_val = s.get(col)
         chosen, source = _apply_preference(col, w_val, s_val)
@@ -469,21 +481,21 @@ def _write_match_audit(rows: list[dict], out: Path) -> None:
     cols = ["pair_id", "wos_index", "scp_index", "doi", "stage", "stage_label",
             "confidence", "jw_title", "year_diff", "surname_match", "reason"]
     cols = [c for c in cols if c in df.columns]
-    df[cols].to_excel(out, index=False)
+    to_xlsx(df[cols], out)
 
 
 def _write_conflict_log(conflicts: list[dict], out: Path) -> None:
     if not conflicts:
         return
     df = pd.DataFrame(conflicts)
-    df.to_excel(out, index=False)
+    to_xlsx(df, out)
 
 
 def _write_borderline_queue(items: list[dict], out: Path) -> None:
     if not items:
         return
     df = pd.DataFrame(items)
-    df.to_excel(out, index=False)
+    to_xlsx(df, out)
 
 
 def _write_lost_records(df: pd.DataFrame, out: Path) -> None:
@@ -491,7 +503,20 @@ def _write_lost_records(df: pd.DataFrame, out: Path) -> None:
         return
     # Internal _norm_* kolonlarını çıkar
     cols = [c for c in df.columns if not c.startswith("_norm_")]
-    df[cols].to_excel(out, index=False)
+    to_xlsx(df[cols], out)
+
+
+def _missing_status(pct: float) -> str:
+    """Eksiklik yüzdesi → Statistic.xlsx 'Status' etiketi."""
+    if pct == 0:
+        return "Excellent"
+    if pct < 5:
+        return "Very Good"
+    if pct < 15:
+        return "Good"
+    if pct < 40:
+        return "Poor"
+    return "Very Poor"
 
 
 def _write_statistic_smart(
@@ -507,33 +532,19 @@ def _write_statistic_smart(
         "Common Columns": 0,  # placeholder
     }])
 
-    # Field stats
-    field_rows = []
-    for col in merged_df.columns:
-        if col.startswith("_norm_"):
-            continue
-        missing = int(merged_df[col].apply(_is_empty).sum())
-        pct = (missing / total * 100) if total else 0
-        if pct == 0:
-            status = "Excellent"
-        elif pct < 5:
-            status = "Very Good"
-        elif pct < 15:
-            status = "Good"
-        elif pct < 40:
-            status = "Poor"
-        else:
-            status = "Very Poor"
-        field_rows.append({
-            "": col,
-            "Description": col,
-            "Missing Count": missing,
-            "Missing %": round(pct, 2),
-            "Status": status,
-        })
-    fields = pd.DataFrame(field_rows)
-
-    with pd.ExcelWriter(out, engine="openpyxl") as writer:
+    # Field stats — kolon sözlüğünden tek seferde (satır-dict listesi yerine)
+    cols = [c for c in merged_df.columns if not c.startswith("_norm_")]
+    missing = filter_engine.blank_counts(merged_df[cols]).tolist()
+    pcts = [(m / total * 100) if total else 0 for m in missing]
+    fields = pd.DataFrame({
+        "": cols,
+        "Description": cols,
+        "Missing Count": missing,
+        "Missing %": [round(p, 2) for p in pcts],
+        "Status": [_missing_status(p) for p in pcts],
+    })
+
+    with excel_writer(out) as writer:
         general.to_excel(writer, sheet_name="General Stats", index=False)
         fields.to_excel(writer, sheet_name="Field Stats", index=False)
 
@@ -548,7 +559,7 @@ def _borderline_state_path(project_id: str, adir: Optional[Path] = None) -> Opti
         adir = analyses.get_active_analysis_dir(project_id)
     if adir is None:
         return None
-    return adir / "borderline_state.json"
+    return analyses.AnalysisFiles.of(adir).borderline_state
 
 
 def _read_borderline_state(project_id: str, adir: Optional[Path] = None) -> dict[str, dict]:
@@ -573,11 +584,17 @@ def _write_borderline_state(project_id: str, state: dict[str, dict], adir: Optio
 #  ANA ORKESTRATÖR
 # ════════════════════════════════════════════════════════════════════════
 
-async def run_smart_merge(ctx: JobContext, project_id: str) -> dict[str, Any]:
+async def run_smart_merge(
+    ctx: JobContext, project_id: str,
+    inputs: tuple[pd.DataFrame, pd.DataFrame] | None = None,
+) -> dict[str, Any]:
     """Smart Merge ana iş akışı. Result dict döner (audit hook için).
 
     Yeni bir analiz klasörü oluşturur, çıktıları oraya yazar ve sonunda
     aktif analiz olarak işaretler. Hata durumunda yarım klasör temizlenir.
+
+    inputs: çağıranın zaten yüklediği (scp_df, wos_df) — verilirse kaynaklar
+    yeniden okunmaz (df'ler kopyalanarak kullanılır, çağıranınkiler değişmez).
     """
 
     ctx.log("Starting Smart Merge...")
@@ -591,7 +608,10 @@ async def run_smart_merge(ctx: JobContext, project_id: str) -> dict[str, Any]:
     from services.merger import _load_inputs
 
     try:
-        scp_df, wos_df = await asyncio.to_thread(_load_inputs, project_id, ctx)
+        if inputs is not None:
+            scp_df, wos_df = inputs
+        else:
+            scp_df, wos_df = await asyncio.to_thread(_load_inputs, project_id, ctx)
     except Exception:
         try:
             analyses.delete_analysis(project_id, analysis_id)
@@ -613,13 +633,18 @@ async def run_smart_merge(ctx: JobContext, project_id: str) -> dict[str, Any]:
         df["_norm_doi"] = df.get("DI", pd.Series([""] * len(df))).apply(normalize_doi)
         df["_norm_title"] = df.get("TI", pd.Series([""] * len(df))).apply(normalize_title)
         df["_norm_year"] = df.get("PY", pd.Series([""] * len(df))).apply(normalize_year)
-        df["_norm_surname"] = df.get("AU", pd.Series([""] * len(df))).apply(normalize_author_surname)
+        df["_norm_surname"] = author_surname_keys(df.get("AU", pd.Series([""] * len(df))))
         df["_norm_issn"] = df.get("SN", pd.Series([""] * len(df))).apply(normalize_issn)
         df["_norm_pmid"] = df.get("PM", pd.Series([""] * len(df))).apply(normalize_id_token)
         df["_norm_ut"] = df.get("UT", pd.Series([""] * len(df))).apply(normalize_id_token)
         df["_norm_journal"] = df.get("SO", pd.Series([""] * len(df))).apply(normalize_title)
     ctx.progress(0.20)
 
+    # Satır sözlükleri bir kez kurulur: aday döngüsü her çiftte aynı Scopus satırını
+    # yeniden .loc[].to_dict() ile kuruyordu (blok başına |W|×|S| kopya).
+    wos_recs = dict(zip(wos_df.index, wos_df.to_dict("records")))
+    scp_recs = dict(zip(scp_df.index, scp_df.to_dict("records")))
+
     # 3. Blocking
     wos_blocks = build_blocks(wos_df)
     scp_blocks = build_blocks(scp_df)
@@ -642,9 +667,9 @@ async def run_smart_merge(ctx: JobContext, project_id: str) -> dict[str, Any]:
     pair_counter = 0
     for key in common_keys:
         for w_idx in wos_blocks[key]:
-            w_row = wos_df.loc[w_idx].to_dict()
+            w_row = wos_recs[w_idx]
             for s_idx in scp_blocks[key]:
-                s_row = scp_df.loc[s_idx].to_dict()
+                s_row = scp_recs[s_idx]
                 m = compute_match(w_row, s_row)
                 if m is None:
                     continue
@@ -665,8 +690,8 @@ async def run_smart_merge(ctx: JobContext, project_id: str) -> dict[str, Any]:
 
         if m["stage"] == "5_borderline":
             # Borderline — UI'da manuel onay bekleyecek
-            w_row = wos_df.loc[w_idx]
-            s_row = scp_df.loc[s_idx]
+            w_row = wos_recs[w_idx]
+            s_row = scp_recs[s_idx]
             borderline.append({
                 "pair_id": pair_id,
                 "wos_index": int(w_idx),
@@ -716,7 +741,9 @@ async def run_smart_merge(ctx: JobContext, project_id: str) -> dict[str, Any]:
 
     # 5. Field merge with preferences
     ctx.log("Field merge (Caputo 2024 defaults)...")
-    all_columns = list(set(list(wos_df.columns) + list(scp_df.columns)))
+    all_columns = set(list(wos_df.columns) + list(scp_df.columns))
+    # Kolon kümesi her çift için aynı: _norm_* elemesi döngüden önce bir kez
+    merge_columns = [c for c in all_columns if not c.startswith("_norm_")]
     conflicts: list[dict] = []
     merged_rows: list[dict] = []
     field_source_distribution: dict[str, int] = {}
@@ -724,10 +751,10 @@ async def run_smart_merge(ctx: JobContext, project_id: str) -> dict[str, Any]:
     for match in matches:
         w_idx = match["wos_index"]
         s_idx = match["scp_index"]
-        w_row = wos_df.loc[w_idx].to_dict()
-        s_row = scp_df.loc[s_idx].to_dict()
+        w_row = wos_recs[w_idx]
+        s_row = scp_recs[s_idx]
         merged_row, pair_conflicts = merge_pair_with_preferences(
-            match["pair_id"], w_row, s_row, all_columns
+            match["pair_id"], w_row, s_row, merge_columns
         )
         merged_rows.append(merged_row)
         conflicts.extend(pair_conflicts)
@@ -758,25 +785,27 @@ async def run_smart_merge(ctx: JobContext, project_id: str) -> dict[str, Any]:
 
     # 8. Çıktıları yaz — analiz klasörüne
     ctx.log("Writing output files...")
-    merged_xlsx = adir / "merged.xlsx"
-    audit_xlsx = adir / "match_audit.xlsx"
-    conflict_xlsx = adir / "conflict_log.xlsx"
-    borderline_xlsx = adir / "borderline_queue.xlsx"
-    lost_wos_xlsx = adir / "Lost_Wos_Records.xlsx"
-    lost_scp_xlsx = adir / "Lost_Scopus_Records.xlsx"
-    stat_xlsx = adir / "Statistic.xlsx"
+    files = analyses.AnalysisFiles.of(adir)
+
+    def _write_reports() -> None:
+        _write_match_audit(matches, files.match_audit)
+        _write_conflict_log(conflicts, files.conflict_log)
+        _write_borderline_queue(borderline, files.borderline_queue)
+        _write_lost_records(wos_not_matched, files.lost_wos)
+        _write_lost_records(scp_not_matched, files.lost_scopus)
+        _write_statistic_smart(len(final_df), len(wos_df), len(scp_df), final_df, files.statistic)
 
     try:
-        await asyncio.to_thread(final_df.to_excel, merged_xlsx, index=False)
-        await asyncio.to_thread(_write_match_audit, matches, audit_xlsx)
-        await asyncio.to_thread(_write_conflict_log, conflicts, conflict_xlsx)
-        await asyncio.to_thread(_write_borderline_queue, borderline, borderline_xlsx)
-        await asyncio.to_thread(_write_lost_records, wos_not_matched, lost_wos_xlsx)
-        await asyncio.to_thread(_write_lost_records, scp_not_matched, lost_scp_xlsx)
-        await asyncio.to_thread(
-            _write_statistic_smart,
-            len(final_df), len(wos_df), len(scp_df), final_df, stat_xlsx,
+        # En büyük çıktı (merged.xlsx) ayrı process'te yazılırken rapor/istatistik
+        # dosyaları eşzamanlı olarak thread'de yazılır.
+        results = await asyncio.gather(
+            write_xlsx(final_df, files.merged),
+            asyncio.to_thread(_write_reports),
+            return_exceptions=True,
         )
+        for r in results:
+            if isinstance(r, BaseException):
+                raise r
     except Exception:
         # Yazma sırasında hata — yarım analiz klasörünü temizle
         try:
@@ -790,8 +819,11 @@ async def run_smart_merge(ctx: JobContext, project_id: str) -> dict[str, Any]:
     if borderline:
         _write_borderline_state(project_id, state, adir=adir)
 
-    # 10. Filter cache invalidate (Smart artık aktif olacak)
-    filter_engine._DF_CACHE.clear()
+    # 10. Filter cache: eski dataset yerine az önce yazılan df (XLSX geri okunmaz)
+    try:
+        await asyncio.to_thread(filter_engine.prime_cache, files.merged, final_df)
+    except Exception:
+        filter_engine._DF_CACHE.clear()
 
     # 11. Finalize — file_count + aktif yap
     analyses.finalize_analysis(project_id, analysis_id)
@@ -814,13 +846,8 @@ async def run_smart_merge(ctx: JobContext, project_id: str) -> dict[str, Any]:
         "field_source_distribution": field_source_distribution,
         "lost_wos_count": int(len(wos_not_matched)),
         "lost_scopus_count": int(len(scp_not_matched)),
-        "output_xlsx": str(merged_xlsx.relative_to(storage.settings.storage_path)),
-        "output_files": [
-            f.name for f in (
-                merged_xlsx, audit_xlsx, conflict_xlsx, borderline_xlsx,
-                lost_wos_xlsx, lost_scp_xlsx, stat_xlsx,
-            ) if f.exists()
-        ],
+        "output_xlsx": str(files.merged.relative_to(storage.settings.storage_path)),
+        "output_files": [f.name for f in files.outputs if f.exists()],
     }
     ctx.log(f"Smart Merge complete — {summary['merged_count']} unique records "
             f"({summary['matched_pairs']} matched + {summary['borderline_count']} borderline)")
@@ -836,11 +863,11 @@ def list_borderline(project_id: str) -> list[dict]:
     adir = analyses.get_active_analysis_dir(project_id)
     if adir is None:
         return []
-    bq_path = adir / "borderline_queue.xlsx"
+    bq_path = analyses.AnalysisFiles.of(adir).borderline_queue
     if not bq_path.exists():
         return []
     try:
-        df = pd.read_excel(bq_path)
+        df = read_xlsx(bq_path)
     except Exception:
         return []
     state = _read_borderline_state(project_id, adir=adir)
@@ -895,17 +922,18 @@ def decide_borderline(project_id: str, decisions: list[dict]) -> dict[str, Any]:
     if adir is None:
         raise RuntimeError("Aktif analiz yok — önce Smart Merge çalıştırın")
 
-    merged_xlsx = adir / "merged.xlsx"
+    files = analyses.AnalysisFiles.of(adir)
+    merged_xlsx = files.merged
     if not merged_xlsx.exists():
         raise RuntimeError("merged.xlsx bulunamadı — önce Smart Merge çalıştırın")
 
-    bq_path = adir / "borderline_queue.xlsx"
+    bq_path = files.borderline_queue
     if not bq_path.exists():
         return {"applied": 0, "snapshot": None, "pending_after": 0}
 
     # State güncelle
     state = _read_borderline_state(project_id, adir=adir)
-    bq_df = pd.read_excel(bq_path)
+    bq_df = read_xlsx(bq_path)
     bq_by_id = {str(r["pair_id"]): r for _, r in bq_df.iterrows()}
 
     accept_pairs: list[dict] = []
@@ -936,13 +964,13 @@ def decide_borderline(project_id: str, decisions: list[dict]) -> dict[str, Any]:
     snapshot_rel: Optional[str] = None
     applied = 0
     if accept_pairs:
-        df = pd.read_excel(merged_xlsx)
+        df = read_xlsx(merged_xlsx)
         # Snapshot
         snaps_dir = storage.project_dir(project_id) / "snapshots"
         snaps_dir.mkdir(exist_ok=True)
         stamp = time.strftime("%Y%m%d_%H%M%S")
         snap_path = snaps_dir / f"pre_borderline_accept_{stamp}.xlsx"
-        df.to_excel(snap_path, index=False)
+        to_xlsx(df, snap_path)
         snapshot_rel = str(snap_path.relative_to(storage.settings.storage_path))
 
         # Yeniden yükle WoS/Scopus için pair satırlarını birleştir
@@ -959,7 +987,7 @@ def decide_borderline(project_id: str, decisions: list[dict]) -> dict[str, Any]:
             mask = df["DI"].astype(str).str.strip().str.lower().isin(to_drop_dois)
             applied = int(mask.sum())
             df = df.loc[~mask].reset_index(drop=True)
-            df.to_excel(merged_xlsx, index=False)
+            to_xlsx(df, merged_xlsx)
             filter_engine._DF_CACHE.clear()
 
     # Audit
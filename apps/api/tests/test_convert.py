@@ -90,3 +90,162 @@ def test_csv_to_xlsx_missing_file(client):
     r = client.post(f"/api/projects/{pid}/convert/csv-to-xlsx",
                     json={"files": ["nope.csv"]})
     assert r.status_code == 404
+
+
+@pytest.mark.parametrize("arrow", [True, False])
+def test_csv_to_xlsx_concatenates_multiple_exports(client, monkeypatch, arrow):
+    import pandas as pd
+    from bibex_core import scp2xlsx
+    from services import storage
+
+    if arrow and scp2xlsx.pa is None:
+        pytest.skip("pyarrow yok")
+    # arrow=False: bayt düzeyinde birleştirme + pandas yolu
+    monkeypatch.setattr(scp2xlsx, "ARROW_CSV", arrow)
+    if not arrow:
+        monkeypatch.setattr(scp2xlsx, "pa", None)
+
+    pid = client.post("/api/projects", json={"name": "multi"}).json()["id"]
+    header = "Authors,Title,Year,DOI\n"
+    client.post(f"/api/projects/{pid}/files", files=[
+        ("files", ("a.csv", ("﻿" + header + 'Doe J.,"Alpha, one",2020,10.1/A\n').encode(), "text/csv")),
+        # Son satırı newline'sız — birleştirmede sonraki kayda yapışmamalı
+        ("files", ("b.csv", ("﻿" + header + "Roe K.,Beta,2021,10.1/B").encode(), "text/csv")),
+        ("files", ("c.csv", (header + "Poe L.,Gamma,2022,10.1/C\n").encode(), "text/csv")),
+    ])
+    r = client.post(f"/api/projects/{pid}/convert/csv-to-xlsx",
+                    json={"files": ["a.csv", "b.csv", "c.csv"], "output": "scopus.xlsx"})
+    assert r.status_code == 200, r.text
+
+    processed = storage.project_dir(pid) / "processed"
+    df = pd.read_excel(processed / "scopus.xlsx", dtype=str)
+    assert list(df["TI"]) == ["ALPHA, ONE", "BETA", "GAMMA"]
+    assert list(df["DI"]) == ["10.1/A", "10.1/B", "10.1/C"]
+    assert not (processed / "_scopus_merged.tmp.csv").exists()
+
+
+_WOS_TXT = (
+    "FN Clarivate Analytics Web of Science\nVR 1.0\n"
+    "PT J\nAU Doe, J\nTI Alpha one\nSO JOURNAL A\nPY 2020\nDI 10.1/A\nER\n\nEF\n"
+)
+
+
+def test_auto_prepare_converts_both_sources(client):
+    from services import converter, storage
+
+    pid = client.post("/api/projects", json={"name": "both"}).json()["id"]
+    client.post(f"/api/projects/{pid}/files", files=[
+        ("files", ("s.csv", b"Authors,Title,Year,DOI\nRoe K.,Beta,2021,10.1/B\n", "text/csv")),
+        ("files", ("w.txt", _WOS_TXT.encode(), "text/plain")),
+    ])
+    frames = {}
+    report = converter.auto_prepare(pid, frames=frames)
+    assert report["skipped"] == []
+    assert report["scopus_xlsx"] == "scopus.xlsx"
+    assert report["wos_xlsx"] == "wos.xlsx"
+    processed = storage.project_dir(pid) / "processed"
+    assert (processed / "scopus.xlsx").exists() and (processed / "wos.xlsx").exists()
+
+    # Dönüşümün döndürdüğü df'ler, XLSX'in geri okunmuş haliyle aynı
+    import pandas as pd
+    for name in ("scopus.xlsx", "wos.xlsx"):
+        pd.testing.assert_frame_equal(frames[processed / name], pd.read_excel(processed / name),
+                                      check_names=False)
+
+    # İkinci çağrı: çıktılar güncel → yeniden dönüşüm yok
+    assert converter.auto_prepare(pid)["did_convert"] is False
+
+
+def test_prepared_sidecar_matches_excel(client):
+    import pandas as pd
+    from bibex_core.parquet_cache import read_sidecar, sidecar_path
+    from services import converter, merger
+
+    pytest.importorskip("pyarrow")
+    pid = client.post("/api/projects", json={"name": "pq"}).json()["id"]
+    client.post(f"/api/projects/{pid}/files", files=[
+        ("files", ("s.csv", b"Authors,Title,Year,DOI,Notes\nRoe K.,Beta,2021,10.1/B,\nPoe L.,Gamma,007,,\n", "text/csv")),
+    ])
+    out = converter.csv_to_xlsx(pid, ["s.csv"], "scopus.xlsx")
+    cached = read_sidecar(str(out))
+    assert cached is not None
+    pd.testing.assert_frame_equal(cached, pd.read_excel(out), check_names=False)
+
+    # Sidecar processed/ listesinde görünmez, XLSX değişince bayat sayılır
+    assert all(not f["name"].endswith(".parquet") for f in converter.list_processed(pid))
+    pd.read_excel(out).to_excel(out, index=False)
+    assert read_sidecar(str(out)) is None
+    scp_df, wos_df = merger._load_inputs(pid)
+    assert len(scp_df) == 2 and wos_df is None
+    assert Path(sidecar_path(str(out))).exists()
+
+
+def test_core_read_xlsx_prefers_current_sidecar(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    import pandas as pd
+    from bibex_core import parquet_cache
+
+    out = tmp_path / "scopus.xlsx"
+    df = pd.DataFrame({"AU": ["DOE J", ""], "PY": ["2020", "007"], "DI": ["10.1/A", None]})
+    df.to_excel(out, index=False)
+    parquet_cache.write_sidecar(parquet_cache.excel_view(df), str(out))
+
+    reads = []
+    real_read = pd.read_excel
+    monkeypatch.setattr(pd, "read_excel", lambda *a, **kw: reads.append(a) or real_read(*a, **kw))
+    cached = parquet_cache.read_xlsx(str(out))
+    assert reads == []
+    pd.testing.assert_frame_equal(cached, real_read(out))
+
+    # XLSX değişti → sidecar bayat, dosya parse edilir
+    df.head(1).to_excel(out, index=False)
+    assert len(parquet_cache.read_xlsx(str(out))) == 1 and len(reads) == 1
+
+
+def test_csv_concat_rejects_mismatched_headers(tmp_path):
+    from services.converter import _concat_csv_exports
+
+    a = tmp_path / "a.csv"
+    b = tmp_path / "b.csv"
+    a.write_bytes(b"Authors,Title\nDoe J.,Alpha\n")
+    b.write_bytes(b"Title,Authors\nBeta,Roe K.\n")
+    dest = tmp_path / "merged.csv"
+    assert _concat_csv_exports([a, b], dest) is False
+    assert not dest.exists()
+
+
+def test_wos_to_xlsx_concatenates_txt_with_invalid_bytes(client):
+    import pandas as pd
+    from services import storage
+
+    pid = client.post("/api/projects", json={"name": "wos2"}).json()["id"]
+    second = _WOS_TXT.replace("Alpha one", "Beta two").replace("10.1/A", "10.1/B")
+    client.post(f"/api/projects/{pid}/files", files=[
+        ("files", ("a.txt", _WOS_TXT.encode(), "text/plain")),
+        # Geçersiz UTF-8 baytı dönüşümü düşürmemeli (U+FFFD olur)
+        ("files", ("b.txt", second.encode().replace(b"Beta", b"B\xffeta"), "text/plain")),
+    ])
+    r = client.post(f"/api/projects/{pid}/convert/wos-to-xlsx",
+                    json={"files": ["a.txt", "b.txt"], "output": "wos.xlsx"})
+    assert r.status_code == 200, r.text
+    processed = storage.project_dir(pid) / "processed"
+    df = pd.read_excel(processed / "wos.xlsx", dtype=str)
+    assert list(df["DI"]) == ["10.1/A", "10.1/B"]
+    assert not (processed / "_wos_merged.tmp.txt").exists()
+
+
+def test_wos_to_xlsx_single_txt_is_converted_in_place(client):
+    import pandas as pd
+    from services import storage
+
+    pid = client.post("/api/projects", json={"name": "wos1"}).json()["id"]
+    client.post(f"/api/projects/{pid}/files",
+                files=[("files", ("a.txt", _WOS_TXT.encode(), "text/plain"))])
+    r = client.post(f"/api/projects/{pid}/convert/wos-to-xlsx",
+                    json={"files": ["a.txt"], "output": "wos.xlsx"})
+    assert r.status_code == 200, r.text
+    root = storage.project_dir(pid)
+    df = pd.read_excel(root / "processed" / "wos.xlsx", dtype=str)
+    assert list(df["DI"]) == ["10.1/A"]
+    # Ham dosya kaynak olarak kullanıldı — silinmedi, değişmedi
+    assert (root / "raw" / "a.txt").read_bytes() == _WOS_TXT.encode()
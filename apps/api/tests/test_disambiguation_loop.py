@@ -43,3 +43,28 @@ def test_threaded_orcid_helpers_exist_and_used(pipeline):
     # Yardımcılar gerçekten ORCID çözüyor (içlerinde çağrı var)
     for h in (pipeline._resolve_member_orcid_sets, pipeline._resolve_split_group_sets):
         assert "orcids_for_candidate" in inspect.getsource(h)
+
+
+def test_apply_splits_snapshots_pre_change_data_from_single_read(pipeline, monkeypatch, tmp_path):
+    """Snapshot, değişiklikten ÖNCEKİ veri olmalı ve merged XLSX yalnız bir kez okunmalı."""
+    import types
+
+    import pandas as pd
+
+    src = tmp_path / "merged.xlsx"
+    pipeline.to_xlsx(pd.DataFrame({"AU": ["Smith J;Doe A", "Smith J"], "TI": ["a", "b"]}), src)
+    reads = []
+    real_read = pipeline.read_xlsx
+    monkeypatch.setattr(pipeline, "read_xlsx", lambda p, **k: reads.append(p) or real_read(p, **k))
+    monkeypatch.setattr(pipeline, "_project_dir", lambda pid: tmp_path)
+    monkeypatch.setattr(pipeline.merger, "merged_dataset_path", lambda pid: src)
+    monkeypatch.setattr(pipeline, "list_proposals", lambda pid, kind: {"splits": []})
+    monkeypatch.setattr(pipeline, "storage", types.SimpleNamespace(
+        settings=types.SimpleNamespace(storage_path=tmp_path)))
+
+    res = pipeline.apply_splits("p", [{"name": "Smith J", "groups": [{"suffix": "(b)", "records": [1]}]}])
+    assert res["replacements"] == 1
+    assert reads == [src]
+    snap = pd.read_excel(tmp_path / res["snapshot"])
+    assert snap["AU"].tolist() == ["Smith J;Doe A", "Smith J"]
+    assert pd.read_excel(src)["AU"].tolist() == ["Smith J;Doe A", "Smith J (b)"]
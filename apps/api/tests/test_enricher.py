@@ -0,0 +1,350 @@
+"""Tests for the API enrichment pass over the active dataset.
+
+Runs services.enricher._api_pass against an in-memory frame with the
+network-bound extract_metadata replaced, checking which records are sent
+to the APIs and how returned values are written back.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# apps/api'yi import yoluna ekle (diğer testlerle aynı desen)
+_API_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_API_ROOT))
+
+from services import enricher  # noqa: E402
+
+
+class _Ctx:
+    cancelled = False
+
+    def __init__(self):
+        self.logs = []
+
+    def log(self, msg):
+        self.logs.append(msg)
+
+    def progress(self, value):
+        pass
+
+    def due(self):
+        return False
+
+
+def _fake_extract(calls):
+    def extract_metadata(doi, current, **_creds):
+        calls.append((doi, dict(current)))
+        return {**current, "AB": f"abstract {doi}", "TI": "api title", "XX": "not a column"}
+    return extract_metadata
+
+
+def test_api_pass_only_queries_records_with_missing_fields(monkeypatch):
+    from bibex_core.modules import api_utils
+
+    calls = []
+    monkeypatch.setattr(api_utils, "extract_metadata", _fake_extract(calls))
+    df = pd.DataFrame({
+        "DI": ["10.1/full", "10.1/gap", None, "  "],
+        "TI": ["Full", "Gap", "No doi", "Blank doi"],
+        "AB": ["has abstract", None, None, None],
+    })
+
+    stats = asyncio.run(enricher._api_pass(_Ctx(), df))
+
+    assert [doi for doi, _ in calls] == ["10.1/gap"]
+    assert calls[0][1] == {"DI": "10.1/gap", "TI": "Gap", "AB": None}
+    assert stats == {"total": 1, "enriched": 1, "cached": 0}
+    # Yalnız boş hücre dolar; dolu başlık ezilmez, df'te olmayan anahtar eklenmez
+    assert df.loc[1, "AB"] == "abstract 10.1/gap"
+    assert list(df["TI"]) == ["Full", "Gap", "No doi", "Blank doi"]
+    assert "XX" not in df.columns
+    assert df.loc[2, "AB"] is None
+
+
+def test_api_pass_overlaps_requests_and_fills_every_record(monkeypatch):
+    import threading
+    import time
+
+    from bibex_core.modules import api_utils
+
+    lock = threading.Lock()
+    state = {"now": 0, "peak": 0}
+
+    def extract_metadata(doi, current, **_creds):
+        with lock:
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+        time.sleep(0.02)
+        with lock:
+            state["now"] -= 1
+        return {"AB": f"abstract {doi}"}
+
+    monkeypatch.setattr(api_utils, "extract_metadata", extract_metadata)
+    monkeypatch.setattr(enricher.settings, "enrichment_concurrency", 4)
+    df = pd.DataFrame({"DI": [f"10.1/{i}" for i in range(12)], "AB": [None] * 12})
+
+    stats = asyncio.run(enricher._api_pass(_Ctx(), df))
+
+    assert stats == {"total": 12, "enriched": 12, "cached": 0}
+    assert list(df["AB"]) == [f"abstract 10.1/{i}" for i in range(12)]
+    assert 1 < state["peak"] <= 4
+
+
+def test_api_pass_serves_repeat_dois_from_cache(monkeypatch, tmp_path):
+    from bibex_core.modules import api_utils
+    from services.enrichment_cache import EnrichmentCache
+
+    calls = []
+    monkeypatch.setattr(api_utils, "extract_metadata", _fake_extract(calls))
+
+    def frame():
+        return pd.DataFrame({"DI": ["10.1/gap"], "TI": ["Gap"], "AB": [None]})
+
+    cache = EnrichmentCache(tmp_path)
+    try:
+        first, second = frame(), frame()
+        asyncio.run(enricher._api_pass(_Ctx(), first, cache=cache))
+        stats = asyncio.run(enricher._api_pass(_Ctx(), second, cache=cache))
+        assert len(calls) == 1
+        assert stats == {"total": 1, "enriched": 1, "cached": 1}
+        assert second.loc[0, "AB"] == first.loc[0, "AB"] == "abstract 10.1/gap"
+
+        # Daha fazla alan eksikse önbellek o alanları hiç sormamıştır → yeniden sorgu
+        wider = frame()
+        wider["TI"] = None
+        asyncio.run(enricher._api_pass(_Ctx(), wider, cache=cache))
+        assert len(calls) == 2 and wider.loc[0, "TI"] == "api title"
+    finally:
+        cache.close()
+
+
+def test_doi_pass_writes_resolved_dois_back(monkeypatch):
+    from bibex_core.modules import api_utils
+
+    monkeypatch.setattr(api_utils, "resolve_doi",
+                        lambda title, authors, year, **_kw: None if title == "Unknown" else f"10.9/{title}")
+    df = pd.DataFrame({
+        "DI": ["10.1/have", None, "", None],
+        "TI": ["Have", "Found", "Also", "Unknown"],
+        "PY": [2020, 2021, 2022, 2023],
+    })
+
+    stats = asyncio.run(enricher._doi_pass(_Ctx(), df))
+
+    assert stats == {"scanned": 3, "filled": 2}
+    assert list(df["DI"]) == ["10.1/have", "10.9/Found", "10.9/Also", None]
+
+
+def test_fill_all_reports_fill_rates_from_previously_blank_cells(monkeypatch, tmp_path):
+    # enricher'in kendi referansları — diğer testler services.* modüllerini yeniden yükleyebilir
+    storage, analyses = enricher.storage, enricher.analyses
+
+    src = tmp_path / "merged.xlsx"
+    pd.DataFrame({
+        "DI": ["10.1/a", None, "10.1/c", None],
+        "AB": ["x", None, None, None],
+        "WC": ["CS", None, None, "Math"],
+        "SC": [None, None, "Bio", None],
+    }).to_excel(src, index=False)
+    monkeypatch.setattr(enricher, "_active_path", lambda _pid: src)
+    monkeypatch.setattr(enricher, "_snapshot", lambda *_a: "snap")
+    monkeypatch.setattr(storage, "project_dir", lambda _pid: tmp_path)
+    monkeypatch.setattr(storage, "touch_project", lambda _pid: None)
+    monkeypatch.setattr(analyses, "get_active_analysis_id", lambda _pid: "a1")
+
+    async def doi_pass(ctx, df, **_kw):
+        df.loc[1, "DI"] = "10.1/b"
+        return {"scanned": 2, "filled": 1}
+
+    async def api_pass(ctx, df, **_kw):
+        df.loc[[1, 2], "AB"] = "filled"
+        return {"total": 2, "enriched": 2, "cached": 0}
+
+    async def addr_pass(ctx, df, email, **_kw):
+        return {"rows": 0, "addr": 0, "dois": 0}
+
+    monkeypatch.setattr(enricher, "_doi_pass", doi_pass)
+    monkeypatch.setattr(enricher, "_api_pass", api_pass)
+    monkeypatch.setattr(enricher, "_complete_addresses_pass", addr_pass)
+
+    res = asyncio.run(enricher.run_fill_all(_Ctx(), "pid"))
+
+    assert res["per_field_fill"] == {
+        "DI": {"before": 0.5, "after": 0.75},
+        "AB": {"before": 0.25, "after": 0.75},
+        "WC": {"before": 0.5, "after": 0.75},   # WC<->SC mirror
+        "SC": {"before": 0.25, "after": 0.75},
+    }
+    assert res["fill_rate_after"] == 0.75
+
+
+def test_api_enrichment_snapshots_pre_pass_data_while_pass_runs(monkeypatch, tmp_path):
+    storage = enricher.storage
+
+    src = tmp_path / "merged.xlsx"
+    pd.DataFrame({"DI": ["10.1/a", "10.1/b"], "AB": [None, None]}).to_excel(src, index=False)
+    monkeypatch.setattr(enricher, "_active_path", lambda _pid: src)
+    monkeypatch.setattr(storage, "project_dir", lambda _pid: tmp_path)
+    monkeypatch.setattr(storage, "touch_project", lambda _pid: None)
+
+    snapped = []
+
+    def snapshot(_pid, df, tag):
+        snapped.append(df)
+        return f"pre_{tag}.xlsx"
+
+    async def api_pass(ctx, df, **_kw):
+        df.loc[:, "AB"] = "filled"
+        return {"total": 2, "enriched": 2, "cached": 0}
+
+    monkeypatch.setattr(enricher, "_snapshot", snapshot)
+    monkeypatch.setattr(enricher, "_api_pass", api_pass)
+
+    res = asyncio.run(enricher.run_api_enrichment(_Ctx(), "pid"))
+
+    assert res["snapshot"] == "pre_api.xlsx"
+    # Geçiş df'yi yerinde değiştirdi; snapshot geçiş öncesi kopyayı yazmış olmalı
+    assert snapped[0]["AB"].isna().all()
+    assert (pd.read_excel(src)["AB"] == "filled").all()
+
+
+def test_api_enrichment_primes_filter_cache_with_written_dataset(monkeypatch, tmp_path):
+    storage, filter_engine = enricher.storage, enricher.filter_engine
+
+    src = tmp_path / "merged.xlsx"
+    pd.DataFrame({"UID": ["r_1", "r_2"], "DI": ["10.1/a", "10.1/b"],
+                  "AB": [None, None], "PY": [2020, None]}).to_excel(src, index=False)
+    monkeypatch.setattr(enricher, "_active_path", lambda _pid: src)
+    monkeypatch.setattr(enricher, "_snapshot", lambda *_a: "snap")
+    monkeypatch.setattr(filter_engine.merger, "merged_dataset_path", lambda _pid: src)
+    monkeypatch.setattr(storage, "project_dir", lambda _pid: tmp_path)
+    monkeypatch.setattr(storage, "touch_project", lambda _pid: None)
+
+    async def api_pass(ctx, df, **_kw):
+        df.loc[0, "AB"] = "filled"
+        return {"total": 2, "enriched": 1, "cached": 0}
+
+    monkeypatch.setattr(enricher, "_api_pass", api_pass)
+    asyncio.run(enricher.run_api_enrichment(_Ctx(), "pid"))
+
+    reads = []
+    real_read = filter_engine.read_xlsx
+    monkeypatch.setattr(filter_engine, "read_xlsx", lambda path: reads.append(path) or real_read(path))
+    primed = filter_engine.load_merged("pid")
+    assert reads == []  # az önce yazılan XLSX geri okunmadı
+    filter_engine._DF_CACHE.clear()
+    pd.testing.assert_frame_equal(primed, filter_engine.load_merged("pid"))
+
+
+def test_enrichment_cache_expires_old_entries(monkeypatch, tmp_path):
+    from services import enrichment_cache
+    from services.enrichment_cache import EnrichmentCache
+
+    now = [1_000_000.0]
+    monkeypatch.setattr(enrichment_cache.time, "time", lambda: now[0])
+    cache = EnrichmentCache(tmp_path, max_age_days=90)
+    try:
+        cache.set("10.1/x", ["AB"], {"AB": "cached"})
+        now[0] += 89 * 86400
+        assert cache.get("10.1/x", ["AB"]) == {"AB": "cached"}
+        now[0] += 2 * 86400
+        assert cache.get("10.1/x", ["AB"]) is None
+    finally:
+        cache.close()
+
+
+def test_get_with_retry_spaces_requests_per_host_and_shares_backoff(monkeypatch):
+    import time
+
+    from bibex_core.modules import api_utils
+
+    class _Resp:
+        def __init__(self, status, headers=None):
+            self.status_code = status
+            self.headers = headers or {}
+
+    sent = []
+    replies = {"https://a.test/1": [_Resp(429, {"Retry-After": "0.3"}), _Resp(200)]}
+
+    class _Session:
+        def get(self, url, **_kw):
+            sent.append((url, time.monotonic()))
+            queue = replies.get(url)
+            return queue.pop(0) if queue else _Resp(200)
+
+    monkeypatch.setattr(api_utils, "_throttle", api_utils._HostThrottle())
+    monkeypatch.setattr(api_utils, "_session", lambda: _Session())
+    monkeypatch.setitem(api_utils._HOST_MIN_INTERVAL, "a.test", 0.05)
+
+    assert api_utils._get_with_retry("https://a.test/1").status_code == 200
+    # 429 on /1 holds back the next request to the same host as well
+    assert api_utils._get_with_retry("https://a.test/2").status_code == 200
+    assert api_utils._get_with_retry("https://a.test/3").status_code == 200
+
+    times = [t for _, t in sent]
+    assert [u for u, _ in sent] == ["https://a.test/1", "https://a.test/1",
+                                    "https://a.test/2", "https://a.test/3"]
+    assert times[1] - times[0] >= 0.29
+    assert times[3] - times[2] >= 0.045
+
+
+def test_extract_metadata_skips_other_registration_agency_by_doi_prefix(monkeypatch):
+    from bibex_core.modules import api_utils
+
+    calls = []
+    known = {"crossref": "10.1000", "datacite": "10.5281"}
+
+    def fake(source):
+        def extract(doi, *_a, **_kw):
+            calls.append((source, doi))
+            return {"AB": f"{source} abstract"} if doi.startswith(known.get(source, "-")) else {}
+        return extract
+
+    monkeypatch.setattr(api_utils, "_DOI_AUTHORITY", {})
+    monkeypatch.setattr(api_utils, "get_api_credential", lambda *_a: None)
+    for source in ("crossref", "openalex", "scopus", "datacite",
+                   "unpaywall", "europepmc", "semantic_scholar"):
+        monkeypatch.setattr(api_utils, f"extract_metadata_from_{source}", fake(source))
+
+    def sources_for(doi):
+        calls.clear()
+        api_utils.extract_metadata(doi, {"AB": "", "TI": ""}, unpaywall_email="a@b.c")
+        return [s for s, _ in calls]
+
+    # CrossRef answers first, so DataCite is not tried even for the first DOI
+    first_crossref = sources_for("10.1000/a")
+    assert "crossref" in first_crossref and "datacite" not in first_crossref
+    # An unknown prefix that CrossRef cannot resolve still reaches DataCite
+    assert {"crossref", "datacite"} <= set(sources_for("10.5281/zenodo.1"))
+    assert api_utils._DOI_AUTHORITY == {"10.1000": "Crossref", "10.5281": "DataCite"}
+
+    later_crossref = sources_for("10.1000/b")
+    assert "crossref" in later_crossref and "datacite" not in later_crossref
+    later_datacite = sources_for("10.5281/zenodo.2")
+    assert "datacite" in later_datacite
+    assert "crossref" not in later_datacite and "unpaywall" not in later_datacite
+
+
+def test_address_pass_only_fetches_rows_with_doi_and_address(monkeypatch):
+    fetched = []
+
+    def fetch(doi, email):
+        fetched.append(doi)
+        return [("Univ X", "Turkey")]
+
+    monkeypatch.setattr(enricher, "fetch_affiliations_for_doi", fetch)
+    df = pd.DataFrame({
+        "DI": ["10.1/a", None, " nan ", "10.1/d", "10.1/e"],
+        "C1": ["[Doe, J] Univ X", "Univ X", "Univ X", "", "[Roe, K] Univ X, Turkey"],
+    })
+
+    stats = asyncio.run(enricher._complete_addresses_pass(_Ctx(), df, None))
+
+    # Ülkesi zaten olan adres (10.1/e) ağ çağrısı yapmaz; DOI/adresi boş olanlar taranmaz
+    assert fetched == ["10.1/a"]
+    assert stats == {"rows": 1, "addr": 1, "dois": 1}
+    assert df.at[0, "C1"] != "[Doe, J] Univ X" and "Turkey" in df.at[0, "C1"]
+    assert df["C1"].tolist()[1:] == ["Univ X", "Univ X", "", "[Roe, K] Univ X, Turkey"]
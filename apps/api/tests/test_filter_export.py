@@ -210,3 +210,160 @@ def test_audit_per_analysis_scoping(client, project_with_merged):
     after = client.get(f"/api/projects/{pid}/audit").json()
     assert not any(e["kind"] == "export" for e in after)
     assert any(e["kind"] == "upload" for e in after)
+
+
+def test_xlsx_shape_matches_read_excel(client, tmp_path):
+    """merge/summary sayımları DataFrame kurmadan alınır; pandas'la aynı olmalı
+    (aradaki boş satır sayılır, sondaki boş satır/kolon atılır)."""
+    import pandas as pd
+    from services.bibex_adapter import xlsx_shape
+
+    p = tmp_path / "lost.xlsx"
+    pd.DataFrame({"TI": ["a", None, "c", None], "DI": [None, None, "x", None],
+                  "PY": [None] * 4}).to_excel(p, index=False)
+    assert xlsx_shape(p) == pd.read_excel(p).shape
+    pd.DataFrame(columns=["TI", "DI"]).to_excel(p, index=False)
+    assert xlsx_shape(p) == pd.read_excel(p).shape == (0, 2)
+
+
+def test_load_merged_does_not_reread_its_own_uid_write(client, tmp_path, monkeypatch):
+    import pandas as pd
+    from services import filter_engine, merger
+
+    p = tmp_path / "merged.xlsx"
+    pd.DataFrame({"TI": ["a", "b"], "PY": [2020, 2021], "AB": ["x", None]}).to_excel(p, index=False)
+    monkeypatch.setattr(merger, "merged_dataset_path", lambda _pid: p)
+    reads = []
+    real_read = filter_engine.read_xlsx
+    monkeypatch.setattr(filter_engine, "read_xlsx", lambda path: reads.append(path) or real_read(path))
+    filter_engine._DF_CACHE.clear()
+
+    first = filter_engine.load_merged("pid")      # UID ekler ve diske yazar
+    assert "UID" in pd.read_excel(p).columns
+    assert filter_engine.load_merged("pid") is first
+    assert len(reads) == 1
+
+    # Merge sonrası önbelleğe konan df, diskten okunacak olanla aynı
+    filter_engine.prime_cache(p, pd.read_excel(p))
+    primed = filter_engine.load_merged("pid")
+    assert len(reads) == 1
+    filter_engine._DF_CACHE.clear()
+    pd.testing.assert_frame_equal(primed, filter_engine.load_merged("pid"))
+
+
+def test_blank_mask_matches_string_comparison(client):
+    import numpy as np
+    import pandas as pd
+    from services.filter_engine import blank_mask
+
+    def reference(s):
+        t = s.astype(str).str.strip()
+        return s.isna() | (t == "") | (t.str.lower() == "nan")
+
+    cols = [
+        pd.Series(["a", "", "  ", None, np.nan, "nan", "NaN", " NAN ", 3, "x "], dtype=object),
+        pd.Series([1.0, np.nan, 2.5]),
+        pd.Series([1, 2, 3]),
+        pd.Series([1, 2, None], dtype=object),
+        pd.Series(pd.to_datetime(["2020-01-01", None])),
+    ]
+    for s in cols:
+        pd.testing.assert_series_equal(blank_mask(s), reference(s), check_names=False)
+
+
+def test_in_filter_and_facets_normalize_unique_values_only(client):
+    import numpy as np
+    import pandas as pd
+    from services import filter_engine
+
+    df = pd.DataFrame({
+        "DT": ["Article", " article", "Review", "", None, np.nan, "nan", "Article"],
+        "PY": [2020.0, 2020.0, np.nan, 2021.0, 2021.0, 2020.0, np.nan, 2019.0],
+    })
+    mask = filter_engine._apply_in(df, "DT", ["ARTICLE", "none"])
+    assert mask.tolist() == [True, True, False, False, True, False, False, True]
+    assert filter_engine._apply_in(df, "PY", ["2020.0"]).sum() == 3
+    assert filter_engine._value_counts(df["DT"]) == [
+        {"value": "Article", "count": 2},
+        {"value": "article", "count": 1},
+        {"value": "Review", "count": 1},
+    ]
+    assert [d["value"] for d in filter_engine._value_counts(df["PY"])] == ["2020.0", "2021.0", "2019.0"]
+
+
+def test_suppress_stdio_discards_output_and_restores_streams(client, capsys):
+    from services.bibex_adapter import _suppress_stdio
+
+    out, err = sys.stdout, sys.stderr
+    with _suppress_stdio():
+        print("hidden " * 1000)
+        with _suppress_stdio():
+            print("nested", file=sys.stderr)
+        assert sys.stdout is not out
+    print("visible")
+    assert (sys.stdout, sys.stderr) == (out, err)
+    assert capsys.readouterr() == ("visible\n", "")
+
+
+def test_blank_counts_match_per_column_masks(client):
+    import numpy as np
+    import pandas as pd
+    from services import filter_engine
+
+    df = pd.DataFrame({
+        "AU": ["a", "", " nan ", None, "b"],
+        "PY": [2020, np.nan, 2021, 2022, np.nan],
+        "TC": [1, 2, 3, 4, 5],
+        "DT": pd.to_datetime(["2020", None, "2021", None, "2022"]),
+        "X": [None, 1, "NaN", "c", 2.5],
+    })
+    expected = [int(filter_engine.blank_mask(df[c]).sum()) for c in df.columns]
+    assert filter_engine.blank_counts(df).tolist() == expected == [3, 2, 0, 2, 2]
+    frame = filter_engine.blank_frame(df)
+    for c in df.columns:
+        assert frame[c].tolist() == filter_engine.blank_mask(df[c]).tolist()
+
+
+@pytest.mark.parametrize("writer", ["openpyxl", "core-stream", "adapter-stream"])
+def test_xlsx_writers_match_to_excel(client, monkeypatch, tmp_path, writer):
+    """Satır satır yazan üç yol da to_excel ile aynı veriyi geri okutmalı. İstisna:
+    '=' ile başlayan metin, to_excel'in boş formülü yerine metin olarak kalır."""
+    import numpy as np
+    import pandas as pd
+    from bibex_core import xlsx_writer
+    from services import bibex_adapter
+
+    if writer == "openpyxl":
+        write = xlsx_writer.write_only_xlsx
+    else:
+        pytest.importorskip("xlsxwriter")
+        write = xlsx_writer.write_xlsx
+    if writer == "adapter-stream":
+        monkeypatch.setattr(bibex_adapter, "EXCEL_WRITE_ENGINE", "xlsxwriter")
+    df = pd.DataFrame({
+        "AU": ["Smith J", None, "Doe A", ""],
+        "PY": [2020, 2021, 2022, 2023],
+        "TC": [1.5, np.nan, np.inf, 0.0],
+        "OA": [True, False, True, False],
+        "N": pd.array([1, None, 3, None], dtype="Int64"),
+        "DA": pd.to_datetime(["2024-01-02 00:00:00", None, "2024-03-04 05:06:07", None]),
+        "UR": ["https://doi.org/10.1/a", "", None, "x"],
+        # 32.767 karakteri aşan CR: xlsxwriter kesip satırın kalanını boş bırakır
+        "CR": ["R" * 40000, "a; b", None, ""],
+        "TI": ["after CR", "b", "c", "d"],
+        "FX": ["=SUM(1,2)", "=x", None, "y"],
+    })
+    cases = [False] if writer == "adapter-stream" else [False, True]
+    for index in cases:
+        if index:  # MergeDB main() çıktısı: ilk sütun index, başlık biçiminde
+            df.index = pd.Index(["a", "b", None, "d"], name="SR")
+        df.drop(columns="FX").to_excel(tmp_path / "ref.xlsx", index=index)
+        if writer == "adapter-stream":
+            bibex_adapter.to_xlsx(df, tmp_path / "fast.xlsx")
+        else:
+            write(df, tmp_path / "fast.xlsx", index=index)
+        out = pd.read_excel(tmp_path / "fast.xlsx")
+        pd.testing.assert_frame_equal(out.drop(columns="FX"), pd.read_excel(tmp_path / "ref.xlsx"))
+        assert out["FX"].tolist()[:2] == ["=SUM(1,2)", "=x"]
+        assert len(out["CR"][0]) == 32767 and out["TI"][0] == "after CR"
+
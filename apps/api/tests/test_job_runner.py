@@ -0,0 +1,103 @@
+"""Tests for the in-memory job runner's SSE notification path.
+
+Checks which JobContext calls push a new snapshot frame to subscribed
+listener queues, using a bare Job/JobRunner pair without starting tasks.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# apps/api'yi import yoluna ekle (diğer testlerle aynı desen)
+_API_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_API_ROOT))
+
+from jobs.runner import Job, JobContext, JobRunner  # noqa: E402
+
+
+def _drain(q) -> list:
+    """Kuyruktaki frame'leri (JSON, bitti_mi) → dict olarak topla."""
+    out = []
+    while not q.empty():
+        data, _finished = q.get_nowait()
+        out.append(json.loads(data))
+    return out
+
+
+def _setup():
+    runner = JobRunner()
+    job = Job(id="j1", project_id="p1", kind="test", title="t")
+    runner._jobs[job.id] = job
+    q = runner.subscribe(job.id)
+    _drain(q)  # ilk snapshot frame'i
+    return runner, JobContext(job, runner), q
+
+
+def test_progress_notifies_only_on_visible_change():
+    _, ctx, q = _setup()
+    ctx.progress(0.5)
+    ctx.progress(0.5)
+    ctx.progress(0.50001)  # 3 haneye yuvarlanınca aynı
+    ctx.progress(0.6)
+    frames = _drain(q)
+    assert [f["progress"] for f in frames] == [0.5, 0.6]
+
+
+def test_log_always_notifies():
+    _, ctx, q = _setup()
+    ctx.log("a")
+    ctx.log("a")
+    frames = _drain(q)
+    assert len(frames) == 2
+    assert frames[-1]["log_tail"] == ["a", "a"]
+
+
+def test_no_listeners_skips_snapshot(monkeypatch):
+    runner, ctx, q = _setup()
+    runner.unsubscribe("j1", q)
+    assert "j1" not in runner._listeners
+
+    calls = []
+    monkeypatch.setattr(Job, "to_dict", lambda self: calls.append(1) or {})
+    ctx.log("x")
+    ctx.progress(0.9)
+    assert calls == []
+
+
+def test_subscribe_queues_current_state_once():
+    runner = JobRunner()
+    job = Job(id="j2", project_id="p1", kind="test", title="t", progress=0.3)
+    runner._jobs[job.id] = job
+    q = runner.subscribe(job.id)
+    frames = _drain(q)
+    assert len(frames) == 1 and frames[0]["progress"] == 0.3
+
+
+def test_stream_of_finished_job_sends_single_frame(monkeypatch, tmp_path):
+    monkeypatch.setenv("STORAGE_DIR", str(tmp_path))
+    for mod in list(sys.modules):
+        if mod.startswith(("main", "config", "routers", "services", "models")):
+            sys.modules.pop(mod, None)
+    from fastapi.testclient import TestClient
+    from jobs.runner import Job as _Job, JobStatus, job_runner
+    from main import app
+
+    job_runner._jobs["done1"] = _Job(id="done1", project_id="p", kind="k", title="t",
+                                     status=JobStatus.completed)
+    r = TestClient(app).get("/api/jobs/done1/stream")
+    assert r.status_code == 200
+    assert r.text.count("event: update") == 1
+    assert "event: done" in r.text
+
+
+def test_due_gates_reports_by_time(monkeypatch):
+    from jobs import runner as runner_mod
+
+    _, ctx, _q = _setup()
+    now = [100.0]
+    monkeypatch.setattr(runner_mod.time, "monotonic", lambda: now[0])
+    assert ctx.due()
+    assert not ctx.due()
+    now[0] += runner_mod.REPORT_INTERVAL
+    assert ctx.due()
+    assert not ctx.due()
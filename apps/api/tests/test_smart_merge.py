@@ -133,3 +133,21 @@ def test_different_doi_blocks_stage4_journal_match():
     m = compute_match(w, s)
     assert m is not None
     assert m["stage"] == "4_journal_vol_page"
+
+
+# ── _norm_surname: benzersiz ilk yazar başına normalize ────────────────────
+
+def test_author_surname_keys_match_per_record_normalize():
+    import numpy as np
+    import pandas as pd
+    from services.smart_merger import author_surname_keys, normalize_author_surname
+
+    au = pd.Series(
+        ["Smith J; Lee K", "Smith, John A.;Lee, Kim", "  ", None, np.nan,
+         "van der Berg, J|Doe A", "Öztürk M", "Smith J"],
+        index=[7, 3, 3, 1, 0, 5, 2, 9],
+    )
+    keys = author_surname_keys(au)
+    assert keys.index.equals(au.index)
+    assert keys.tolist() == au.apply(normalize_author_surname).tolist()
+    assert keys.tolist() == ["SMITH", "SMITH", "", "", "", "VAN", "OZTURK", "SMITH"]
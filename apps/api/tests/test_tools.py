@@ -73,3 +73,25 @@ def test_tools_convert_extension(client, target, expected_ext):
         assert not name.lower().endswith((".wos", ".vos")), name
     # Header de doğru target'ı bildirmeli
     assert r.headers.get("x-target-format") == target
+
+
+def test_df_to_wos_matches_xlsx_round_trip(client, tmp_path):
+    """WoS çıktısı ara XLSX olmadan üretilir; XLSX üzerinden dönüşümle birebir aynı
+    olmalı (boş hücreli yıl kolonu '2020.0' yazılmamalı)."""
+    from bibex_core.xlsx2vos import convert_df_to_wos, convert_excel_to_wos
+
+    df = pd.DataFrame({
+        "AU": ["Doe J; Roe R", None, "Smith A"],
+        "AF": ["Doe, John; Roe, Rita", None, "Smith, Ann"],
+        "C1": ["Univ A; Univ B", "", None],
+        "TI": ["A title", "Another title", ""],
+        "PY": [2020.0, None, 2021.0],
+        "TC": [3.0, 4.0, 5.0],
+        "VL": ["012", "7", None],
+    })
+    df.to_excel(tmp_path / "in.xlsx", index=False)
+    convert_excel_to_wos(str(tmp_path / "in.xlsx"), str(tmp_path / "old.txt"))
+    convert_df_to_wos(df, str(tmp_path / "new.txt"))
+    new = (tmp_path / "new.txt").read_text(encoding="utf-8")
+    assert new == (tmp_path / "old.txt").read_text(encoding="utf-8")
+    assert "PY 2020\n" in new and "2020.0" not in new
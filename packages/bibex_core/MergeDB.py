@@ -1,15 +1,43 @@
 import pandas as pd
 import re
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import List, Union
 import numpy as np
+from pandas.api.types import infer_dtype
 from unidecode import unidecode
 
+try:
+    from .parquet_cache import read_xlsx
+    from .xlsx_writer import write_xlsx
+except ImportError:  # run as a script
+    from parquet_cache import read_xlsx
+    from xlsx_writer import write_xlsx
+
+
 def trim(text: str) -> str:
     """Removes extra spaces from text"""
     if pd.isna(text):
         return ""
-    return re.sub(r'\s+', ' ', str(text)).strip()
+    return ' '.join(str(text).split())
+
+
+_TITLE_STRIP_RE = re.compile(r'[^a-zA-Z0-9\s]')
+
+
+def clean_titles(titles: pd.Series) -> pd.Series:
+    """
+    Title key used for duplicate detection: only letters, digits and single
+    spaces remain. One compiled pattern removes the other characters and
+    split/join collapses the whitespace (str.split and \\s agree on what
+    whitespace is); a plain comprehension beats chained .str calls here.
+    """
+    return pd.Series(
+        [' '.join(_TITLE_STRIP_RE.sub('', title).split()) for title in titles.astype(str)],
+        index=titles.index, dtype=object,
+    )
+
 
 def merge_values(x):
     """
@@ -24,21 +52,59 @@ def merge_values(x):
         return ""
     return values[0]
 
+def _blank(values: pd.Series) -> pd.Series:
+    """NaN or whitespace-only cells, column-wise (pd.isna(v) or str(v).strip() == '')"""
+    return values.isna() | (values.astype(str).str.strip() == '')
+
+
+def _as_text(values: pd.Series) -> pd.Series:
+    """str(value) for every cell, '' for NaN. Text columns (the bulk of a
+    bibliographic frame) are detected with one C-level scan and skip the
+    per-cell str() call."""
+    text = values if infer_dtype(values, skipna=True) in ('string', 'empty') else values.map(str)
+    return text.where(values.notna(), '')
+
+
+def _merge_duplicates(M: pd.DataFrame, key: str) -> pd.DataFrame:
+    """
+    Collapses the records that share `key` into one row
+
+    Same frame as M.groupby(key, as_index=False).agg(...) with merge_values
+    (first non-NaN value as str, '' when there is none) on every column and
+    the sorted set of sources for DB_Original, but computed with groupby's
+    built-in first() and a drop_duplicates pass instead of one Python call
+    per group and column.
+    """
+    grouped = M.groupby(key, as_index=False).first()
+    for col in grouped.columns:
+        if col != key:
+            grouped[col] = _as_text(grouped[col])
+    if 'DB_Original' in grouped.columns:
+        sources = M[[key, 'DB_Original']].dropna()
+        sources = (sources.assign(DB_Original=sources['DB_Original'].map(str))
+                   .drop_duplicates()
+                   .sort_values('DB_Original', kind='stable'))
+        # Most keys come from a single source and take it as is; only keys
+        # seen in several sources are joined
+        multi = sources[key].duplicated(keep=False)
+        joined = pd.concat([
+            sources[~multi].set_index(key)['DB_Original'],
+            sources[multi].groupby(key)['DB_Original'].agg('; '.join),
+        ])
+        grouped['DB_Original'] = grouped[key].map(joined).fillna('')
+    return grouped
+
+
 def meta_tag_extraction(df: pd.DataFrame, tag: str) -> pd.DataFrame:
     """Creates SR (Source) tag"""
     if 'AU' in df.columns and 'PY' in df.columns:
-        def _sr(row):
-            au = row['AU']
-            py = row['PY']
-            # NaN / None / boş AU varsa güvenli fallback
-            if pd.isna(au) or au is None:
-                au_first = ""
-            else:
-                au_str = str(au)
-                au_first = au_str.split(';')[0].strip() if au_str else ""
-            py_str = "" if pd.isna(py) else str(py)
-            return f"{au_first} {py_str}".strip()
-        df['SR'] = df.apply(_sr, axis=1)
+        au, py = df['AU'], df['PY']
+        # First author + year; NaN / None AU or PY contributes "". A plain
+        # split(';', 1) per cell skips the per-cell lists of .str.split().str[0]
+        au_first = pd.Series([str(a).split(';', 1)[0].strip() for a in au.to_numpy()],
+                             index=au.index, dtype=object).where(au.notna(), '')
+        py_str = py.astype(str).where(py.notna(), '')
+        df['SR'] = (au_first + ' ' + py_str).str.strip()
     return df
 
 def clean_merged_values(x: str) -> str:
@@ -46,19 +112,9 @@ def clean_merged_values(x: str) -> str:
     if not isinstance(x, str):
         return x
     
-    # Split by semicolon and clean each part
-    parts = [part.strip() for part in x.split(';')]
-    
-    # Remove empty parts and duplicates while preserving order
-    seen = set()
-    cleaned_parts = []
-    for part in parts:
-        if part and part not in seen:
-            seen.add(part)
-            cleaned_parts.append(part)
-    
-    # Join back with semicolon
-    return '; '.join(cleaned_parts)
+    # Split by semicolon, drop empty parts and duplicates (dict keeps first-seen order)
+    parts = [part for part in map(str.strip, x.split(';')) if part]
+    return '; '.join(dict.fromkeys(parts))
 
 def merge_author_fields(wos_authors: str, scopus_authors: str) -> str:
     """
@@ -73,7 +129,7 @@ def merge_author_fields(wos_authors: str, scopus_authors: str) -> str:
     """
     def normalize_author(author):
         # Clean spaces
-        author = re.sub(r'\s+', ' ', author.strip())
+        author = ' '.join(author.split())
         # Normalize special characters
         author = unidecode(author)
         # Convert to uppercase
@@ -120,7 +176,7 @@ def merge_author_fullnames(wos_af: str, scopus_af: str) -> str:
         # Remove IDs in parentheses
         author = re.sub(r'\s*\([^)]*\)', '', author)
         # Clean spaces
-        author = re.sub(r'\s+', ' ', author.strip())
+        author = ' '.join(author.split())
         # Normalize special characters
         author = unidecode(author)
         return author
@@ -292,7 +348,7 @@ def merge_abstracts(wos_ab: str, scopus_ab: str) -> str:
         if pd.isna(ab) or not ab:
             return ""
         # Temizleme işlemleri
-        ab = re.sub(r'\s+', ' ', ab.strip())
+        ab = ' '.join(ab.split())
         # Copyright bilgisini kaldır
         ab = re.sub(r'©.*?RESERVED\.?$', '', ab, flags=re.IGNORECASE)
         return ab.strip()
@@ -310,6 +366,28 @@ def merge_abstracts(wos_ab: str, scopus_ab: str) -> str:
     # Her iki kaynak da varsa, daha uzun olanı tercih et
     return wos_ab if len(wos_ab) > len(scopus_ab) else scopus_ab
 
+@lru_cache(maxsize=100000)
+def _clean_keyword(kw: str) -> str:
+    """Collapses spaces and normalizes special letters (é->e, ñ->n, etc.) while
+    preserving case. Cached: the same keywords recur across many records."""
+    if not kw:
+        return ""
+    return unidecode(' '.join(kw.split()))
+
+
+def _merge_keyword_lists(wos_keywords, scopus_keywords) -> str:
+    """Shared body of merge_keywords and merge_index_keywords"""
+    kws = [kw for kw in map(_clean_keyword, str(wos_keywords).split(';')) if kw]
+    kws += [kw for kw in map(_clean_keyword, str(scopus_keywords).split(';')) if kw]
+    # Case-insensitive dedup keeping the first spelling: built from the reversed
+    # list, the earliest keyword is written last and wins. The order is
+    # dropped anyway by the sort below (the uppercase keys are unique).
+    rev = kws[::-1]
+    unique_keywords = dict(zip(map(str.upper, rev), rev)).values()
+    # Sort alphabetically (case-insensitive) for consistency
+    return '; '.join(sorted(unique_keywords, key=str.upper))
+
+
 def merge_keywords(wos_keywords: str, scopus_keywords: str) -> str:
     """
     Merges author keywords from WoS and Scopus while normalizing special letters.
@@ -322,35 +400,7 @@ def merge_keywords(wos_keywords: str, scopus_keywords: str) -> str:
     Returns:
         str: Merged keywords with duplicates removed
     """
-    def clean_keyword(kw):
-        if pd.isna(kw) or not kw:
-            return ""
-        # Remove extra spaces
-        kw = re.sub(r'\s+', ' ', kw.strip())
-        # Normalize special letters (é->e, ñ->n, etc.) while preserving case
-        kw = unidecode(kw)
-        return kw
-    
-    # Split and clean keywords
-    wos_kws = [clean_keyword(kw) for kw in str(wos_keywords).split(';') if clean_keyword(kw)]
-    scopus_kws = [clean_keyword(kw) for kw in str(scopus_keywords).split(';') if clean_keyword(kw)]
-    
-    # Create a case-insensitive set for duplicate checking
-    seen = set()
-    unique_keywords = []
-    
-    # Process all keywords
-    for kw in wos_kws + scopus_kws:
-        # Use uppercase version for checking duplicates
-        kw_upper = kw.upper()
-        if kw_upper not in seen:
-            seen.add(kw_upper)
-            unique_keywords.append(kw)
-    
-    # Sort alphabetically (case-insensitive) for consistency
-    unique_keywords.sort(key=str.upper)
-    
-    return '; '.join(unique_keywords)
+    return _merge_keyword_lists(wos_keywords, scopus_keywords)
 
 def merge_index_keywords(wos_keywords: str, scopus_keywords: str) -> str:
     """
@@ -364,35 +414,7 @@ def merge_index_keywords(wos_keywords: str, scopus_keywords: str) -> str:
     Returns:
         str: Merged keywords with duplicates removed
     """
-    def clean_keyword(kw):
-        if pd.isna(kw) or not kw:
-            return ""
-        # Remove extra spaces
-        kw = re.sub(r'\s+', ' ', kw.strip())
-        # Normalize special letters (é->e, ñ->n, etc.) while preserving case
-        kw = unidecode(kw)
-        return kw
-    
-    # Split and clean keywords
-    wos_kws = [clean_keyword(kw) for kw in str(wos_keywords).split(';') if clean_keyword(kw)]
-    scopus_kws = [clean_keyword(kw) for kw in str(scopus_keywords).split(';') if clean_keyword(kw)]
-    
-    # Create a case-insensitive set for duplicate checking
-    seen = set()
-    unique_keywords = []
-    
-    # Process all keywords
-    for kw in wos_kws + scopus_kws:
-        # Use uppercase version for checking duplicates
-        kw_upper = kw.upper()
-        if kw_upper not in seen:
-            seen.add(kw_upper)
-            unique_keywords.append(kw)
-    
-    # Sort alphabetically (case-insensitive) for consistency
-    unique_keywords.sort(key=str.upper)
-    
-    return '; '.join(unique_keywords)
+    return _merge_keyword_lists(wos_keywords, scopus_keywords)
 
 def merge_publisher(wos_pub: str, scopus_pub: str) -> str:
     """
@@ -410,7 +432,7 @@ def merge_publisher(wos_pub: str, scopus_pub: str) -> str:
         if pd.isna(pub) or not pub:
             return ""
         # Remove extra spaces
-        pub = re.sub(r'\s+', ' ', pub.strip())
+        pub = ' '.join(pub.split())
         # Normalize special characters while preserving case
         pub = unidecode(pub)
         return pub
@@ -483,7 +505,7 @@ def merge_language(wos_lang: str, scopus_lang: str) -> str:
         if pd.isna(lang) or not lang:
             return ""
         # Clean and normalize
-        lang = re.sub(r'\s+', ' ', lang.strip())
+        lang = ' '.join(lang.split())
         lang = unidecode(lang).upper()
         
         # Split if multiple languages
@@ -536,7 +558,7 @@ def merge_document_type(wos_dt: str, scopus_dt: str) -> str:
         if pd.isna(dt) or not dt:
             return ""
         # Remove extra spaces and convert to uppercase
-        dt = re.sub(r'\s+', ' ', str(dt).strip()).upper()
+        dt = ' '.join(str(dt).split()).upper()
         # Normalize special characters
         dt = unidecode(dt)
         # Remove any remaining special characters
@@ -633,7 +655,7 @@ def merge_open_access(wos_oa: str, scopus_oa: str) -> str:
         if pd.isna(oa) or not oa:
             return ""
         # Remove extra spaces and convert to uppercase
-        oa = re.sub(r'\s+', ' ', str(oa).strip()).upper()
+        oa = ' '.join(str(oa).split()).upper()
         # Normalize special characters
         oa = unidecode(oa)
         # Map to standard status if exists
@@ -662,6 +684,25 @@ def merge_open_access(wos_oa: str, scopus_oa: str) -> str:
     # If both are the same or empty
     return wos_oa or 'NON OPEN ACCESS'
 
+_AUTHOR_ID_RE = re.compile(r'\s*\([^)]*\)')
+
+
+def _clean_author_fullnames(author_str) -> str:
+    """Scopus AF value without author IDs; patterns are compiled once at import."""
+    if pd.isna(author_str) or not author_str:
+        return ""
+    cleaned_authors = []
+    for author in author_str.split(';'):
+        # Remove ID in parentheses (only authors that have one) and clean extra
+        # spaces (split/join collapses whitespace runs)
+        if '(' in author:
+            author = _AUTHOR_ID_RE.sub('', author)
+        author = ' '.join(author.split())
+        if author:
+            cleaned_authors.append(author)
+    return '; '.join(cleaned_authors)
+
+
 def clean_scopus_author_fullnames(df: pd.DataFrame) -> pd.DataFrame:
     """
     Cleans Scopus author full names by removing IDs and converting to WoS format.
@@ -676,26 +717,8 @@ def clean_scopus_author_fullnames(df: pd.DataFrame) -> pd.DataFrame:
     """
     if 'AF' not in df.columns:
         return df
-        
-    def clean_author(author_str):
-        if pd.isna(author_str) or not author_str:
-            return ""
-            
-        # Split multiple authors
-        authors = [a.strip() for a in author_str.split(';')]
-        cleaned_authors = []
-        
-        for author in authors:
-            # Remove ID in parentheses
-            author = re.sub(r'\s*\([^)]*\)', '', author)
-            # Clean extra spaces
-            author = re.sub(r'\s+', ' ', author.strip())
-            if author:
-                cleaned_authors.append(author)
-                
-        return '; '.join(cleaned_authors)
     
-    df['AF'] = df['AF'].apply(clean_author)
+    df['AF'] = df['AF'].map(_clean_author_fullnames)
     return df
 
 def merge_source_title(wos_so: str, scopus_so: str) -> str:
@@ -715,7 +738,7 @@ def merge_source_title(wos_so: str, scopus_so: str) -> str:
         if pd.isna(title) or not title:
             return ""
         # Remove extra spaces
-        title = re.sub(r'\s+', ' ', str(title).strip())
+        title = ' '.join(str(title).split())
         return title
     
     # Clean both titles
@@ -731,6 +754,24 @@ def merge_source_title(wos_so: str, scopus_so: str) -> str:
     # If neither has data, return empty string
     return ""
 
+def _merge_field_values(M: pd.DataFrame, field: str, wos_data: pd.DataFrame,
+                        scopus_data: pd.DataFrame, merge) -> None:
+    """
+    Column-wise form of the per-record field merge loop
+
+    Records whose `field` is NaN are skipped; the others get
+    merge(wos value, scopus value) when either is truthy, a record missing
+    from a source contributing ''. The records are picked with one mask and
+    the merged values written back in one assignment, instead of scalar
+    .at reads, index lookups and writes per record.
+    """
+    wos = wos_data[field].reindex(M.index, fill_value='')
+    scopus = scopus_data[field].reindex(M.index, fill_value='')
+    rows = M[field].notna() & (wos.astype(bool) | scopus.astype(bool))
+    if rows.any():
+        M.loc[rows, field] = [merge(w, s) for w, s in zip(wos[rows], scopus[rows])]
+
+
 def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True, merge_fields: bool = True, verbose: bool = False) -> pd.DataFrame:
     """
     Merges bibliometric data from different databases.
@@ -759,16 +800,17 @@ def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True,
     # Clean Scopus author full names before merging
     cleaned_dataframes = []
     for df in dataframes:
-        if 'DB' in df.columns:
-            # Create temporary RP columns based on source
-            if df['DB'].iloc[0] == 'SCOPUS' and 'RP' in df.columns:
-                df['RP_SCOPUS'] = df['RP']
-                df['RP_WOS'] = ''
-            elif df['DB'].iloc[0] == 'ISI' and 'RP' in df.columns:
-                df['RP_WOS'] = df['RP']
-                df['RP_SCOPUS'] = ''
+        # Source database of the frame, read once
+        source = df['DB'].iloc[0] if 'DB' in df.columns else None
+        # Create temporary RP columns based on source
+        if source == 'SCOPUS' and 'RP' in df.columns:
+            df['RP_SCOPUS'] = df['RP']
+            df['RP_WOS'] = ''
+        elif source == 'ISI' and 'RP' in df.columns:
+            df['RP_WOS'] = df['RP']
+            df['RP_SCOPUS'] = ''
             
-        if 'DB' in df.columns and df['DB'].iloc[0] == 'SCOPUS':
+        if source == 'SCOPUS':
             df = clean_scopus_author_fullnames(df)
         cleaned_dataframes.append(df)
     
@@ -784,37 +826,29 @@ def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True,
             # Group by DOI and select the most complete data within each group
             if 'DI' in M.columns:
                 # Group records with DOI
-                grouped = M[~M['DI'].isna()].groupby('DI', as_index=False).agg(
-                    lambda x: '; '.join(sorted(set(str(val) for val in x if pd.notna(val)))) if x.name == 'DB_Original'
-                    else merge_values(x)
-                )
+                has_doi = M['DI'].notna()
+                grouped = _merge_duplicates(M[has_doi], 'DI')
                 
                 # Update DB field for merged records
-                grouped.loc[grouped['DB_Original'].str.contains(';'), 'DB'] = 'BIBEXPY'
+                grouped.loc[grouped['DB_Original'].str.contains(';', regex=False), 'DB'] = 'BIBEXPY'
                 
                 # Add records without DOI
-                no_doi = M[M['DI'].isna()]
+                no_doi = M[~has_doi]
                 M = pd.concat([grouped, no_doi], ignore_index=True)
             
             # Check duplicates by title and year
             if 'TI' in M.columns and 'PY' in M.columns:
-                # Clean titles
-                M['clean_title'] = M['TI'].apply(lambda x: re.sub(r'[^a-zA-Z0-9\s]', '', str(x)))
-                M['clean_title'] = M['clean_title'].apply(trim)
-                
-                # Group by title and year
-                M['title_year'] = M['clean_title'] + ' ' + M['PY'].astype(str)
+                # Group by cleaned title and year; only the key is added to the
+                # frame, so no helper column is aggregated and dropped again
+                M['title_year'] = clean_titles(M['TI']) + ' ' + M['PY'].astype(str)
                 
                 # Select the most complete data for each group
-                grouped = M.groupby('title_year', as_index=False).agg(
-                    lambda x: '; '.join(sorted(set(str(val) for val in x if pd.notna(val)))) if x.name == 'DB_Original'
-                    else merge_values(x)
-                )
+                grouped = _merge_duplicates(M, 'title_year')
                 
                 # Update DB field for merged records
-                grouped.loc[grouped['DB_Original'].str.contains(';'), 'DB'] = 'BIBEXPY'
+                grouped.loc[grouped['DB_Original'].str.contains(';', regex=False), 'DB'] = 'BIBEXPY'
                 
-                M = grouped.drop(['title_year', 'clean_title'], axis=1)
+                M = grouped.drop('title_year', axis=1)
         else:
             # Just remove duplicate records
             if 'DI' in M.columns:
@@ -822,39 +856,47 @@ def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True,
                 M = M[~duplicates]
             
             if 'TI' in M.columns and 'PY' in M.columns:
-                clean_titles = M['TI'].apply(lambda x: re.sub(r'[^a-zA-Z0-9\s]', '', str(x)))
-                clean_titles = clean_titles.apply(trim)
-                title_year = clean_titles + ' ' + M['PY'].astype(str)
+                # (title, year) pairs compared on factorized codes instead of a
+                # concatenated string key; numeric years are equal exactly when
+                # their str() is, other years are compared as text
+                year = M['PY'] if M['PY'].dtype.kind in 'iuf' else M['PY'].astype(str)
+                title_year = pd.DataFrame({'title': clean_titles(M['TI']), 'year': year})
                 duplicates = title_year.duplicated()
                 M = M[~duplicates]
     
     # If there are multiple databases
-    if len(M['DB'].unique()) > 1:
+    if M['DB'].nunique(dropna=False) > 1:
         # DB'yi ISI'ya set edelim
         M['DB'] = 'ISI'
         
         # Complete WC and SC fields from each other
         if 'WC' in M.columns and 'SC' in M.columns:
             # Fill WC from SC if WC is empty
-            M['WC'] = M.apply(lambda row: row['SC'] if (pd.isna(row['WC']) or str(row['WC']).strip() == '') and pd.notna(row['SC']) else row['WC'], axis=1)
+            M['WC'] = M['WC'].mask(_blank(M['WC']) & M['SC'].notna(), M['SC'])
             # Fill SC from WC if SC is empty
-            M['SC'] = M.apply(lambda row: row['WC'] if (pd.isna(row['SC']) or str(row['SC']).strip() == '') and pd.notna(row['WC']) else row['SC'], axis=1)
+            M['SC'] = M['SC'].mask(_blank(M['SC']) & M['WC'].notna(), M['WC'])
         
         # Merge RP data using temporary columns
         if 'RP_WOS' in M.columns and 'RP_SCOPUS' in M.columns:
-            M['RP'] = M.apply(lambda row: row['RP_WOS'] if pd.notna(row['RP_WOS']) and str(row['RP_WOS']).strip() 
-                             else (row['RP_SCOPUS'] if pd.notna(row['RP_SCOPUS']) and str(row['RP_SCOPUS']).strip() else ''), 
-                             axis=1)
+            rp_scopus = M['RP_SCOPUS'].mask(_blank(M['RP_SCOPUS']), '')
+            M['RP'] = M['RP_WOS'].mask(_blank(M['RP_WOS']), rp_scopus)
             # Drop temporary columns
             M = M.drop(['RP_WOS', 'RP_SCOPUS'], axis=1)
         
+        # Source subsets, split once for all field merges below. Each merge only
+        # rewrites its own column, so this snapshot holds the same values the
+        # merges used to read from a fresh split per field.
+        wos_data = M[M['DB_Original'] == 'ISI']
+        scopus_data = M[M['DB_Original'] == 'SCOPUS']
+        # Records with a value from both sources. The AU/AF merges need both and
+        # the JI merge only rewrites a cell with its own value otherwise, so those
+        # loops visit these records only (none when the source sets are disjoint)
+        in_both = wos_data.index.intersection(scopus_data.index)
+        
         # Clean author data using new merge function
         if 'AU' in M.columns:
-            wos_data = M[M['DB_Original'] == 'ISI']
-            scopus_data = M[M['DB_Original'] == 'SCOPUS']
-            
             if not wos_data.empty and not scopus_data.empty:
-                for idx in M.index:
+                for idx in in_both:
                     if pd.isna(M.at[idx, 'AU']):
                         continue
                         
@@ -866,11 +908,8 @@ def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True,
         
         # Clean author full names using WoS format
         if 'AF' in M.columns:
-            wos_data = M[M['DB_Original'] == 'ISI']
-            scopus_data = M[M['DB_Original'] == 'SCOPUS']
-            
             if not wos_data.empty and not scopus_data.empty:
-                for idx in M.index:
+                for idx in in_both:
                     if pd.isna(M.at[idx, 'AF']):
                         continue
                         
@@ -882,9 +921,6 @@ def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True,
         
         # Use Scopus source title when available, otherwise use WoS
         if 'SO' in M.columns:
-            wos_data = M[M['DB_Original'] == 'ISI']
-            scopus_data = M[M['DB_Original'] == 'SCOPUS']
-            
             if not wos_data.empty and not scopus_data.empty:
                 for idx in M.index:
                     try:
@@ -912,11 +948,8 @@ def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True,
         
         # Use WoS journal abbreviation when available, otherwise use Scopus
         if 'JI' in M.columns:
-            wos_data = M[M['DB_Original'] == 'ISI']
-            scopus_data = M[M['DB_Original'] == 'SCOPUS']
-            
             if not wos_data.empty and not scopus_data.empty:
-                for idx in M.index:
+                for idx in in_both:
                     if pd.isna(M.at[idx, 'JI']):
                         continue
                         
@@ -931,10 +964,6 @@ def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True,
         
         # Clean addresses using WoS format
         if 'C1' in M.columns:
-            # Get WoS and Scopus data
-            wos_data = M[M['DB_Original'] == 'ISI'].copy()
-            scopus_data = M[M['DB_Original'] == 'SCOPUS'].copy()
-            
             # Initialize C1 column if not exists
             if 'C1' not in M.columns:
                 M['C1'] = ''
@@ -962,9 +991,6 @@ def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True,
         
         # Clean and merge abstracts
         if 'AB' in M.columns:
-            wos_data = M[M['DB_Original'] == 'ISI']
-            scopus_data = M[M['DB_Original'] == 'SCOPUS']
-            
             if not wos_data.empty and not scopus_data.empty:
                 for idx in M.index:
                     if pd.isna(M.at[idx, 'AB']):
@@ -978,47 +1004,22 @@ def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True,
         
         # Clean and merge author keywords
         if 'DE' in M.columns:
-            wos_data = M[M['DB_Original'] == 'ISI']
-            scopus_data = M[M['DB_Original'] == 'SCOPUS']
-            
             if not wos_data.empty and not scopus_data.empty:
-                for idx in M.index:
-                    if pd.isna(M.at[idx, 'DE']):
-                        continue
-                        
-                    wos_keywords = wos_data.at[idx, 'DE'] if idx in wos_data.index else ''
-                    scopus_keywords = scopus_data.at[idx, 'DE'] if idx in scopus_data.index else ''
-                    
-                    if wos_keywords or scopus_keywords:
-                        M.at[idx, 'DE'] = merge_keywords(wos_keywords, scopus_keywords)
+                _merge_field_values(M, 'DE', wos_data, scopus_data, merge_keywords)
         
         # Clean and merge index keywords
         if 'ID' in M.columns:
-            wos_data = M[M['DB_Original'] == 'ISI']
-            scopus_data = M[M['DB_Original'] == 'SCOPUS']
-            
             if not wos_data.empty and not scopus_data.empty:
-                for idx in M.index:
-                    if pd.isna(M.at[idx, 'ID']):
-                        continue
-                        
-                    wos_keywords = wos_data.at[idx, 'ID'] if idx in wos_data.index else ''
-                    scopus_keywords = scopus_data.at[idx, 'ID'] if idx in scopus_data.index else ''
-                    
-                    if wos_keywords or scopus_keywords:
-                        M.at[idx, 'ID'] = merge_index_keywords(wos_keywords, scopus_keywords)
+                _merge_field_values(M, 'ID', wos_data, scopus_data, merge_index_keywords)
         
         # Clean and merge references
         if 'CR' in M.columns:
-            wos_data = M[M['DB_Original'] == 'ISI']
-            scopus_data = M[M['DB_Original'] == 'SCOPUS']
-            
             if not wos_data.empty and not scopus_data.empty:
                 for idx in M.index:
                     try:
                         # Get references from both sources
-                        wos_refs = wos_data.loc[wos_data.index == idx, 'CR'].iloc[0] if idx in wos_data.index else ''
-                        scopus_refs = scopus_data.loc[scopus_data.index == idx, 'CR'].iloc[0] if idx in scopus_data.index else ''
+                        wos_refs = wos_data.at[idx, 'CR'] if idx in wos_data.index else ''
+                        scopus_refs = scopus_data.at[idx, 'CR'] if idx in scopus_data.index else ''
                         
                         # Convert NaN to empty string
                         wos_refs = '' if pd.isna(wos_refs) else str(wos_refs)
@@ -1035,9 +1036,6 @@ def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True,
         
         # Clean and merge publisher names
         if 'PU' in M.columns:
-            wos_data = M[M['DB_Original'] == 'ISI']
-            scopus_data = M[M['DB_Original'] == 'SCOPUS']
-            
             if not wos_data.empty and not scopus_data.empty:
                 for idx in M.index:
                     if pd.isna(M.at[idx, 'PU']):
@@ -1051,9 +1049,6 @@ def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True,
         
         # Clean and merge language information
         if 'LA' in M.columns:
-            wos_data = M[M['DB_Original'] == 'ISI']
-            scopus_data = M[M['DB_Original'] == 'SCOPUS']
-            
             if not wos_data.empty and not scopus_data.empty:
                 for idx in M.index:
                     wos_lang = wos_data.at[idx, 'LA'] if idx in wos_data.index else ''
@@ -1063,9 +1058,6 @@ def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True,
         
         # Clean and merge document types
         if 'DT' in M.columns:
-            wos_data = M[M['DB_Original'] == 'ISI']
-            scopus_data = M[M['DB_Original'] == 'SCOPUS']
-            
             if not wos_data.empty and not scopus_data.empty:
                 for idx in M.index:
                     try:
@@ -1093,9 +1085,6 @@ def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True,
         
         # Clean and merge unique identifiers
         if 'UT' in M.columns:
-            wos_data = M[M['DB_Original'] == 'ISI']
-            scopus_data = M[M['DB_Original'] == 'SCOPUS']
-            
             if not wos_data.empty and not scopus_data.empty:
                 for idx in M.index:
                     # WoS verisi varsa onu kullan
@@ -1107,9 +1096,6 @@ def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True,
         
         # Clean and merge URLs
         if 'URL' in M.columns:
-            wos_data = M[M['DB_Original'] == 'ISI']
-            scopus_data = M[M['DB_Original'] == 'SCOPUS']
-            
             if not wos_data.empty and not scopus_data.empty:
                 for idx in M.index:
                     wos_url = wos_data.at[idx, 'URL'] if idx in wos_data.index else ''
@@ -1119,9 +1105,6 @@ def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True,
         
         # Clean and merge Open Access status
         if 'OA' in M.columns:
-            wos_data = M[M['DB_Original'] == 'ISI']
-            scopus_data = M[M['DB_Original'] == 'SCOPUS']
-            
             if not wos_data.empty and not scopus_data.empty:
                 for idx in M.index:
                     wos_oa = wos_data.at[idx, 'OA'] if idx in wos_data.index else ''
@@ -1134,6 +1117,33 @@ def merge_db_sources(*dataframes: pd.DataFrame, remove_duplicated: bool = True,
     
     return M
 
+# Upper bound on workbooks parsed at the same time in main()
+MAX_READ_WORKERS = 8
+
+
+def _read_source(file_path: str):
+    """(frame, None) or (None, error message) for one rawData workbook"""
+    try:
+        return read_xlsx(file_path), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _read_sources(paths: List[str]) -> list:
+    """
+    Reads the workbooks with _read_source, in separate processes when there
+    are several files and CPUs
+
+    Parsing XLSX is CPU-bound Python, so threads would not overlap. Results
+    keep the order of `paths`.
+    """
+    workers = min(MAX_READ_WORKERS, len(paths), os.cpu_count() or 1)
+    if workers < 2:
+        return [_read_source(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_read_source, paths))
+
+
 def main():
     try:
         print("Database Merge Tool")
@@ -1156,15 +1166,14 @@ def main():
             print(f"{i}. {file}")
         
         dataframes = []
-        for file in excel_files:
-            try:
-                file_path = os.path.join(raw_data_path, file)
-                df = pd.read_excel(file_path)
-                dataframes.append(df)
-                print(f"\n{file} loaded successfully.")
-                print(f"Record count: {len(df)}")
-            except Exception as e:
-                print(f"Error: Could not read file {file}: {str(e)}")
+        loaded = _read_sources([os.path.join(raw_data_path, file) for file in excel_files])
+        for file, (df, error) in zip(excel_files, loaded):
+            if error is not None:
+                print(f"Error: Could not read file {file}: {error}")
+                continue
+            dataframes.append(df)
+            print(f"\n{file} loaded successfully.")
+            print(f"Record count: {len(df)}")
         
         if not dataframes:
             print("\nNo files could be read!")
@@ -1175,7 +1184,7 @@ def main():
         
         # Save merged file
         output_file = "merged_data.xlsx"
-        merged_df.to_excel(output_file, index=True)  # SR will be used as index
+        write_xlsx(merged_df, output_file, index=True)  # SR will be used as index
         
         print(f"\nMerged data saved to {output_file}")
         print(f"Total record count: {len(merged_df)}")
@@ -5,7 +5,9 @@ import re
 import json
 import time
 import difflib
+import threading
 from functools import lru_cache
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
 
 # Load .env file
@@ -16,12 +18,61 @@ load_dotenv()
 REQUEST_TIMEOUT = (5, 20)
 
 
+# Host başına iki istek arasındaki en kısa süre (sn). 429 almadan önce
+# yavaşlamak için: eşzamanlı işçiler aynı API'ye aynı anda yüklenmesin.
+_HOST_MIN_INTERVAL = {
+    "api.crossref.org": 0.02,        # polite pool ~50 rps
+    "api.openalex.org": 0.1,         # 10 rps
+    "api.elsevier.com": 0.12,        # Scopus ~9 rps
+    "api.semanticscholar.org": 1.0,  # anahtarsız paylaşımlı havuz
+}
+_DEFAULT_MIN_INTERVAL = 0.1
+
+
+class _HostThrottle:
+    """Host başına istek aralığı; 429/503 Retry-After'ı tüm işçilere yayar."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_at = {}
+
+    def wait(self, host: str) -> None:
+        interval = _HOST_MIN_INTERVAL.get(host, _DEFAULT_MIN_INTERVAL)
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next_at.get(host, 0.0))
+            self._next_at[host] = at + interval
+        if at > now:
+            time.sleep(at - now)
+
+    def back_off(self, host: str, delay: float) -> None:
+        with self._lock:
+            until = time.monotonic() + delay
+            if until > self._next_at.get(host, 0.0):
+                self._next_at[host] = until
+
+
+_throttle = _HostThrottle()
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """İş parçacığı başına Session — aynı API'ye keep-alive bağlantı yeniden kullanılır."""
+    s = getattr(_local, "session", None)
+    if s is None:
+        s = _local.session = requests.Session()
+    return s
+
+
 def _get_with_retry(url: str, *, headers: dict | None = None, attempts: int = 3, **kw):
-    """requests.get + zorunlu timeout + 429/503 üstel backoff (Retry-After saygılı)."""
+    """requests.get + zorunlu timeout + host başına hız sınırı + 429/503 üstel backoff
+    (Retry-After saygılı)."""
+    host = urlsplit(url).hostname or ""
     last = None
     for i in range(attempts):
+        _throttle.wait(host)
         try:
-            r = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT, **kw)
+            r = _session().get(url, headers=headers, timeout=REQUEST_TIMEOUT, **kw)
         except requests.RequestException as e:
             last = e
             time.sleep(min(2 ** i, 8))
@@ -32,7 +83,9 @@ def _get_with_retry(url: str, *, headers: dict | None = None, attempts: int = 3,
                 delay = float(retry_after) if retry_after else min(2 ** i, 8)
             except (TypeError, ValueError):
                 delay = min(2 ** i, 8)
-            time.sleep(min(delay, 15))
+            delay = min(delay, 15)
+            # Diğer işçiler de bu host'a istek atmadan beklesin
+            _throttle.back_off(host, delay)
             last = r
             continue
         return r
@@ -970,28 +1023,45 @@ def truncate_url_list(url_list: str, max_length: int = 2079) -> str:
     # URL'leri birleştir
     return '; '.join(result)
 
+
+# Erken çıkış için: API'lerin doldurabileceği alanlar. OI(ORCID)/RI/ROR/CC yeni
+# eklendi (yazar/kurum kimliği — disambiguation için). Modül düzeyinde: her DOI
+# çağrısında yeniden kurulmaz.
+FILLABLE_FIELDS: tuple[str, ...] = (
+    "DI", "DT", "AU", "AF", "TI", "PY", "SO", "PU", "SN", "UR", "AB", "DE",
+    "C1", "TC", "CR", "LA", "WC", "SC", "OI", "RI", "ROR", "CC",
+)
+_BLANK_STRINGS = frozenset(("", "nan", "NaN", "None"))
+
+
+def _is_blank_value(v) -> bool:
+    if v is None:
+        return True
+    try:
+        if pd.isna(v):
+            return True
+    except (TypeError, ValueError):
+        pass
+    return str(v).strip() in _BLANK_STRINGS
+
+
+# DOI öneki (10.xxxx) -> kayıt ajansı ('Crossref' | 'DataCite'). Bir önek tek
+# ajansa kayıtlıdır; ilk başarılı yanıttan öğrenilir ve aynı önekli DOI'lerde
+# diğer ajansın API'si (ve yalnız Crossref DOI'lerini tanıyan Unpaywall) atlanır.
+_DOI_AUTHORITY: dict = {}
+
+
+def _doi_prefix(doi: str) -> str:
+    return str(doi).strip().split('/', 1)[0].lower()
+
+
 def extract_metadata(doi: str, current_data: dict, scopus_api_key: str = None, semantic_scholar_key: str = None, unpaywall_email: str = None, crossref_email: str = None) -> dict:
     """Try to extract metadata from multiple sources"""
     metadata = current_data.copy()
     api_sources = {}  # Track which fields came from which API
 
-    # Erken çıkış için: API'lerin doldurabileceği alanlar. OI(ORCID)/RI/ROR/CC yeni
-    # eklendi (yazar/kurum kimliği — disambiguation için).
-    _FILLABLE = ("DI", "DT", "AU", "AF", "TI", "PY", "SO", "PU", "SN", "UR", "AB", "DE",
-                 "C1", "TC", "CR", "LA", "WC", "SC", "OI", "RI", "ROR", "CC")
-
-    def _is_blank(v) -> bool:
-        if v is None:
-            return True
-        try:
-            if pd.isna(v):
-                return True
-        except (TypeError, ValueError):
-            pass
-        return str(v).strip() in ("", "nan", "NaN", "None")
-
     def _remaining() -> bool:
-        return any(_is_blank(metadata.get(f)) for f in _FILLABLE)
+        return any(_is_blank_value(metadata.get(f)) for f in FILLABLE_FIELDS)
 
     try:
         # Get API credentials from config file
@@ -1014,25 +1084,31 @@ def extract_metadata(doi: str, current_data: dict, scopus_api_key: str = None, s
             print("You can add it to enable Unpaywall metadata enrichment.")
             print("Continuing with other data sources...")
         
+        prefix = _doi_prefix(doi)
+
         # CrossRef
         print(f"\nTrying CrossRef API...", end='')
-        try:
-            crossref_data = extract_metadata_from_crossref(doi, crossref_email)
-            if crossref_data:
-                for key, value in crossref_data.items():
-                    if pd.isna(metadata.get(key, None)) or str(metadata.get(key, '')).strip() == '':
-                        # URL içeren alanları kısalt
-                        if isinstance(value, str) and ('http://' in value or 'https://' in value):
-                            value = truncate_url_list(value)
-                        metadata[key] = value
-                        if pd.notna(value) and str(value).strip() != '':
-                            api_sources[key] = 'CrossRef'
-                print(" [SUCCESS]")
-            else:
-                print(" [NO DATA]")
-        except Exception as e:
-            print(f" [ERROR: {str(e)}]")
-        
+        if _DOI_AUTHORITY.get(prefix) == 'DataCite':
+            print(" [SKIPPED - DataCite DOI]")
+        else:
+            try:
+                crossref_data = extract_metadata_from_crossref(doi, crossref_email)
+                if crossref_data:
+                    _DOI_AUTHORITY.setdefault(prefix, 'Crossref')
+                    for key, value in crossref_data.items():
+                        if pd.isna(metadata.get(key, None)) or str(metadata.get(key, '')).strip() == '':
+                            # URL içeren alanları kısalt
+                            if isinstance(value, str) and ('http://' in value or 'https://' in value):
+                                value = truncate_url_list(value)
+                            metadata[key] = value
+                            if pd.notna(value) and str(value).strip() != '':
+                                api_sources[key] = 'CrossRef'
+                    print(" [SUCCESS]")
+                else:
+                    print(" [NO DATA]")
+            except Exception as e:
+                print(f" [ERROR: {str(e)}]")
+
         # OpenAlex
         print(f"Trying OpenAlex API...", end='')
         try:
@@ -1075,21 +1151,19 @@ def extract_metadata(doi: str, current_data: dict, scopus_api_key: str = None, s
                                 api_sources[key] = 'Scopus'
                     print(" [SUCCESS]")
                 else:
-                    response = requests.get(f"https://api.elsevier.com/content/abstract/doi/{doi}",
-                                         headers={'X-ELS-APIKey': scopus_api_key, 'Accept': 'application/json'}, timeout=REQUEST_TIMEOUT)
-                    print(f" [NO DATA - Status: {response.status_code}, Response: {response.text[:100]}...]")
+                    print(" [NO DATA]")
             except Exception as e:
                 print(f" [ERROR: {str(e)}]")
         
         # DataCite
         print(f"Trying DataCite API...", end='')
-        try:
-            response = requests.get(f"https://api.datacite.org/dois/{doi}", headers={'Accept': 'application/vnd.api+json'}, timeout=REQUEST_TIMEOUT)
-            if response.status_code != 200:
-                print(f" [NO DATA - Status: {response.status_code}]")
-            else:
+        if _DOI_AUTHORITY.get(prefix) == 'Crossref':
+            print(" [SKIPPED - Crossref DOI]")
+        else:
+            try:
                 datacite_data = extract_metadata_from_datacite(doi)
                 if datacite_data:
+                    _DOI_AUTHORITY.setdefault(prefix, 'DataCite')
                     for key, value in datacite_data.items():
                         if pd.isna(metadata.get(key, None)) or str(metadata.get(key, '')).strip() == '':
                             metadata[key] = value
@@ -1097,12 +1171,12 @@ def extract_metadata(doi: str, current_data: dict, scopus_api_key: str = None, s
                                 api_sources[key] = 'DataCite'
                     print(" [SUCCESS]")
                 else:
-                    print(f" [NO DATA - Empty Response]")
-        except Exception as e:
-            print(f" [ERROR: {str(e)}]")
-        
-        # Unpaywall
-        if unpaywall_email:
+                    print(" [NO DATA]")
+            except Exception as e:
+                print(f" [ERROR: {str(e)}]")
+
+        # Unpaywall (yalnız Crossref DOI'leri)
+        if unpaywall_email and _DOI_AUTHORITY.get(prefix) != 'DataCite':
             print(f"Trying Unpaywall API...", end='')
             try:
                 unpaywall_data = extract_metadata_from_unpaywall(doi, unpaywall_email)
@@ -1121,22 +1195,16 @@ def extract_metadata(doi: str, current_data: dict, scopus_api_key: str = None, s
         # Europe PMC
         print(f"Trying Europe PMC API...", end='')
         try:
-            response = requests.get(f"https://www.ebi.ac.uk/europepmc/webservices/rest/search?query=DOI:{doi}&format=json", timeout=REQUEST_TIMEOUT)
-            if response.status_code != 200:
-                print(f" [NO DATA - Status: {response.status_code}]")
+            europepmc_data = extract_metadata_from_europepmc(doi)
+            if europepmc_data:
+                for key, value in europepmc_data.items():
+                    if pd.isna(metadata.get(key, None)) or str(metadata.get(key, '')).strip() == '':
+                        metadata[key] = value
+                        if pd.notna(value) and str(value).strip() != '':
+                            api_sources[key] = 'Europe PMC'
+                print(" [SUCCESS]")
             else:
-                europepmc_data = extract_metadata_from_europepmc(doi)
-                if europepmc_data:
-                    for key, value in europepmc_data.items():
-                        if pd.isna(metadata.get(key, None)) or str(metadata.get(key, '')).strip() == '':
-                            metadata[key] = value
-                            if pd.notna(value) and str(value).strip() != '':
-                                api_sources[key] = 'Europe PMC'
-                    print(" [SUCCESS]")
-                else:
-                    data = response.json()
-                    hit_count = data.get('hitCount', 0)
-                    print(f" [NO DATA - Hit Count: {hit_count}]")
+                print(" [NO DATA]")
         except Exception as e:
             print(f" [ERROR: {str(e)}]")
         
@@ -5,6 +5,7 @@ from sklearn.multioutput import MultiOutputClassifier
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import MultiLabelBinarizer
 import re
+from functools import lru_cache
 from colorama import Fore, Style
 
 # NLTK OPSIYONELDIR. Import veya veri (punkt/stopwords) yoksa builtin fallback'lere
@@ -59,26 +60,44 @@ def _ensure_nltk() -> bool:
     return _nltk_ready
 
 
-def _tokenize(text: str) -> list:
-    """NLTK varsa word_tokenize; yoksa basit regex tokenizer."""
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def _regex_tokenize(text: str) -> list:
+    return _WORD_RE.findall(text)
+
+
+@lru_cache(maxsize=None)
+def _tokenizer():
+    """Kullanilacak tokenizer bir kez secilir: NLTK word_tokenize gercekten
+    calisiyorsa (veri eksikse ilk denemede LookupError verir) o, degilse regex.
+    Her kayitta import + hata yakalayip fallback'e dusmek yerine."""
     if _ensure_nltk():
         try:
             from nltk.tokenize import word_tokenize
-            return word_tokenize(text)
+            word_tokenize("probe text")
+            return word_tokenize
         except Exception:
             pass
-    return re.findall(r"[a-z]+", text)
+    return _regex_tokenize
+
+
+def _tokenize(text: str) -> list:
+    """NLTK varsa word_tokenize; yoksa basit regex tokenizer."""
+    return _tokenizer()(text)
 
 
-def _stopword_set() -> set:
-    """NLTK varsa Ingilizce stopword'leri; yoksa builtin fallback."""
+@lru_cache(maxsize=None)
+def _stopword_set() -> frozenset:
+    """NLTK varsa Ingilizce stopword'leri; yoksa builtin fallback.
+    Bir kez kurulur: preprocess_text her kayit icin cagirir, liste sabittir."""
     if _ensure_nltk():
         try:
             from nltk.corpus import stopwords
-            return set(stopwords.words('english'))
+            return frozenset(stopwords.words('english'))
         except Exception:
             pass
-    return set(_FALLBACK_STOPWORDS)
+    return _FALLBACK_STOPWORDS
 
 
 def preprocess_text(text):
@@ -101,10 +120,13 @@ def prepare_training_data(df, text_columns=['TI', 'AB']):
     
     return processed_text
 
-def train_keyword_model(train_df, text_columns=['TI', 'AB']):
-    """Train model for keyword prediction"""
+def train_keyword_model(train_df, text_columns=['TI', 'AB'], texts=None):
+    """Train model for keyword prediction
+
+    texts: train_df satirlarinin on-islenmis metni, cagiran zaten hesapladiysa
+    """
     # Prepare text data
-    X = prepare_training_data(train_df, text_columns)
+    X = prepare_training_data(train_df, text_columns) if texts is None else texts
     
     # Prepare keywords data
     mlb = MultiLabelBinarizer()
@@ -117,15 +139,15 @@ def train_keyword_model(train_df, text_columns=['TI', 'AB']):
     X_tfidf = vectorizer.fit_transform(X)
     
     # Train model
-    model = MultiOutputClassifier(RandomForestClassifier(n_estimators=100))
+    model = MultiOutputClassifier(RandomForestClassifier(n_estimators=100, n_jobs=-1))
     model.fit(X_tfidf, y)
     
     return vectorizer, model, mlb
 
-def train_subject_model(train_df, text_columns=['TI', 'AB']):
+def train_subject_model(train_df, text_columns=['TI', 'AB'], texts=None):
     """Train model for subject category prediction"""
     # Prepare text data
-    X = prepare_training_data(train_df, text_columns)
+    X = prepare_training_data(train_df, text_columns) if texts is None else texts
     
     # Prepare subject categories data
     mlb = MultiLabelBinarizer()
@@ -138,53 +160,43 @@ def train_subject_model(train_df, text_columns=['TI', 'AB']):
     X_tfidf = vectorizer.fit_transform(X)
     
     # Train model
-    model = MultiOutputClassifier(RandomForestClassifier(n_estimators=100))
+    model = MultiOutputClassifier(RandomForestClassifier(n_estimators=100, n_jobs=-1))
     model.fit(X_tfidf, y)
     
     return vectorizer, model, mlb
 
+def predict_labels(processed_texts, vectorizer, model, mlb, threshold=0.3):
+    """On-islenmis metinlerin hepsi icin tek seferde tahmin: tek transform ve
+    her alt model icin tek predict_proba (kayit basina ayri cagri yerine).
+    Kayit basina sonuc predict_keywords/predict_subjects ile aynidir."""
+    if not len(processed_texts):
+        return []
+    X_tfidf = vectorizer.transform(processed_texts)
+    # Alt model basina (n_kayit, n_sinif) olasilik matrisi
+    probas = model.predict_proba(X_tfidf)
+    
+    results = []
+    for row in range(X_tfidf.shape[0]):
+        # Get labels above threshold
+        labels = []
+        for i, proba in enumerate(zip(*[p[row] for p in probas])):
+            if max(proba) >= threshold:
+                labels.append(mlb.classes_[i])
+        results.append('; '.join(labels) if labels else None)
+    return results
+
 def predict_keywords(text, vectorizer, model, mlb, threshold=0.3):
     """Predict keywords for given text"""
-    # Preprocess text
-    processed_text = preprocess_text(text)
-    
-    # Transform text using vectorizer
-    X_tfidf = vectorizer.transform([processed_text])
-    
-    # Predict probabilities
-    y_pred_proba = model.predict_proba(X_tfidf)
-    
-    # Get keywords above threshold
-    keywords = []
-    for i, proba in enumerate(zip(*[estimator.predict_proba(X_tfidf)[0] for estimator in model.estimators_])):
-        if max(proba) >= threshold:
-            keywords.append(mlb.classes_[i])
-    
-    return '; '.join(keywords) if keywords else None
+    return predict_labels([preprocess_text(text)], vectorizer, model, mlb, threshold)[0]
 
 def predict_subjects(text, vectorizer, model, mlb, threshold=0.3):
     """Predict subject categories for given text"""
-    # Preprocess text
-    processed_text = preprocess_text(text)
-    
-    # Transform text using vectorizer
-    X_tfidf = vectorizer.transform([processed_text])
-    
-    # Predict probabilities
-    y_pred_proba = model.predict_proba(X_tfidf)
-    
-    # Get subjects above threshold
-    subjects = []
-    for i, proba in enumerate(zip(*[estimator.predict_proba(X_tfidf)[0] for estimator in model.estimators_])):
-        if max(proba) >= threshold:
-            subjects.append(mlb.classes_[i])
-    
-    return '; '.join(subjects) if subjects else None
+    return predict_labels([preprocess_text(text)], vectorizer, model, mlb, threshold)[0]
 
-def train_keywords_plus_model(train_df, text_columns=['TI', 'AB']):
+def train_keywords_plus_model(train_df, text_columns=['TI', 'AB'], texts=None):
     """Train model for Keywords Plus prediction"""
     # Prepare text data
-    X = prepare_training_data(train_df, text_columns)
+    X = prepare_training_data(train_df, text_columns) if texts is None else texts
     
     # Prepare Keywords Plus data
     mlb = MultiLabelBinarizer()
@@ -197,136 +209,84 @@ def train_keywords_plus_model(train_df, text_columns=['TI', 'AB']):
     X_tfidf = vectorizer.fit_transform(X)
     
     # Train model
-    model = MultiOutputClassifier(RandomForestClassifier(n_estimators=100))
+    model = MultiOutputClassifier(RandomForestClassifier(n_estimators=100, n_jobs=-1))
     model.fit(X_tfidf, y)
     
     return vectorizer, model, mlb
 
 def predict_keywords_plus(text, vectorizer, model, mlb, threshold=0.3):
     """Predict Keywords Plus for given text"""
-    # Preprocess text
-    processed_text = preprocess_text(text)
-    
-    # Transform text using vectorizer
-    X_tfidf = vectorizer.transform([processed_text])
-    
-    # Predict probabilities
-    y_pred_proba = model.predict_proba(X_tfidf)
-    
-    # Get keywords above threshold
-    keywords_plus = []
-    for i, proba in enumerate(zip(*[estimator.predict_proba(X_tfidf)[0] for estimator in model.estimators_])):
-        if max(proba) >= threshold:
-            keywords_plus.append(mlb.classes_[i])
-    
-    return '; '.join(keywords_plus) if keywords_plus else None
+    return predict_labels([preprocess_text(text)], vectorizer, model, mlb, threshold)[0]
+
+# Renkli bolum basligi: tek sablon, her print'te Fore/Style yeniden birlestirilmez
+_HEADING = "\n" + Fore.CYAN + "%s" + Style.RESET_ALL
+
+# (alan, model adi, eksik alan adi, egitim, tahminin kopyalanacagi ek alanlar)
+_ML_TARGETS = (
+    ('DE', 'keyword', 'keywords', train_keyword_model, ()),
+    ('ID', 'Keywords Plus', 'Keywords Plus', train_keywords_plus_model, ()),
+    ('SC', 'subject category', 'subject categories', train_subject_model, ('WC',)),
+)
+
+
+def _predict_missing(enriched_df, fields, mask, texts, has_text, predict):
+    """mask'teki (fields[0] bos) satirlari TI+AB metninden tahminle doldurur;
+    tahmin fields'daki tum alanlara yazilir (SC -> WC de). TI+AB'si bos
+    satirlar atlanir; kalanlar tek toplu predict cagrisiyla tahmin edilir."""
+    total = mask.sum()
+    rows = mask & has_text
+    predicted = pd.Series(predict(texts[rows].tolist()), index=texts.index[rows], dtype=object)
+    predicted = predicted.dropna()
+    for field in fields:
+        enriched_df.loc[predicted.index, field] = predicted
+    print(f"Progress: {total}/{total} records processed")
 
 def enrich_metadata_ml(df):
     """Enrich metadata using ML models"""
     print("\nStarting ML-based metadata enrichment...")
     
-    # Create copies of the dataframe for training
-    train_df_keywords = df[df['DE'].notna()].copy()
-    train_df_keywords_plus = df[df['ID'].notna()].copy()  # New training set for Keywords Plus
-    train_df_subjects = df[df['SC'].notna()].copy()
-    
     # Create a copy of the input dataframe
     enriched_df = df.copy()
     
-    # Initialize counters for ID field
-    original_empty_id = df['ID'].isna().sum()
-    
-    # Train models if enough training data is available
-    if len(train_df_keywords) > 10:
-        print(f"\n{Fore.CYAN}Training keyword prediction model...{Style.RESET_ALL}")
-        print(f"Using {len(train_df_keywords)} records for training")
-        kw_vectorizer, kw_model, kw_mlb = train_keyword_model(train_df_keywords)
-        
-        # Predict missing keywords
-        print(f"\n{Fore.CYAN}Predicting missing keywords...{Style.RESET_ALL}")
-        mask = enriched_df['DE'].isna()
-        total = mask.sum()
-        completed = 0
-        
-        for idx in enriched_df[mask].index:
-            text = ' '.join([
-                str(enriched_df.loc[idx, 'TI']) if pd.notna(enriched_df.loc[idx, 'TI']) else '',
-                str(enriched_df.loc[idx, 'AB']) if pd.notna(enriched_df.loc[idx, 'AB']) else ''
-            ])
-            if text.strip():
-                predicted_keywords = predict_keywords(text, kw_vectorizer, kw_model, kw_mlb)
-                if predicted_keywords:
-                    enriched_df.loc[idx, 'DE'] = predicted_keywords
-            completed += 1
-            if completed % 10 == 0:
-                print(f"Progress: {completed}/{total} records processed", end='\r')
-        print()  # New line after progress
-    
-    # Train Keywords Plus model if enough training data is available
-    if len(train_df_keywords_plus) > 10:
-        print(f"\n{Fore.CYAN}Training Keywords Plus prediction model...{Style.RESET_ALL}")
-        print(f"Using {len(train_df_keywords_plus)} records for training")
-        kw_plus_vectorizer, kw_plus_model, kw_plus_mlb = train_keywords_plus_model(train_df_keywords_plus)
-        
-        # Predict missing Keywords Plus
-        print(f"\n{Fore.CYAN}Predicting missing Keywords Plus...{Style.RESET_ALL}")
-        mask = enriched_df['ID'].isna()
-        total = mask.sum()
-        completed = 0
+    # Empty masks computed once: training rows are their complement, the
+    # rows to predict are the mask itself, and the "original" stats its sum
+    fields = [target[0] for target in _ML_TARGETS]
+    empty_before = df[fields].isna()
+    
+    # TI+AB metni kayit basina bir kez on-islenir; uc modelin egitimi de
+    # tahminleri de ayni metni kullanir
+    combined = df[['TI', 'AB']].fillna('').astype(str).agg(' '.join, axis=1)
+    texts = combined.apply(preprocess_text)
+    has_text = combined.str.strip() != ''
+    
+    # Train models if enough training data is available (DE, ID, SC in order)
+    for field, model_label, missing_label, train, copy_to in _ML_TARGETS:
+        train_df = df[~empty_before[field]].copy()
+        if len(train_df) <= 10:
+            continue
+        print(_HEADING % f"Training {model_label} prediction model...")
+        print(f"Using {len(train_df)} records for training")
+        vectorizer, model, mlb = train(train_df, texts=texts[~empty_before[field]])
         
-        for idx in enriched_df[mask].index:
-            text = ' '.join([
-                str(enriched_df.loc[idx, 'TI']) if pd.notna(enriched_df.loc[idx, 'TI']) else '',
-                str(enriched_df.loc[idx, 'AB']) if pd.notna(enriched_df.loc[idx, 'AB']) else ''
-            ])
-            if text.strip():
-                predicted_keywords_plus = predict_keywords_plus(text, kw_plus_vectorizer, kw_plus_model, kw_plus_mlb)
-                if predicted_keywords_plus:
-                    enriched_df.loc[idx, 'ID'] = predicted_keywords_plus
-            completed += 1
-            if completed % 10 == 0:
-                print(f"Progress: {completed}/{total} records processed", end='\r')
-        print()  # New line after progress
-    
-    # Train models if enough training data is available
-    if len(train_df_subjects) > 10:
-        print(f"\n{Fore.CYAN}Training subject category prediction model...{Style.RESET_ALL}")
-        print(f"Using {len(train_df_subjects)} records for training")
-        subj_vectorizer, subj_model, subj_mlb = train_subject_model(train_df_subjects)
-        
-        # Predict missing subject categories
-        print(f"\n{Fore.CYAN}Predicting missing subject categories...{Style.RESET_ALL}")
-        mask = enriched_df['SC'].isna()
-        total = mask.sum()
-        completed = 0
-        
-        for idx in enriched_df[mask].index:
-            text = ' '.join([
-                str(enriched_df.loc[idx, 'TI']) if pd.notna(enriched_df.loc[idx, 'TI']) else '',
-                str(enriched_df.loc[idx, 'AB']) if pd.notna(enriched_df.loc[idx, 'AB']) else ''
-            ])
-            if text.strip():
-                predicted_subjects = predict_subjects(text, subj_vectorizer, subj_model, subj_mlb)
-                if predicted_subjects:
-                    enriched_df.loc[idx, 'SC'] = predicted_subjects
-                    enriched_df.loc[idx, 'WC'] = predicted_subjects  # Copy to WC as well
-            completed += 1
-            if completed % 10 == 0:
-                print(f"Progress: {completed}/{total} records processed", end='\r')
-        print()  # New line after progress
-    
-    # Calculate enrichment statistics
+        print(_HEADING % f"Predicting missing {missing_label}...")
+        _predict_missing(enriched_df, (field,) + copy_to, empty_before[field], texts, has_text,
+                         lambda batch: predict_labels(batch, vectorizer, model, mlb))
+    
+    # Calculate enrichment statistics. Predictions only fill empty cells, so
+    # only the rows that were empty before are re-checked
+    before = {field: empty_before[field].sum() for field in fields}
+    after = {field: enriched_df.loc[empty_before[field], field].isna().sum() for field in fields}
     stats = {
         'total_records': len(df),
-        'original_empty_keywords': df['DE'].isna().sum(),
-        'original_empty_subjects': df['SC'].isna().sum(),
-        'original_empty_id': original_empty_id,
-        'enriched_empty_keywords': enriched_df['DE'].isna().sum(),
-        'enriched_empty_subjects': enriched_df['SC'].isna().sum(),
-        'enriched_empty_id': enriched_df['ID'].isna().sum(),
-        'keywords_filled': df['DE'].isna().sum() - enriched_df['DE'].isna().sum(),
-        'subjects_filled': df['SC'].isna().sum() - enriched_df['SC'].isna().sum(),
-        'id_filled': original_empty_id - enriched_df['ID'].isna().sum()
+        'original_empty_keywords': before['DE'],
+        'original_empty_subjects': before['SC'],
+        'original_empty_id': before['ID'],
+        'enriched_empty_keywords': after['DE'],
+        'enriched_empty_subjects': after['SC'],
+        'enriched_empty_id': after['ID'],
+        'keywords_filled': before['DE'] - after['DE'],
+        'subjects_filled': before['SC'] - after['SC'],
+        'id_filled': before['ID'] - after['ID']
     }
     
     return enriched_df, stats 
\ No newline at end of file
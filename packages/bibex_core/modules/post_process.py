@@ -1,6 +1,8 @@
 import pandas as pd
 import os
 
+from ..xlsx_writer import write_xlsx
+
 def copy_cr_raw_to_cr(file_path: str) -> bool:
     """
     Copies CR_raw column to CR column
@@ -20,7 +22,7 @@ def copy_cr_raw_to_cr(file_path: str) -> bool:
             df['CR'] = df['CR_raw']
             
             # Save changes
-            df.to_excel(file_path, index=False)
+            write_xlsx(df, file_path)
             print(f"\nCR_raw column copied to CR: {os.path.basename(file_path)}")
             return True
             
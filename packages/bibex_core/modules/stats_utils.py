@@ -1,6 +1,31 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+# Field code -> description for the metadata quality tables (shared, built once)
+METADATA_FIELDS = {
+    'AU': 'Author',
+    'DT': 'Document Type',
+    'PY': 'Publication Year',
+    'TI': 'Title',
+    'TC': 'Total Citation',
+    'SO': 'Journal',
+    'AB': 'Abstract',
+    'C1': 'Affiliation',
+    'DI': 'DOI',
+    'RP': 'Corresponding Author',
+    'ID': 'Keywords Plus',
+    'WC': 'Science Categories',
+    'DE': 'Keywords',
+    'LA': 'Language',
+    'CR': 'Cited References'
+}
+
+def _missing_counts(df: pd.DataFrame, fields) -> pd.Series:
+    """NaN or empty-string cells per field, from one mask over all present fields"""
+    block = df[[field for field in fields if field in df.columns]]
+    return (block.isna() | block.eq('')).sum()
+
 def generate_detailed_statistics(wos_df: pd.DataFrame, scopus_df: pd.DataFrame, merged_df: pd.DataFrame) -> dict:
     """Generate detailed statistics"""
     # Basic statistics
@@ -41,123 +66,60 @@ def generate_detailed_statistics(wos_df: pd.DataFrame, scopus_df: pd.DataFrame,
 
     return {**basic_stats, **column_stats, **quality_stats, **year_distribution}
 
+def _field_status(missing_pct: pd.Series) -> np.ndarray:
+    """Quality label per field from its missing percentage, in one pass"""
+    return np.select(
+        [missing_pct == 0, missing_pct < 1, missing_pct < 5, missing_pct < 20,
+         missing_pct < 50, missing_pct < 90],
+        ['Excellent', 'Very Good', 'Good', 'Acceptable', 'Poor', 'Critical'],
+        default='Completely Missing')
+
 def generate_metadata_statistics(df: pd.DataFrame) -> pd.DataFrame:
     """Generate quality statistics for metadata fields"""
-    metadata_desc = {
-        'AU': 'Author',
-        'DT': 'Document Type',
-        'PY': 'Publication Year',
-        'TI': 'Title',
-        'TC': 'Total Citation',
-        'SO': 'Journal',
-        'AB': 'Abstract',
-        'C1': 'Affiliation',
-        'DI': 'DOI',
-        'RP': 'Corresponding Author',
-        'ID': 'Keywords Plus',
-        'WC': 'Science Categories',
-        'DE': 'Keywords',
-        'LA': 'Language',
-        'CR': 'Cited References'
-    }
-    
-    stats = []
-    total_docs = len(df)
-    
-    for field, desc in metadata_desc.items():
-        if field in df.columns:
-            missing = df[field].isna().sum() + df[field].eq('').sum()
-            missing_pct = (missing / total_docs) * 100
-            
-            # Determine status based on missing percentage
-            if missing_pct == 0:
-                status = 'Excellent'
-            elif missing_pct < 1:
-                status = 'Very Good'
-            elif missing_pct < 5:
-                status = 'Good'
-            elif missing_pct < 20:
-                status = 'Acceptable'
-            elif missing_pct < 50:
-                status = 'Poor'
-            elif missing_pct < 90:
-                status = 'Critical'
-            else:
-                status = 'Completely Missing'
-            
-            stats.append({
-                'Field': field,
-                'Description': desc,
-                'Missing Count': missing,
-                'Missing %': round(missing_pct, 2),
-                'Status': status
-            })
-    
-    return pd.DataFrame(stats)
+    fields = [field for field in METADATA_FIELDS if field in df.columns]
+    if not fields:
+        return pd.DataFrame()
+
+    missing = _missing_counts(df, fields)
+    missing_pct = (missing / len(df)) * 100
+
+    return pd.DataFrame({
+        'Field': fields,
+        'Description': [METADATA_FIELDS[field] for field in fields],
+        'Missing Count': missing.to_numpy(),
+        'Missing %': missing_pct.round(2).to_numpy(),
+        'Status': _field_status(missing_pct)
+    })
 
 def generate_metadata_comparison(simple_df: pd.DataFrame, enhanced_df: pd.DataFrame) -> pd.DataFrame:
     """Compare metadata statistics between two merge methods"""
-    metadata_desc = {
-        'AU': 'Author',
-        'DT': 'Document Type',
-        'PY': 'Publication Year',
-        'TI': 'Title',
-        'TC': 'Total Citation',
-        'SO': 'Journal',
-        'AB': 'Abstract',
-        'C1': 'Affiliation',
-        'DI': 'DOI',
-        'RP': 'Corresponding Author',
-        'ID': 'Keywords Plus',
-        'WC': 'Science Categories',
-        'DE': 'Keywords',
-        'LA': 'Language',
-        'CR': 'Cited References'
-    }
-    
-    comparison_stats = []
-    
-    for field, desc in metadata_desc.items():
-        if field in simple_df.columns and field in enhanced_df.columns:
-            simple_missing = simple_df[field].isna().sum() + simple_df[field].eq('').sum()
-            enhanced_missing = enhanced_df[field].isna().sum() + enhanced_df[field].eq('').sum()
-            
-            simple_missing_pct = (simple_missing / len(simple_df)) * 100
-            enhanced_missing_pct = (enhanced_missing / len(enhanced_df)) * 100
-            
-            # Calculate improvement rate
-            improvement = simple_missing_pct - enhanced_missing_pct
-            improvement_pct = (improvement / simple_missing_pct * 100) if simple_missing_pct > 0 else 0
-            
-            # Determine status based on enhanced method results
-            if enhanced_missing_pct == 0:
-                status = 'Excellent'
-            elif enhanced_missing_pct < 1:
-                status = 'Very Good'
-            elif enhanced_missing_pct < 5:
-                status = 'Good'
-            elif enhanced_missing_pct < 20:
-                status = 'Acceptable'
-            elif enhanced_missing_pct < 50:
-                status = 'Poor'
-            elif enhanced_missing_pct < 90:
-                status = 'Critical'
-            else:
-                status = 'Completely Missing'
-            
-            comparison_stats.append({
-                'Field': field,
-                'Description': desc,
-                'Simple Missing': simple_missing,
-                'Simple Missing %': round(simple_missing_pct, 2),
-                'Enhanced Missing': enhanced_missing,
-                'Enhanced Missing %': round(enhanced_missing_pct, 2),
-                'Improvement': round(improvement, 2),
-                'Improvement %': round(improvement_pct, 2),
-                'Status': status
-            })
-    
-    return pd.DataFrame(comparison_stats)
+    fields = [field for field in METADATA_FIELDS
+              if field in simple_df.columns and field in enhanced_df.columns]
+    if not fields:
+        return pd.DataFrame()
+
+    simple_missing = _missing_counts(simple_df, fields)
+    enhanced_missing = _missing_counts(enhanced_df, fields)
+
+    simple_missing_pct = (simple_missing / len(simple_df)) * 100
+    enhanced_missing_pct = (enhanced_missing / len(enhanced_df)) * 100
+
+    # Calculate improvement rate
+    improvement = simple_missing_pct - enhanced_missing_pct
+    improvement_pct = (improvement / simple_missing_pct * 100).where(simple_missing_pct > 0, 0)
+
+    # Status is based on enhanced method results
+    return pd.DataFrame({
+        'Field': fields,
+        'Description': [METADATA_FIELDS[field] for field in fields],
+        'Simple Missing': simple_missing.to_numpy(),
+        'Simple Missing %': simple_missing_pct.round(2).to_numpy(),
+        'Enhanced Missing': enhanced_missing.to_numpy(),
+        'Enhanced Missing %': enhanced_missing_pct.round(2).to_numpy(),
+        'Improvement': improvement.round(2).to_numpy(),
+        'Improvement %': improvement_pct.round(2).to_numpy(),
+        'Status': _field_status(enhanced_missing_pct)
+    })
 
 def compare_merge_methods(simple_stats: dict, enhanced_stats: dict, 
                         simple_df: pd.DataFrame, enhanced_df: pd.DataFrame) -> dict:
@@ -174,8 +136,11 @@ def compare_merge_methods(simple_stats: dict, enhanced_stats: dict,
     }
 
     # 2. Data Quality Metrics
-    simple_empty = simple_df.isna().sum().sum()
-    enhanced_empty = enhanced_df.isna().sum().sum()
+    # Per-column NaN counts, reused by the field analysis below
+    simple_na = simple_df.isna().sum()
+    enhanced_na = enhanced_df.isna().sum()
+    simple_empty = simple_na.sum()
+    enhanced_empty = enhanced_na.sum()
     simple_total = len(simple_df) * len(simple_df.columns)
     enhanced_total = len(enhanced_df) * len(enhanced_df.columns)
     
@@ -192,8 +157,8 @@ def compare_merge_methods(simple_stats: dict, enhanced_stats: dict,
     field_improvements = {}
     for col in enhanced_df.columns:
         if col in simple_df.columns:
-            simple_empty = simple_df[col].isna().sum()
-            enhanced_empty = enhanced_df[col].isna().sum()
+            simple_empty = simple_na[col]
+            enhanced_empty = enhanced_na[col]
             simple_unique = simple_df[col].nunique()
             enhanced_unique = enhanced_df[col].nunique()
             
@@ -0,0 +1,131 @@
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+try:  # Optional accelerator (pip install bibex_core[fast])
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - cache disabled
+    pa = None
+    pq = None
+
+try:  # Rust Excel parser (pip install bibex_core[fast]); read_excel engine needs pandas >= 2.2
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine' if tuple(map(int, pd.__version__.split('.')[:2])) >= (2, 2) else None
+except ImportError:  # pragma: no cover - openpyxl
+    EXCEL_ENGINE = None
+
+CACHE_DIR = '.cache'
+_SOURCE_KEY = b'bibex_source'
+
+
+def sidecar_path(xlsx_path: str) -> str:
+    """Returns the Parquet sidecar path that belongs to an Excel output."""
+    folder, name = os.path.split(xlsx_path)
+    return os.path.join(folder, CACHE_DIR, os.path.splitext(name)[0] + '.parquet')
+
+
+def _source_tag(xlsx_path: str) -> bytes:
+    st = os.stat(xlsx_path)
+    return f'{st.st_size}:{st.st_mtime_ns}'.encode()
+
+
+def _excel_cells(s: pd.Series) -> list:
+    """Cell values of one column as the Excel reader returns them."""
+    cells = s.astype(object).where(s.notna(), '').to_numpy()
+    if s.dtype.kind == 'f':
+        # Whole-number floats are stored as plain numbers and read back as int
+        whole = (s.notna() & (s % 1 == 0)).to_numpy()
+        if whole.any():
+            cells[whole] = [int(v) for v in s.to_numpy()[whole]]
+    return cells.tolist()
+
+
+def excel_view(df: pd.DataFrame, dtype_backend=None) -> pd.DataFrame:
+    """
+    Returns the frame as pd.read_excel would load it back from the workbook
+
+    Mirrors the Excel reader: blank cells come back as empty strings,
+    whole-number floats as ints, and the whole table is re-parsed like text
+    (numeric inference, NA strings). `dtype_backend` is passed on like
+    read_excel's argument of the same name.
+    """
+    kwargs = {} if dtype_backend is None else {'dtype_backend': dtype_backend}
+    cols = [_excel_cells(s) for _, s in df.items()]
+    values = [list(row) for row in zip(*cols)]
+    return TextParser([[str(c) for c in df.columns]] + values, header=0, **kwargs).read()
+
+
+def write_sidecar(view: pd.DataFrame, xlsx_path: str) -> bool:
+    """
+    Caches a DataFrame next to the Excel file it was just written to
+
+    `view` is the excel_view() of the written frame, so the cache holds what
+    pd.read_excel would return. It is tagged with the size and mtime of the
+    Excel file so a later read can tell whether the workbook changed since.
+
+    Returns:
+    --------
+    bool
+        Whether the sidecar was written (False without pyarrow)
+    """
+    if pa is None:
+        return False
+    path = sidecar_path(xlsx_path)
+    tmp = path + '.tmp'
+    try:
+        table = pa.Table.from_pandas(view, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_SOURCE_KEY] = _source_tag(xlsx_path)
+        table = table.replace_schema_metadata(metadata)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pq.write_table(table, tmp)
+        os.replace(tmp, path)
+        return True
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return False
+
+
+def read_sidecar(xlsx_path: str) -> Optional[pd.DataFrame]:
+    """
+    Loads the cached DataFrame for an Excel file if it is still current
+
+    Returns:
+    --------
+    pd.DataFrame or None
+        None when pyarrow is missing, no sidecar exists or the Excel file was
+        modified after the sidecar was written
+    """
+    if pa is None:
+        return None
+    path = sidecar_path(xlsx_path)
+    try:
+        if not os.path.exists(path):
+            return None
+        if pq.read_schema(path).metadata.get(_SOURCE_KEY) != _source_tag(xlsx_path):
+            return None
+        df = pq.read_table(path).to_pandas()
+    except Exception:
+        return None
+    # Arrow nulls come back as None in object columns; read_excel gives NaN
+    obj_cols = df.columns[df.dtypes == object]
+    if len(obj_cols):
+        df[obj_cols] = df[obj_cols].where(df[obj_cols].notna(), np.nan)
+    return df
+
+
+def read_xlsx(xlsx_path: str) -> pd.DataFrame:
+    """
+    Loads an Excel file, from its Parquet sidecar while that is still current
+
+    Otherwise parses the workbook, with calamine when it is installed.
+    """
+    df = read_sidecar(xlsx_path)
+    if df is None:
+        df = pd.read_excel(xlsx_path, engine=EXCEL_ENGINE)
+    return df
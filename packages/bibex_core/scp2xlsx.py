@@ -1,7 +1,42 @@
 import pandas as pd
 import re
 import os
-from typing import List, Union
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Union
+
+try:  # Optional accelerator (pip install bibex_core[fast])
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # pragma: no cover - pandas fallback
+    pa = None
+    pacsv = None
+
+try:
+    from .parquet_cache import excel_view, write_sidecar
+    from .xlsx_writer import write_xlsx
+except ImportError:  # run as a script
+    from parquet_cache import excel_view, write_sidecar
+    from xlsx_writer import write_xlsx
+
+# Whether csvScopus2df parses and concatenates files natively with Arrow
+ARROW_CSV = pa is not None
+
+# Upper bound on CSV files parsed at the same time
+MAX_READ_WORKERS = 8
+
+
+def _map_files(read, files: List[str]) -> list:
+    """
+    Applies `read` to every file, in parallel threads when there are several
+
+    Both CSV parsers release the GIL while tokenizing, so multi-file exports
+    are parsed concurrently. Results keep the order of `files`.
+    """
+    if len(files) < 2:
+        return [read(file) for file in files]
+    with ThreadPoolExecutor(max_workers=min(MAX_READ_WORKERS, len(files))) as pool:
+        return list(pool.map(read, files))
 
 
 def abbrev_title(title: str) -> str:
@@ -10,56 +45,91 @@ def abbrev_title(title: str) -> str:
     return title.replace('.', '').upper()
 
 
+# Scopus column label -> standard tag
+_SCOPUS_TAGS = {
+    "Abbreviated Source Title": "JI",
+    "Affiliations": "C1",
+    "Authors": "AU",
+    "Author Names": "AU",
+    "Author full names": "AF",
+    "Source title": "SO",
+    "Titles": "TI",
+    "Title": "TI",
+    "Publication Year": "PY",
+    "Year": "PY",
+    "Volume": "VL",
+    "Issue": "IS",
+    "Page count": "PP",
+    "Cited by": "TC",
+    "DOI": "DI",
+    "Link": "URL",
+    "Abstract": "AB",
+    "Author Keywords": "DE",
+    "Indexed Keywords": "ID",
+    "Index Keywords": "ID",
+    "Funding Details": "FU",
+    "Funding Texts": "FX",
+    "Funding Text 1": "FX",
+    "References": "CR",
+    "Correspondence Address": "RP",
+    "Publisher": "PU",
+    "Open Access": "OA",
+    "Language of Original Document": "LA",
+    "Document Type": "DT",
+    "Source": "DB",
+    "EID": "UT",
+}
+
+
 def labelling(data: pd.DataFrame) -> pd.DataFrame:
     """Converts column labels to standard format"""
+    # Eşleşmeyen sütunlar için orijinal ismi kullan
+    data.columns = [_SCOPUS_TAGS.get(col, col) for col in data.columns]
+    return data
 
-    df_tag = pd.DataFrame([
-        ["Abbreviated Source Title", "JI"],
-        ["Affiliations", "C1"],
-        ["Authors", "AU"],
-        ["Author Names", "AU"],
-        ["Author full names", "AF"],
-        ["Source title", "SO"],
-        ["Titles", "TI"],
-        ["Title", "TI"],
-        ["Publication Year", "PY"],
-        ["Year", "PY"],
-        ["Volume", "VL"],
-        ["Issue", "IS"],
-        ["Page count", "PP"],
-        ["Cited by", "TC"],
-        ["DOI", "DI"],
-        ["Link", "URL"],
-        ["Abstract", "AB"],
-        ["Author Keywords", "DE"],
-        ["Indexed Keywords", "ID"],
-        ["Index Keywords", "ID"],
-        ["Funding Details", "FU"],
-        ["Funding Texts", "FX"],
-        ["Funding Text 1", "FX"],
-        ["References", "CR"],
-        ["Correspondence Address", "RP"],
-        ["Publisher", "PU"],
-        ["Open Access", "OA"],
-        ["Language of Original Document", "LA"],
-        ["Document Type", "DT"],
-        ["Source", "DB"],
-        ["EID", "UT"]
-    ], columns=['orig', 'tag'])
-
-    # Mevcut sütun isimlerini al
-    label = pd.DataFrame({'orig': data.columns})
-
-    # Eşleştirme yap
-    label = label.merge(df_tag, on='orig', how='left')
 
-    # Eşleşmeyen sütunlar için orijinal ismi kullan
-    label['tag'] = label['tag'].fillna(label['orig'])
+def _read_csvs_arrow(files: List[str]) -> Optional[pd.DataFrame]:
+    """
+    Reads Scopus CSV files with pyarrow and concatenates them as Arrow tables.
 
-    # Sütun isimlerini güncelle
-    data.columns = label['tag']
+    Mirrors the pandas path: every column is read as string, empty cells stay
+    empty strings and later files keep only the columns shared with the first
+    file. Returns None when pyarrow is unavailable or any file cannot be parsed
+    this way, so the caller can fall back to pandas.
+    """
+    if pa is None:
+        return None
+
+    def read(file):
+        names = pacsv.open_csv(file).schema.names
+        if len(set(names)) != len(names):
+            # Duplicate headers: pandas renames them (X.1), Arrow does not
+            return None
+        return pacsv.read_csv(
+            file,
+            read_options=pacsv.ReadOptions(block_size=1 << 20),
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(
+                column_types={name: pa.string() for name in names},
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False,
+            ),
+        )
 
-    return data
+    try:
+        tables = _map_files(read, files)
+    except (pa.ArrowException, OSError, UnicodeDecodeError):
+        return None
+    if any(table is None for table in tables):
+        return None
+
+    first_cols = tables[0].column_names
+    for i in range(1, len(tables)):
+        names = set(tables[i].column_names)
+        tables[i] = tables[i].select([c for c in first_cols if c in names])
+
+    combined = pa.concat_tables(tables, promote_options="default")
+    return combined.to_pandas()
 
 
 def csvScopus2df(files: Union[str, List[str]]) -> pd.DataFrame:
@@ -82,35 +152,39 @@ def csvScopus2df(files: Union[str, List[str]]) -> pd.DataFrame:
 
     all_data = []
 
-    for i, file in enumerate(files):
-        try:
-            # Read CSV file
-            df = pd.read_csv(file,
-                             dtype=str,  # Read all columns as string
-                             na_values='',  # Mark empty values as NA
-                             keep_default_na=False,  # Don't use default NA values
-                             encoding='utf-8')  # Use UTF-8 encoding
-
-            # Replace NA values with empty string
-            df = df.fillna('')
-
-            if i > 0:
-                # Find common columns
-                common_cols = list(set(df.columns) & set(all_data[0].columns))
-                # Merge using only common columns
-                all_data.append(df[common_cols])
-            else:
-                all_data.append(df)
+    # Fast path: Arrow parse + zero-copy concat, pandas only at the end
+    DATA = _read_csvs_arrow(files)
+    if DATA is not None:
+        all_data.append(DATA)
+        files = []
 
+    def read(file):
+        try:
+            # Read CSV file; empty cells stay empty strings (no NA pass + fillna)
+            return pd.read_csv(file,
+                               dtype=str,  # Read all columns as string
+                               na_filter=False,  # Skip NA detection entirely
+                               encoding='utf-8')  # Use UTF-8 encoding
         except Exception as e:
             print(f"Error: Failed to read file {file}: {str(e)}")
+            return None
+
+    for df in _map_files(read, files):
+        if df is None:
             continue
+        if all_data:
+            # Find common columns
+            common_cols = list(set(df.columns) & set(all_data[0].columns))
+            # Merge using only common columns
+            all_data.append(df[common_cols])
+        else:
+            all_data.append(df)
 
     if not all_data:
         raise ValueError("No files could be read!")
 
     # Merge all dataframes
-    DATA = pd.concat(all_data, ignore_index=True)
+    DATA = pd.concat(all_data, ignore_index=True) if len(all_data) > 1 else all_data[0]
 
     # Organize column labels
     DATA = labelling(DATA)
@@ -150,7 +224,8 @@ def csvScopus2df(files: Union[str, List[str]]) -> pd.DataFrame:
     return DATA
 
 
-def save_to_excel(file_paths: Union[str, List[str]], output_path: str) -> bool:
+def save_to_excel(file_paths: Union[str, List[str]], output_path: str,
+                  sidecar: bool = False, return_df: bool = False):
     """
     Processes Scopus CSV files and saves as Excel file
 
@@ -160,23 +235,50 @@ def save_to_excel(file_paths: Union[str, List[str]], output_path: str) -> bool:
         Path to CSV files to process
     output_path : str
         Path to output Excel file
+    sidecar : bool
+        Also cache the frame as Parquet for fast re-loading (needs pyarrow)
+    return_df : bool
+        Also return the frame as pd.read_excel would load the written file
 
     Returns:
     --------
-    bool
-        Whether the operation was successful
+    bool or (bool, pd.DataFrame or None)
+        Whether the operation was successful (and the frame if return_df)
     """
     try:
         # Convert data
         df = csvScopus2df(file_paths)
 
         # Save as Excel
-        df.to_excel(output_path, index=False)
+        write_xlsx(df, output_path)
+        view = None
+        if sidecar or return_df:
+            view = excel_view(df)
+            if sidecar:
+                write_sidecar(view, output_path)
         print(f"Data successfully saved to {output_path}")
-        return True
+        return (True, view) if return_df else True
     except Exception as e:
         print(f"Error occurred: {str(e)}")
-        return False
+        return (False, None) if return_df else False
+
+
+def _read_line() -> Optional[str]:
+    """
+    Reads one stripped line of user input, or None at end of input
+
+    Interactive terminals go through input(); piped/scripted stdin
+    (e.g. `printf 'a.csv\\nout.xlsx\\nN\\n' | python scp2xlsx.py`) is read
+    with readline directly, and running out of lines ends the session
+    instead of looping on empty answers.
+    """
+    if sys.stdin.isatty():
+        try:
+            return input().strip()
+        except EOFError:
+            return None
+    line = sys.stdin.readline()
+    return line.strip() if line else None
 
 
 if __name__ == "__main__":
@@ -191,8 +293,8 @@ if __name__ == "__main__":
             print("Example 2: C:/Users/data1.csv,D:/Data/data2.csv")
             print("(Type 'q' to quit)")
 
-            input_str = input().strip()
-            if input_str.lower() == 'q':
+            input_str = _read_line()
+            if input_str is None or input_str.lower() == 'q':
                 print("Program terminating...")
                 break
 
@@ -202,7 +304,10 @@ if __name__ == "__main__":
             print("\nEnter the name or full path of the output Excel file")
             print("Example 1: output.xlsx")
             print("Example 2: C:/Users/output.xlsx")
-            output_file = input().strip()
+            output_file = _read_line()
+            if output_file is None:
+                print("Program terminating...")
+                break
 
             # Check file extensions
             input_files = [f if f.endswith('.csv') else f + '.csv' for f in input_files]
@@ -225,11 +330,8 @@ if __name__ == "__main__":
                 print("\nOperation completed successfully!")
                 print(f"Result file: {os.path.abspath(output_file)}")
 
-            # Ask if user wants to continue
-            print("\nDo you want to process more files? (Y/N)")
-            if input().strip().upper() != 'Y':
-                print("Program terminating...")
-                break
+            # No separate "process more files?" question: the file prompt
+            # above already takes 'q' (or end of input) to quit
 
     except Exception as e:
         print(f"\nAn unexpected error occurred: {str(e)}")
\ No newline at end of file
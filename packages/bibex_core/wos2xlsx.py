@@ -2,6 +2,13 @@ import pandas as pd
 import re
 import os
 
+try:
+    from .parquet_cache import excel_view, write_sidecar
+    from .xlsx_writer import write_xlsx
+except ImportError:  # run as a script
+    from parquet_cache import excel_view, write_sidecar
+    from xlsx_writer import write_xlsx
+
 
 def remove_strange_char(text):
     # Remove strange characters
@@ -70,31 +77,32 @@ def isi2df(D):
         print("\nWarning: Some mandatory metadata fields are missing. Bibliometrix functions may not work properly!")
         print("Missing fields:", missing_tags)
 
+    # Tag values are strings (NaN where a record lacks the tag), so the
+    # cleanups below run as column-wise .str operations; NaN passes through
     # Fields that should be separated by commas
     comma_tags = ['AU', 'AF', 'CR']
     for tag in comma_tags:
         if tag in df.columns:
-            df[tag] = df[tag].apply(lambda x: safe_str_replace(x, '---', ';'))
+            df[tag] = df[tag].str.replace('---', ';', regex=False)
 
     # Replace --- with space for other fields
-    other_tags = [col for col in df.columns if col not in comma_tags]
+    other_tags = [col for col in df.columns if col not in comma_tags and col != 'Paper']
     for tag in other_tags:
-        if tag in df.columns:
-            df[tag] = df[tag].apply(lambda x: safe_str_replace(x, '---', ' ').strip() if pd.notnull(x) else x)
+        df[tag] = df[tag].str.replace('---', ' ', regex=False).str.strip()
 
     # Add C1raw column
     if 'C1' in df.columns:
         df['C1raw'] = df['C1'].copy()
         # Remove author information in square brackets
-        df['C1'] = df['C1'].apply(lambda x: re.sub(r'\[.*?\]', '', str(x)) if pd.notnull(x) else x)
-        df['C1'] = df['C1'].apply(lambda x: safe_str_replace(x, '.', '.;') if pd.notnull(x) else x)
+        df['C1'] = df['C1'].str.replace(r'\[.*?\]', '', regex=True)
+        df['C1'] = df['C1'].str.replace('.', '.;', regex=False)
 
     # Add database information
     df['DB'] = 'ISI'
 
     # Clean commas in author names
     if 'AU' in df.columns:
-        df['AU'] = df['AU'].apply(lambda x: safe_str_replace(x, ',', ' ').strip() if pd.notnull(x) else x)
+        df['AU'] = df['AU'].str.replace(',', ' ', regex=False).str.strip()
 
     # Convert all string columns to uppercase except DI
     di_col = None
@@ -103,7 +111,7 @@ def isi2df(D):
 
     for col in df.columns:
         if df[col].dtype == 'object':
-            df[col] = df[col].apply(lambda x: str(x).upper() if pd.notnull(x) else x)
+            df[col] = df[col].str.upper()
 
     if di_col is not None:
         df['DI'] = di_col
@@ -114,10 +122,12 @@ def isi2df(D):
     return df
 
 
-def save_to_excel(file_path, output_path):
+def save_to_excel(file_path, output_path, sidecar=False, return_df=False):
+    # return_df=True returns (success, frame as pd.read_excel would load it)
     try:
         # Read file
-        with open(file_path, 'r', encoding='utf-8') as file:
+        # Invalid UTF-8 bytes become U+FFFD instead of failing the whole file
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
             lines = file.readlines()
 
         if not lines:
@@ -127,12 +137,17 @@ def save_to_excel(file_path, output_path):
         df = isi2df(lines)
 
         # Save as Excel
-        df.to_excel(output_path, index=False)
+        write_xlsx(df, output_path)
+        view = None
+        if sidecar or return_df:
+            view = excel_view(df)
+            if sidecar:
+                write_sidecar(view, output_path)
         print(f"Data successfully saved to {output_path}")
-        return True
+        return (True, view) if return_df else True
     except Exception as e:
         print(f"Error occurred: {str(e)}")
-        return False
+        return (False, None) if return_df else False
 
 
 if __name__ == "__main__":
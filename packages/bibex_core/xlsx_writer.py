@@ -0,0 +1,142 @@
+"""
+Streaming XLSX output for the converters
+
+xlsxwriter's constant_memory mode flushes each row to disk as soon as it is
+complete, so memory stays flat however many records are written. to_excel
+cannot use that mode (it writes cells column by column), so rows are written
+here in order, with the same header format and cell conversion as to_excel.
+Without xlsxwriter, or when a cell does not fit (xlsxwriter's write_row stops
+at a string longer than Excel's 32,767 characters and leaves the rest of the
+row blank), openpyxl's write-only mode is used, which cuts that string like
+to_excel. Both writers keep strings starting with '=' as text, as they were
+read in, where to_excel would turn them into formulas.
+"""
+import numpy as np
+import pandas as pd
+
+try:  # Optional accelerator (pip install bibex_core[fast])
+    import xlsxwriter
+except ImportError:  # pragma: no cover - pandas fallback
+    xlsxwriter = None
+
+MAX_ROWS, MAX_COLS = 1048576, 16384
+
+
+def _cell_values(s: pd.Series) -> list:
+    """Plain Python values: NaN/None/NA -> blank, +-inf -> 'inf'/'-inf'."""
+    vals = s.astype(object)
+    if s.dtype.kind == 'f':
+        vals = vals.mask(np.isposinf(s), 'inf').mask(np.isneginf(s), '-inf')
+    return vals.where(s.notna(), None).tolist()
+
+
+def cell_rows(df: pd.DataFrame):
+    """Rows of plain Python values as to_excel writes them, converted column by column"""
+    return zip(*[_cell_values(s) for _, s in df.items()])
+
+
+def check_sheet_size(df: pd.DataFrame, index: bool = False) -> None:
+    """Raises to_excel's ValueError (same message) when df does not fit on one sheet"""
+    n_cols = len(df.columns) + (1 if index else 0)
+    if len(df) + 1 > MAX_ROWS or n_cols > MAX_COLS:
+        raise ValueError("This sheet is too large! Your sheet size is: "
+                         f"{len(df) + 1}, {n_cols} Max sheet size is: {MAX_ROWS}, {MAX_COLS}")
+
+
+def stream_xlsx(df: pd.DataFrame, path: str, index: bool = False) -> bool:
+    """
+    Writes df row by row with xlsxwriter in constant_memory mode
+
+    Workbook options and header format match to_excel with the xlsxwriter
+    engine; URLs and strings starting with '=' are kept as plain text (no
+    hyperlinks or formulas). A written index goes in the first column with
+    the header format. Returns False as soon as a cell is not written in full
+    (e.g. a string over 32,767 characters): the file is then incomplete and
+    must be written another way. Needs xlsxwriter; write_xlsx picks a writer
+    for you.
+    """
+    check_sheet_size(df, index)
+    offset = 1 if index else 0
+    wb = xlsxwriter.Workbook(str(path), {
+        'constant_memory': True,
+        'strings_to_urls': False,
+        'strings_to_formulas': False,
+        'default_date_format': 'YYYY-MM-DD HH:MM:SS',
+    })
+    try:
+        ws = wb.add_worksheet('Sheet1')
+        header = wb.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        # write/write_row return a negative code when a cell is cut or skipped
+        if index and df.index.name and ws.write(0, 0, df.index.name, header):
+            return False
+        if ws.write_row(0, offset, list(df.columns), header):
+            return False
+        labels = _cell_values(df.index.to_series()) if index else None
+        for r, row in enumerate(cell_rows(df), 1):
+            if index and ws.write(r, 0, labels[r - 1], header):
+                return False
+            if ws.write_row(r, offset, row):
+                return False
+    finally:
+        wb.close()
+    return True
+
+
+def write_only_xlsx(df: pd.DataFrame, path: str, index: bool = False) -> None:
+    """
+    Writes df row by row with openpyxl in write-only mode
+
+    Rows go straight to XML without building openpyxl's cell model, so memory
+    stays flat; slower than stream_xlsx but always available. Header format
+    and index placement match stream_xlsx.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    check_sheet_size(df, index)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Sheet1')
+    thin = Side(style='thin')
+    font = Font(bold=True)
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    align = Alignment(horizontal='center', vertical='top')
+
+    def cell(value, styled=False):
+        c = WriteOnlyCell(ws, value=value)
+        if c.data_type == 'f':  # openpyxl writes '=...' strings as formulas
+            c.data_type = 's'
+        if styled:
+            c.font, c.border, c.alignment = font, border, align
+        return c
+
+    def text_cells(vals: list) -> list:
+        for i, v in enumerate(vals):
+            if v.__class__ is str and v.startswith('='):
+                vals[i] = cell(v)
+        return vals
+
+    names = [cell(name, True) for name in df.columns]
+    if index:
+        names.insert(0, cell(df.index.name, True) if df.index.name else None)
+    ws.append(names)
+    cols = [text_cells(_cell_values(s)) if s.dtype == object else _cell_values(s) for _, s in df.items()]
+    if index:
+        cols.insert(0, [cell(v, True) for v in _cell_values(df.index.to_series())])
+    for row in zip(*cols):
+        ws.append(row)
+    wb.save(path)
+
+
+def write_xlsx(df: pd.DataFrame, path: str, index: bool = False) -> None:
+    """
+    Writes df to an Excel file like df.to_excel(path, index=index)
+
+    Streams with stream_xlsx when xlsxwriter is installed, otherwise (or when
+    stream_xlsx cannot write a cell in full) with write_only_xlsx.
+    MultiIndex and PeriodIndex rows are left to to_excel.
+    """
+    if index and isinstance(df.index, (pd.MultiIndex, pd.PeriodIndex)):
+        df.to_excel(path, index=index)
+    elif xlsxwriter is None or not stream_xlsx(df, path, index):
+        write_only_xlsx(df, path, index)